@@ -9,6 +9,7 @@ from lxml import etree
 from tqdm import tqdm
 from segmente import tokenize
 from substitue import substitue_texte
+from vectoriel import sauvegarde_espace_latent, sauvegarde_matrice_tfidf
 
 
 def tf_determination(fichier_segmentation: str, fichier_tf: str) -> None:
@@ -166,6 +167,12 @@ if __name__ == "__main__":
     idf_determination("data/TF_output.txt", "data/idf_output.txt")
     print("Calcul de TF-IDF...")
     calcul_tf_idf("data/TF_output.txt", "data/idf_output.txt", "data/tfidf_output.txt")
+    print("Construction de la matrice TF-IDF...")
+    sauvegarde_matrice_tfidf(
+        "data/tfidf_output.txt", "data/idf_output.txt", "data/tfidf"
+    )
+    print("Factorisation de la matrice TF-IDF...")
+    sauvegarde_espace_latent("data/tfidf")
     print("Génération de l'anti-dictionnaire...")
     definition_stop_words("data/tfidf_output.txt", "data/subs.txt", 0.0006)
     print("Nettoyage du corpus...")
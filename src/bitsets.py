@@ -0,0 +1,70 @@
+"""
+Ensembles de documents représentés par des bitsets.
+
+Un ensemble de documents est un entier python dont le bit i vaut 1 si le document
+d'identifiant dense i en fait partie. Les opérations booléennes du moteur
+deviennent alors une seule opération sur des entiers :
+- ET : a & b
+- OU : a | b
+- SAUF : a & ~b
+"""
+
+import numpy as np
+
+
+def univers(nb_documents: int) -> int:
+    """
+    Renvoie le bitset contenant tous les documents.
+
+    :param nb_documents: Le nombre de documents indexés.
+    :return: Le bitset dont les nb_documents premiers bits valent 1.
+    """
+    return (1 << nb_documents) - 1
+
+
+def depuis_docs(docs: np.ndarray, nb_documents: int) -> int:
+    """
+    Construit un bitset à partir d'une liste d'identifiants de documents.
+
+    :param docs: Les identifiants des documents.
+    :param nb_documents: Le nombre de documents indexés.
+    :return: Le bitset correspondant.
+    """
+    masque = np.zeros(nb_documents, dtype=bool)
+    masque[docs] = True
+    return int.from_bytes(np.packbits(masque, bitorder="little").tobytes(), "little")
+
+
+def vers_masque(bitset: int, nb_documents: int) -> np.ndarray:
+    """
+    Renvoie le masque booléen (indexé par identifiant de document) d'un bitset.
+
+    :param bitset: Le bitset.
+    :param nb_documents: Le nombre de documents indexés.
+    :return: Un tableau de booléens de taille nb_documents.
+    """
+    octets = bitset.to_bytes((nb_documents + 7) // 8, "little")
+    return np.unpackbits(
+        np.frombuffer(octets, dtype=np.uint8), count=nb_documents, bitorder="little"
+    ).astype(bool)
+
+
+def vers_docs(bitset: int, nb_documents: int) -> np.ndarray:
+    """
+    Renvoie les identifiants des documents d'un bitset.
+
+    :param bitset: Le bitset.
+    :param nb_documents: Le nombre de documents indexés.
+    :return: Les identifiants des documents, triés.
+    """
+    return np.flatnonzero(vers_masque(bitset, nb_documents))
+
+
+def cardinal(bitset: int) -> int:
+    """
+    Renvoie le nombre de documents d'un bitset.
+
+    :param bitset: Le bitset.
+    :return: Le nombre de bits à 1.
+    """
+    return bitset.bit_count()
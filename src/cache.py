@@ -0,0 +1,105 @@
+"""
+Cache LRU (le moins récemment utilisé est évincé en premier) à durée de vie limitée,
+utilisé par le moteur pour ne pas refaire le travail des requêtes répétées.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Nombre maximal d'entrées d'un cache
+TAILLE_CACHE = 256
+
+# Durée de vie d'une entrée, en secondes (None : pas d'expiration)
+DUREE_VIE_CACHE = 600.0
+
+
+class CacheLRU:
+    """
+    Cache borné : au-delà de taille_max entrées, la moins récemment utilisée
+    est évincée, et une entrée plus vieille que duree_vie est recalculée.
+    Les entrées sont associées à une version (par exemple l'état de l'index) :
+    un changement de version vide le cache. Utilisable depuis plusieurs threads.
+    """
+
+    def __init__(
+        self,
+        taille_max: int = TAILLE_CACHE,
+        duree_vie: Optional[float] = DUREE_VIE_CACHE,
+        horloge: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Crée un cache vide.
+        :param taille_max: Le nombre maximal d'entrées (0 désactive le cache).
+        :param duree_vie: La durée de vie d'une entrée en secondes (None : illimitée).
+        :param horloge: La fonction qui donne l'instant courant en secondes.
+        """
+        self.taille_max = taille_max
+        self.duree_vie = duree_vie
+        self.horloge = horloge
+        self.version: Hashable = None
+        self.succes = 0
+        self.echecs = 0
+        self._entrees: OrderedDict = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entrees)
+
+    def vider(self) -> None:
+        """
+        Supprime toutes les entrées (les compteurs sont conservés).
+        :return: None
+        """
+        with self._verrou:
+            self._entrees.clear()
+
+    def obtenir(
+        self, cle: Hashable, calcul: Callable[[], Any], version: Hashable = None
+    ) -> Any:
+        """
+        Renvoie la valeur associée à une clé, en la calculant si elle est absente
+        ou expirée.
+        :param cle: La clé.
+        :param calcul: La fonction (sans argument) qui calcule la valeur.
+        :param version: La version des données dont dépend la valeur : si elle
+        diffère de celle des entrées du cache, le cache est vidé.
+        :return: La valeur.
+        """
+        with self._verrou:
+            if version != self.version:
+                self._entrees.clear()
+                self.version = version
+            entree = self._entrees.get(cle)
+            if entree is not None and (
+                self.duree_vie is None or self.horloge() - entree[0] < self.duree_vie
+            ):
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return entree[1]
+            self.echecs += 1
+
+        # Le calcul est fait hors du verrou : d'autres clés restent accessibles
+        valeur = calcul()
+        with self._verrou:
+            # Une valeur calculée sur une version déjà remplacée n'est pas conservée
+            if self.taille_max > 0 and version == self.version:
+                self._entrees[cle] = (self.horloge(), valeur)
+                self._entrees.move_to_end(cle)
+                while len(self._entrees) > self.taille_max:
+                    self._entrees.popitem(last=False)
+        return valeur
+
+    def statistiques(self) -> dict[str, float]:
+        """
+        Renvoie les compteurs du cache.
+        :return: Un dictionnaire (succès, échecs, taux de succès, nombre d'entrées).
+        """
+        total = self.succes + self.echecs
+        return {
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux": self.succes / total if total else 0.0,
+            "entrees": len(self._entrees),
+        }
@@ -0,0 +1,352 @@
+"""
+Compression des listes de postings : écarts entre documents, regroupés en blocs
+de TAILLE_BLOC et empaquetés sur le nombre de bits du plus grand écart du bloc.
+
+Une liste de postings est une suite croissante d'identifiants de documents. Chaque
+identifiant est remplacé par son écart avec le précédent de la liste (le premier
+par lui-même), puis les écarts sont découpés en blocs. Les sections sont :
+- "blocs_largeurs" : le nombre de bits d'un écart de chaque bloc ;
+- "blocs_sauts" : le dernier document de chaque bloc qui n'est pas le dernier
+  de sa liste. Ce sont les pointeurs de saut : un bloc se décode seul (ses écarts
+  partent du dernier document du bloc précédent), et une intersection ne décode
+  que les blocs qui peuvent contenir ses candidats ;
+- "blocs_donnees" : les écarts empaquetés, bit de poids faible en premier, chaque
+  bloc commençant sur un octet.
+Le découpage en blocs se déduit des offsets des listes (longueurs des listes),
+et la position de chaque bloc dans les données de sa taille et de sa largeur : ils
+ne sont pas stockés, la plupart des listes n'ayant qu'un posting.
+"""
+
+import time
+from typing import List, Tuple
+import numpy as np
+
+# Nombre d'écarts par bloc
+TAILLE_BLOC = 128
+
+# Octets lus pour décoder un écart : 32 bits au plus, décalés de 7 bits au plus
+OCTETS_LUS = 5
+
+SECTIONS_COMPRESSION = ("blocs_largeurs", "blocs_sauts", "blocs_donnees")
+
+
+def decoupage_blocs(offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Découpe des listes de postings en blocs.
+    :param offsets: Les offsets des listes (la liste k est entre offsets[k] et offsets[k + 1]).
+    :return: Un tuple (premier bloc de chaque liste, avec le nombre total de blocs
+    à la fin ; premier posting de chaque bloc, avec le nombre de postings à la fin ;
+    indicateur du dernier bloc de chaque liste).
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    longueurs = np.diff(offsets)
+    nb_blocs = -(-longueurs // TAILLE_BLOC)
+    blocs_listes = np.zeros(len(longueurs) + 1, dtype=np.int64)
+    blocs_listes[1:] = np.cumsum(nb_blocs)
+    # Premier posting de chaque bloc : début de sa liste + rang du bloc × TAILLE_BLOC
+    rangs = np.arange(blocs_listes[-1]) - np.repeat(blocs_listes[:-1], nb_blocs)
+    premiers = np.append(
+        np.repeat(offsets[:-1], nb_blocs) + rangs * TAILLE_BLOC, offsets[-1]
+    )
+    derniers = np.zeros(blocs_listes[-1], dtype=bool)
+    derniers[blocs_listes[1:][nb_blocs > 0] - 1] = True
+    return blocs_listes, premiers, derniers
+
+
+def debuts_blocs(tailles: np.ndarray, largeurs: np.ndarray) -> np.ndarray:
+    """
+    Calcule la position des blocs dans les données : chaque bloc occupe le nombre
+    d'octets entier qui contient ses écarts.
+    :param tailles: Le nombre d'écarts de chaque bloc.
+    :param largeurs: Le nombre de bits d'un écart de chaque bloc.
+    :return: L'octet de début de chaque bloc, avec la taille des données à la fin.
+    """
+    debuts = np.zeros(len(tailles) + 1, dtype=np.int64)
+    debuts[1:] = np.cumsum(-(-tailles.astype(np.int64) * largeurs // 8))
+    return debuts
+
+
+def compression_postings(
+    offsets: np.ndarray, docs: np.ndarray
+) -> dict[str, np.ndarray]:
+    """
+    Compresse des listes de postings.
+    :param offsets: Les offsets des listes.
+    :param docs: Les identifiants des documents, croissants dans chaque liste.
+    :return: Les sections des postings compressés (voir SECTIONS_COMPRESSION).
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    docs = np.asarray(docs, dtype=np.int64)
+    _, premiers, derniers = decoupage_blocs(offsets)
+    tailles = np.diff(premiers)
+
+    # Écart avec le posting précédent de la même liste
+    ecarts = np.diff(docs, prepend=0)
+    ecarts[offsets[:-1][np.diff(offsets) > 0]] = docs[
+        offsets[:-1][np.diff(offsets) > 0]
+    ]
+
+    if len(tailles):
+        largeurs = np.frexp(np.maximum.reduceat(ecarts, premiers[:-1]))[1]
+        maximums = docs[premiers[1:] - 1]
+    else:
+        largeurs = maximums = np.zeros(0, dtype=np.int64)
+    debuts = debuts_blocs(tailles, largeurs)
+
+    # Chaque écart est étalé sur ses bits, placés à la suite dans son bloc
+    largeurs_postings = np.repeat(largeurs, tailles)
+    rangs = np.arange(len(docs)) - np.repeat(premiers[:-1], tailles)
+    bits_debut = np.repeat(debuts[:-1] * 8, tailles) + rangs * largeurs_postings
+    numeros_bits = np.arange(int(largeurs_postings.sum())) - np.repeat(
+        np.cumsum(largeurs_postings) - largeurs_postings, largeurs_postings
+    )
+    bits = np.zeros(int(debuts[-1]) * 8, dtype=np.uint8)
+    bits[np.repeat(bits_debut, largeurs_postings) + numeros_bits] = (
+        np.repeat(ecarts, largeurs_postings) >> numeros_bits
+    ) & 1
+
+    return {
+        "blocs_largeurs": largeurs.astype(np.uint8),
+        "blocs_sauts": maximums[~derniers].astype(np.int32),
+        "blocs_donnees": np.packbits(bits, bitorder="little"),
+    }
+
+
+class PostingsCompresses:
+    """
+    Listes de postings compressées (voir compression_postings), décodées à la demande.
+    """
+
+    def __init__(self, offsets: np.ndarray, sections: dict[str, np.ndarray]):
+        """
+        :param offsets: Les offsets des listes.
+        :param sections: Les sections des postings compressés.
+        """
+        self.offsets = offsets
+        self.largeurs = sections["blocs_largeurs"]
+        self.blocs_listes, self.premiers, derniers = decoupage_blocs(offsets)
+        self.debuts = debuts_blocs(np.diff(self.premiers), self.largeurs)
+        # Dernier document des blocs qui ne terminent pas leur liste (-1 sinon)
+        self.maximums = np.full(len(self.largeurs), -1, dtype=np.int64)
+        self.maximums[~derniers] = sections["blocs_sauts"]
+        self.donnees = sections["blocs_donnees"]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def blocs(self, blocs: np.ndarray) -> np.ndarray:
+        """
+        Décode des blocs, sans boucle sur les blocs ni sur les postings.
+        :param blocs: Les numéros des blocs, croissants.
+        :return: Les identifiants des documents des blocs, à la suite.
+        """
+        blocs = np.asarray(blocs, dtype=np.int64)
+        tailles = (self.premiers[blocs + 1] - self.premiers[blocs]).astype(np.int64)
+        largeurs = np.repeat(self.largeurs[blocs].astype(np.int64), tailles)
+        rangs = np.arange(int(tailles.sum())) - np.repeat(
+            np.cumsum(tailles) - tailles, tailles
+        )
+        bits_debut = (
+            np.repeat(self.debuts[blocs].astype(np.int64) * 8, tailles)
+            + rangs * largeurs
+        )
+
+        # Lecture des OCTETS_LUS octets qui contiennent chaque écart. Ceux qui
+        # dépassent la fin des données ne portent que des bits au-delà de l'écart,
+        # masqués ensuite : on relit le dernier octet à leur place (il n'y a aucune
+        # donnée si tous les écarts sont nuls)
+        octets = bits_debut >> 3
+        mots = np.zeros(len(octets), dtype=np.int64)
+        for i in range(OCTETS_LUS if len(self.donnees) else 0):
+            lus = np.minimum(octets + i, len(self.donnees) - 1)
+            mots |= self.donnees[lus].astype(np.int64) << (8 * i)
+        ecarts = (mots >> (bits_debut & 7)) & ((1 << largeurs) - 1)
+
+        # Le premier écart d'un bloc part du dernier document du bloc précédent
+        # de la même liste (le premier bloc d'une liste part de 0)
+        listes = np.searchsorted(self.blocs_listes, blocs, side="right") - 1
+        bases = np.where(
+            blocs > self.blocs_listes[listes],
+            self.maximums[np.maximum(blocs - 1, 0)],
+            0,
+        ).astype(np.int64)
+        premieres = np.cumsum(tailles) - tailles
+        ecarts[premieres[tailles > 0]] += bases[tailles > 0]
+        cumul = np.cumsum(ecarts)
+        # Somme cumulée remise à zéro au début de chaque bloc
+        return (
+            cumul - np.repeat(cumul[premieres] - ecarts[premieres], tailles)
+        ).astype(np.int32)
+
+    def liste(self, k: int) -> np.ndarray:
+        """
+        Décode une liste de postings.
+        :param k: Le numéro de la liste.
+        :return: Les identifiants des documents, triés.
+        """
+        return self.blocs(np.arange(self.blocs_listes[k], self.blocs_listes[k + 1]))
+
+    def listes(self, listes: np.ndarray) -> np.ndarray:
+        """
+        Décode plusieurs listes de postings.
+        :param listes: Les numéros des listes, croissants.
+        :return: Les identifiants des documents des listes, à la suite.
+        """
+        listes = np.asarray(listes, dtype=np.int64)
+        nb_blocs = self.blocs_listes[listes + 1] - self.blocs_listes[listes]
+        return self.blocs(
+            np.arange(int(nb_blocs.sum()))
+            + np.repeat(
+                self.blocs_listes[listes] - (np.cumsum(nb_blocs) - nb_blocs), nb_blocs
+            )
+        )
+
+    def blocs_candidats(
+        self, k: int, candidats: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Décode les seuls blocs d'une liste qui peuvent contenir des documents : pour
+        chacun, le premier bloc dont le pointeur de saut l'atteint (ou le dernier).
+        :param k: Le numéro de la liste (non vide).
+        :param candidats: Les documents, triés.
+        :return: Un tuple (numéros des blocs décodés, leurs documents à la suite).
+        """
+        premier, dernier = int(self.blocs_listes[k]), int(self.blocs_listes[k + 1])
+        utiles = np.unique(
+            premier
+            + np.searchsorted(
+                self.maximums[premier : dernier - 1], candidats, side="left"
+            )
+        )
+        return utiles, self.blocs(utiles)
+
+    def rangs_postings(self, k: int, candidats: np.ndarray) -> np.ndarray:
+        """
+        Renvoie les rangs, parmi tous les postings, de documents d'une liste.
+        :param k: Le numéro de la liste.
+        :param candidats: Des documents de la liste, triés.
+        :return: Le rang du posting de chaque document (comme dans les offsets).
+        """
+        if len(candidats) == 0:
+            return np.zeros(0, dtype=np.int64)
+        utiles, docs = self.blocs_candidats(k, candidats)
+        tailles = self.premiers[utiles + 1] - self.premiers[utiles]
+        rangs = np.arange(len(docs)) + np.repeat(
+            self.premiers[utiles] - (np.cumsum(tailles) - tailles), tailles
+        )
+        return rangs[np.searchsorted(docs, candidats)]
+
+    def decompression(self) -> np.ndarray:
+        """
+        Décode toutes les listes.
+        :return: Les identifiants des documents, à la suite (comme les postings non
+        compressés).
+        """
+        return self.blocs(np.arange(len(self.largeurs)))
+
+    def intersection(self, listes: List[int]) -> Tuple[np.ndarray, int]:
+        """
+        Intersecte des listes de postings, en partant de la plus courte. Dans les
+        autres listes, les pointeurs de saut (dernier document de chaque bloc) donnent
+        le seul bloc qui peut contenir chaque candidat : les autres ne sont pas décodés.
+        :param listes: Les numéros des listes.
+        :return: Un tuple (identifiants des documents communs, triés ; nombre de blocs
+        décodés).
+        """
+        listes = sorted(listes, key=lambda k: self.offsets[k + 1] - self.offsets[k])
+        candidats = self.liste(listes[0])
+        decodes = int(self.blocs_listes[listes[0] + 1] - self.blocs_listes[listes[0]])
+        for k in listes[1:]:
+            if len(candidats) == 0 or self.offsets[k] == self.offsets[k + 1]:
+                return candidats[:0], decodes
+            utiles, docs = self.blocs_candidats(k, candidats)
+            decodes += len(utiles)
+            trouves = np.searchsorted(docs, candidats)
+            candidats = candidats[docs[np.minimum(trouves, len(docs) - 1)] == candidats]
+        return candidats, decodes
+
+
+def postings_synthetiques(
+    nb_listes: int, nb_documents: int, graine: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Génère des listes de postings aléatoires dont les longueurs suivent une loi de
+    Zipf, comme celles d'un grand corpus.
+    :param nb_listes: Le nombre de listes.
+    :param nb_documents: Le nombre de documents du corpus.
+    :param graine: La graine du générateur aléatoire.
+    :return: Un tuple (offsets des listes, identifiants des documents).
+    """
+    generateur = np.random.default_rng(graine)
+    longueurs = np.minimum(generateur.zipf(1.8, nb_listes), nb_documents)
+    offsets = np.zeros(nb_listes + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(longueurs)
+    docs = np.concatenate(
+        [
+            np.sort(generateur.choice(nb_documents, longueur, replace=False))
+            for longueur in longueurs
+        ]
+    ).astype(np.int32)
+    return offsets, docs
+
+
+def benchmark_compression(
+    offsets: np.ndarray, docs: np.ndarray, nb_intersections: int = 20
+) -> dict[str, float]:
+    """
+    Mesure la compression de listes de postings : taille comparée aux identifiants
+    stockés sur 32 bits, débit de décompression, et intersection de chacune des plus
+    longues listes avec une liste plus courte, avec les pointeurs de saut et en
+    décompressant les deux listes.
+    :param offsets: Les offsets des listes.
+    :param docs: Les identifiants des documents, croissants dans chaque liste.
+    :param nb_intersections: Le nombre de couples de listes intersectés.
+    :return: Un dictionnaire (tailles brute et compressée en octets, bits par posting,
+    débit de décompression en postings par seconde, blocs décodés et temps des
+    intersections avec et sans sauts).
+    """
+    debut_mesure = time.perf_counter()
+    sections = compression_postings(offsets, docs)
+    temps_compression = time.perf_counter() - debut_mesure
+    postings = PostingsCompresses(offsets, sections)
+    taille = sum(section.nbytes for section in sections.values())
+
+    debut_mesure = time.perf_counter()
+    decompresses = postings.decompression()
+    temps_decompression = time.perf_counter() - debut_mesure
+    if not np.array_equal(decompresses, docs):
+        raise ValueError("Les postings décompressés diffèrent des postings d'origine")
+
+    # Chacune des plus longues listes avec une liste plus courte : c'est le cas où
+    # les pointeurs de saut évitent de décoder la plupart des blocs
+    ordre = np.argsort(-np.diff(offsets.astype(np.int64)), kind="stable")
+    couples = list(
+        zip(
+            ordre[:nb_intersections].tolist(),
+            ordre[10 * nb_intersections : 11 * nb_intersections].tolist(),
+        )
+    )
+    debut_mesure = time.perf_counter()
+    blocs_sauts = sum(postings.intersection(list(couple))[1] for couple in couples)
+    temps_sauts = time.perf_counter() - debut_mesure
+    debut_mesure = time.perf_counter()
+    for premiere, seconde in couples:
+        np.intersect1d(postings.liste(premiere), postings.liste(seconde))
+    temps_complet = time.perf_counter() - debut_mesure
+    blocs_complet = sum(
+        int(postings.blocs_listes[k + 1] - postings.blocs_listes[k])
+        for couple in couples
+        for k in couple
+    )
+
+    return {
+        "taille_brute": 4 * len(docs),
+        "taille_compressee": taille,
+        "bits_par_posting": 8 * taille / max(1, len(docs)),
+        "temps_compression": temps_compression,
+        "debit_decompression": len(docs) / temps_decompression,
+        "blocs_intersection_sauts": blocs_sauts,
+        "blocs_intersection_complete": blocs_complet,
+        "temps_intersection_sauts": temps_sauts,
+        "temps_intersection_complete": temps_complet,
+    }
@@ -2,10 +2,39 @@
 Fonctions permettant la correction orthographique à partir du corpus.
 """
 
-import pandas as pd
+import hashlib
+import os
+import time
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Optional, Tuple
 import numpy as np
+from index_binaire import FichierSections, ecriture_sections
+from trigrammes import IndexTrigrammes
 from utils import tokenize
 
+# Stratégies de recherche des candidats d'un mot absent du lexique :
+# - "prefixe" : préfixe commun le plus long, puis distance de Levenshtein ;
+# - "suppressions" : index des suppressions (à la SymSpell), puis préfixe si rien
+#   n'est trouvé ;
+# - "trigrammes" : termes de l'index inversé qui partagent le plus de trigrammes
+#   avec le mot (voir trigrammes.py), puis préfixe si rien n'est trouvé.
+STRATEGIES_CORRECTION = ("prefixe", "suppressions", "trigrammes")
+
+# Distance d'édition maximale des corrections trouvées par l'index des suppressions
+DISTANCE_SUPPRESSIONS = 2
+
+VERSION_SUPPRESSIONS = 1
+
+# Distance d'édition maximale des corrections cherchées dans l'arbre BK, quand
+# aucun mot du lexique n'a de préfixe commun assez long avec le mot à corriger
+DISTANCE_ARBRE = 2
+
+VERSION_ARBRE = 1
+
+# Nombre de candidats à partir duquel levenshtein_plusieurs calcule leurs distances
+# avec numpy (en deçà, le coût fixe des opérations numpy domine)
+SEUIL_LEVENSHTEIN_VECTORISE = 256
+
 
 def recherche_prefixe(
     mot1: str, mot2: str, seuil_min: float, seuil_max: float, seuil_proximite: float
@@ -45,7 +74,64 @@ def recherche_prefixe(
     return 0
 
 
-def levenshtein(mot1: str, mot2: str) -> int:
+def masques_caracteres(mot: str) -> dict[str, int]:
+    """
+    Calcule, pour chaque caractère d'un mot, le masque de ses positions dans le mot
+    (bit i à 1 si mot[i] est ce caractère).
+
+    :param mot: Le mot.
+    :return: Le dictionnaire caractère → masque.
+    """
+    masques: dict[str, int] = {}
+    for i, caractere in enumerate(mot):
+        masques[caractere] = masques.get(caractere, 0) | (1 << i)
+    return masques
+
+
+def distance_masques(
+    masques: dict[str, int], longueur: int, mot2: str, distance_max: Optional[int]
+) -> int:
+    """
+    Calcule la distance de Levenshtein entre un mot, donné par les masques de ses
+    caractères (voir masques_caracteres), et une chaîne de caractères.
+
+    La colonne de la matrice des distances correspondant à un caractère de mot2 est
+    codée par ses différences verticales (+1 ou -1) sur les bits d'un entier, et
+    calculée en quelques opérations sur ces entiers (algorithme de Myers, dans la
+    version de Hyyrö) : pas de boucle sur les caractères du mot.
+
+    :param masques: Les masques des caractères du mot (non vide).
+    :param longueur: La longueur du mot.
+    :param mot2: La chaîne de caractères.
+    :param distance_max: Si elle est donnée, le calcul s'arrête dès que la distance
+    est sûre de la dépasser.
+    :return: La distance (distance_max + 1 si elle dépasse distance_max).
+    """
+    tous = (1 << longueur) - 1
+    dernier = 1 << (longueur - 1)
+    # Différences verticales positives et négatives de la colonne courante
+    positives, negatives = tous, 0
+    distance = longueur
+    for j, caractere in enumerate(mot2):
+        x = masques.get(caractere, 0) | negatives
+        diagonales = (((x & positives) + positives) ^ positives) | x
+        horizontales_pos = negatives | ~(diagonales | positives)
+        horizontales_neg = diagonales & positives
+        if horizontales_pos & dernier:
+            distance += 1
+        elif horizontales_neg & dernier:
+            distance -= 1
+        # La distance baisse au plus de 1 par caractère restant
+        if distance_max is not None and distance - (len(mot2) - j - 1) > distance_max:
+            return distance_max + 1
+        horizontales_pos = (horizontales_pos << 1) | 1
+        horizontales_neg <<= 1
+        positives = (horizontales_neg | ~(diagonales | horizontales_pos)) & tous
+        negatives = horizontales_pos & diagonales
+    return distance
+
+
+def levenshtein(mot1: str, mot2: str, distance_max: Optional[int] = None) -> int:
     """
     Calcule la distance de Levenshtein entre deux chaînes de caractères.
     La distance de Levenshtein est une mesure du nombre d'opérations
@@ -53,88 +139,714 @@ def levenshtein(mot1: str, mot2: str) -> int:
 
     :param mot1: La première chaîne de caractères.
     :param mot2: La deuxième chaîne de caractères.
-    :return: La distance de Levenshtein entre mot1 et mot2.
-    """
-
-    # Initialisation de la matrice de distance
-    distance = np.zeros((len(mot1) + 1, len(mot2) + 1))
-
-    # Initialisation des bords de la matrice (cas de transformation d'une chaîne vide en une autre)
-    distance[0, 0] = 0
-    for i in range(0, len(mot1) + 1):
-        distance[i, 0] = i
-    for j in range(0, len(mot2) + 1):
-        distance[0, j] = j
-
-    # Remplissage de la matrice avec les valeurs minimales des transformations possibles
-    for i in range(1, len(mot1) + 1):
-        for j in range(1, len(mot2) + 1):
-            if mot1[i - 1] == mot2[j - 1]:
-                # Si les caractères sont =, on prend le minimum des trois opérations possibles
-                distance[i, j] = min(
-                    distance[i - 1, j - 1],
-                    distance[i, j - 1] + 1,
-                    distance[i - 1, j] + 1,
+    :param distance_max: Si elle est donnée, le calcul s'arrête dès que la distance
+    est sûre de la dépasser.
+    :return: La distance de Levenshtein entre mot1 et mot2 (distance_max + 1 si elle
+    dépasse distance_max).
+    """
+    if distance_max is not None and abs(len(mot1) - len(mot2)) > distance_max:
+        return distance_max + 1
+    if not mot1:
+        return len(mot2)
+    return distance_masques(masques_caracteres(mot1), len(mot1), mot2, distance_max)
+
+
+def levenshtein_plusieurs(
+    mot: str, candidats: List[str], distance_max: Optional[int] = None
+) -> np.ndarray:
+    """
+    Calcule la distance de Levenshtein entre un mot et plusieurs candidats, en ne
+    calculant qu'une fois les masques des caractères du mot. Au-delà de
+    SEUIL_LEVENSHTEIN_VECTORISE candidats, si le mot a au plus 64 caractères,
+    les colonnes de tous les candidats sont calculées ensemble, un caractère à la
+    fois, sur des tableaux d'entiers de 64 bits.
+
+    :param mot: Le mot.
+    :param candidats: Les candidats.
+    :param distance_max: Si elle est donnée, les distances qui la dépassent valent
+    distance_max + 1.
+    :return: Les distances, dans l'ordre des candidats.
+    """
+    if not mot:
+        distances = np.array([len(candidat) for candidat in candidats], dtype=np.int64)
+    elif len(candidats) < SEUIL_LEVENSHTEIN_VECTORISE or len(mot) > 64:
+        masques = masques_caracteres(mot)
+        distances = np.array(
+            [
+                (
+                    distance_max + 1
+                    if distance_max is not None
+                    and abs(len(mot) - len(candidat)) > distance_max
+                    else distance_masques(masques, len(mot), candidat, distance_max)
                 )
-            else:
-                # Si les caractères sont !=, on choisit l'opération la moins coûteuse
-                distance[i, j] = min(
-                    distance[i - 1, j - 1] + 1,
-                    distance[i, j - 1] + 1,
-                    distance[i - 1, j] + 1,
+                for candidat in candidats
+            ],
+            dtype=np.int64,
+        )
+    else:
+        distances = levenshtein_vectorise(mot, candidats)
+    if distance_max is not None:
+        distances = np.minimum(distances, distance_max + 1)
+    return distances
+
+
+def levenshtein_vectorise(mot: str, candidats: List[str]) -> np.ndarray:
+    """
+    Calcule la distance de Levenshtein entre un mot d'au plus 64 caractères (non
+    vide) et des candidats : l'algorithme de distance_masques est appliqué à tous
+    les candidats à la fois, avec des opérations numpy sur des entiers de 64 bits.
+
+    :param mot: Le mot.
+    :param candidats: Les candidats (au moins un).
+    :return: Les distances, dans l'ordre des candidats.
+    """
+    # Masque de chaque caractère du mot (triés par point de code), et 0 pour les autres
+    masques_mot = masques_caracteres(mot)
+    points_mot = np.array(sorted(map(ord, masques_mot)), dtype=np.uint32)
+    masques = np.array(
+        [masques_mot[chr(point)] for point in points_mot] + [0], dtype=np.uint64
+    )
+
+    # Masque de chaque caractère des candidats, un candidat par colonne
+    longueurs = np.array([len(candidat) for candidat in candidats], dtype=np.int64)
+    points = np.frombuffer("".join(candidats).encode("utf-32-le"), dtype=np.uint32)
+    codes = np.minimum(np.searchsorted(points_mot, points), len(points_mot) - 1)
+    codes[points_mot[codes] != points] = len(points_mot)
+    debuts = np.cumsum(longueurs) - longueurs
+    codes_candidats = np.full(
+        (max(longueurs.max(), 1), len(candidats)), len(points_mot)
+    )
+    codes_candidats[
+        np.arange(len(points)) - np.repeat(debuts, longueurs),
+        np.repeat(np.arange(len(candidats)), longueurs),
+    ] = codes
+    egaux = masques[codes_candidats]
+
+    tous = np.uint64((1 << len(mot)) - 1)
+    dernier = np.uint64(1 << (len(mot) - 1))
+    un = np.uint64(1)
+    positives = np.full(len(candidats), tous, dtype=np.uint64)
+    negatives = np.zeros(len(candidats), dtype=np.uint64)
+    distances = np.full(len(candidats), len(mot), dtype=np.int64)
+    for j, egaux_colonne in enumerate(egaux):
+        x = egaux_colonne | negatives
+        diagonales = (((x & positives) + positives) ^ positives) | x
+        horizontales_pos = negatives | ~(diagonales | positives)
+        horizontales_neg = diagonales & positives
+        # Seuls les candidats qui ont un j-ième caractère avancent
+        actifs = longueurs > j
+        distances += actifs & ((horizontales_pos & dernier) != 0)
+        distances -= actifs & ((horizontales_neg & dernier) != 0)
+        horizontales_pos = (horizontales_pos << un) | un
+        horizontales_neg <<= un
+        positives = np.where(
+            actifs,
+            (horizontales_neg | ~(diagonales | horizontales_pos)) & tous,
+            positives,
+        )
+        negatives = np.where(actifs, horizontales_pos & diagonales, negatives)
+    return distances
+
+
+class Lexique:
+    """
+    Lexique (mot → lemme) du correcteur, chargé une seule fois en dictionnaire :
+    la recherche d'un mot est en temps constant. Il n'est plus modifié après le
+    chargement, et peut donc être partagé entre les appels et les threads.
+    """
+
+    def __init__(self, chemin: str):
+        """
+        Charge un lexique.
+        :param chemin: Le chemin du fichier contenant le lexique (une ligne "mot→lemme"
+        par mot ; si un mot apparaît plusieurs fois, sa première ligne est retenue).
+        """
+        self.chemin = chemin
+        self.lemmes: dict[str, str] = {}
+        with open(chemin, "r", encoding="utf-8") as fichier:
+            for ligne in fichier:
+                mot, _, lemme = ligne.rstrip("\n").partition("→")
+                if mot:
+                    self.lemmes.setdefault(mot, lemme)
+        # Les mots dans l'ordre du fichier (ordre de parcours des candidats)
+        self.mots = list(self.lemmes)
+        # Les mots triés : ceux qui ont un préfixe donné sont consécutifs
+        self.tries = sorted(self.mots)
+        self.rangs = {mot: rang for rang, mot in enumerate(self.mots)}
+
+    def __len__(self) -> int:
+        return len(self.lemmes)
+
+    def __contains__(self, mot: str) -> bool:
+        return mot in self.lemmes
+
+    def lemme(self, mot: str) -> Optional[str]:
+        """
+        Renvoie le lemme d'un mot.
+        :param mot: Le mot.
+        :return: Son lemme, ou None si le mot n'est pas dans le lexique.
+        """
+        return self.lemmes.get(mot)
+
+    def candidats_prefixe(
+        self, mot: str, seuil_min: float, seuil_max: float, seuil_proximite: float
+    ) -> List[Tuple[str, float]]:
+        """
+        Renvoie les mots du lexique proches d'un mot selon recherche_prefixe, sans
+        parcourir tout le lexique : un candidat doit partager avec le mot un préfixe
+        assez long pour atteindre seuil_proximite, et les mots qui ont ce préfixe
+        sont trouvés par dichotomie dans les mots triés.
+
+        :param mot: Le mot à corriger.
+        :param seuil_min: Le seuil minimal pour la recherche par préfixe.
+        :param seuil_max: Le seuil maximal pour la recherche par préfixe.
+        :param seuil_proximite: Le seuil de proximité pour la recherche par préfixe.
+        :return: Les candidats (mot, proximité), dans l'ordre du lexique (les mêmes
+        que ceux d'un parcours de tout le lexique).
+        """
+        if len(mot) < seuil_min:
+            return []
+        # La proximité d'un candidat ne dépasse pas préfixe commun / len(mot) :
+        # plus court préfixe commun qui peut atteindre le seuil
+        longueur = next(
+            (
+                longueur
+                for longueur in range(len(mot) + 1)
+                if (longueur / max(len(mot), 1)) * 100 >= seuil_proximite
+            ),
+            None,
+        )
+        if longueur is None:
+            return []
+        if longueur == 0:
+            mots = self.mots
+        else:
+            prefixe = mot[:longueur]
+            mots = sorted(
+                self.tries[
+                    bisect_left(self.tries, prefixe) : bisect_left(
+                        self.tries, prefixe + chr(0x10FFFF)
+                    )
+                ],
+                key=self.rangs.__getitem__,
+            )
+        candidats = []
+        for candidat_potentiel in mots:
+            proximite = recherche_prefixe(
+                mot, candidat_potentiel, seuil_min, seuil_max, seuil_proximite
+            )
+            if proximite != 0:
+                candidats.append((candidat_potentiel, proximite))
+        return candidats
+
+
+def charger_lexique(lexique: str) -> Lexique:
+    """
+    Charge un lexique au format (mot → lemme).
+
+    :param lexique: Le chemin du fichier contenant le lexique.
+    :return: Le lexique.
+    """
+    return Lexique(lexique)
+
+
+def plus_proche(mot: str, candidats: List[Tuple[str, int]]) -> Optional[str]:
+    """
+    Choisit le candidat le plus proche d'un mot : la plus petite distance de
+    Levenshtein, puis le plus long préfixe commun avec le mot, puis le premier.
+
+    :param mot: Le mot.
+    :param candidats: Les candidats (mot, distance de Levenshtein).
+    :return: Le candidat choisi, ou None s'il n'y a aucun candidat.
+    """
+    if not candidats:
+        return None
+    return min(
+        candidats,
+        key=lambda candidat: (
+            candidat[1],
+            -len(os.path.commonprefix([mot, candidat[0]])),
+        ),
+    )[0]
+
+
+def suppressions(mot: str, distance: int = DISTANCE_SUPPRESSIONS) -> set[str]:
+    """
+    Renvoie les variantes d'un mot obtenues en supprimant au plus distance caractères.
+
+    :param mot: Le mot.
+    :param distance: Le nombre maximal de caractères supprimés.
+    :return: L'ensemble des variantes (le mot lui-même compris).
+    """
+    variantes = {mot}
+    niveau = {mot}
+    for _ in range(distance):
+        niveau = {
+            variante[:i] + variante[i + 1 :]
+            for variante in niveau
+            for i in range(len(variante))
+        }
+        variantes |= niveau
+    return variantes
+
+
+def hachage_chaines(chaines: Iterable[str]) -> np.ndarray:
+    """
+    Calcule un hachage de 64 bits de chaînes, stable d'un processus à l'autre
+    (contrairement à hash).
+
+    :param chaines: Les chaînes.
+    :return: Les hachages (uint64).
+    """
+    return np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(chaine.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for chaine in chaines
+        ],
+        dtype=np.uint64,
+    )
+
+
+def empreinte_lexique(lexique: Lexique) -> str:
+    """
+    Calcule l'empreinte des mots d'un lexique, qui identifie le lexique d'un index
+    de suppressions.
+
+    :param lexique: Le lexique.
+    :return: L'empreinte (hexadécimale).
+    """
+    return hashlib.blake2b("\n".join(lexique.mots).encode("utf-8")).hexdigest()
+
+
+def construction_sections_suppressions(
+    lexique: Lexique, distance: int = DISTANCE_SUPPRESSIONS
+) -> dict[str, np.ndarray]:
+    """
+    Construit l'index des suppressions d'un lexique : chaque variante d'un mot
+    (voir suppressions) est associée au rang du mot dans le lexique. Deux mots à
+    une distance de Levenshtein d'au plus distance ont une variante commune.
+
+    :param lexique: Le lexique.
+    :param distance: La distance d'édition maximale.
+    :return: Les sections "hachages" (hachages des variantes, triés) et "mots"
+    (rang dans le lexique du mot de chaque variante).
+    """
+    variantes, rangs = [], []
+    for rang, mot in enumerate(lexique.mots):
+        variantes_mot = suppressions(mot, distance)
+        variantes.extend(variantes_mot)
+        rangs.extend([rang] * len(variantes_mot))
+    hachages = hachage_chaines(variantes)
+    ordre = np.argsort(hachages, kind="stable")
+    return {
+        "hachages": hachages[ordre],
+        "mots": np.array(rangs, dtype=np.int32)[ordre],
+    }
+
+
+def sauvegarde_index_suppressions(
+    lexique: Lexique,
+    chemin: str = "data/suppressions.bin",
+    distance: int = DISTANCE_SUPPRESSIONS,
+) -> None:
+    """
+    Construit l'index des suppressions d'un lexique et l'enregistre.
+
+    :param lexique: Le lexique.
+    :param chemin: Le fichier de sortie.
+    :param distance: La distance d'édition maximale.
+    :return: None
+    """
+    ecriture_sections(
+        chemin,
+        construction_sections_suppressions(lexique, distance),
+        {"distance": distance, "empreinte": empreinte_lexique(lexique)},
+        VERSION_SUPPRESSIONS,
+    )
+
+
+class IndexSuppressions(FichierSections):
+    """
+    Index des suppressions d'un lexique (voir construction_sections_suppressions),
+    projeté en mémoire. Les candidats d'un mot sont trouvés en cherchant ses propres
+    variantes dans l'index, puis vérifiés par la distance de Levenshtein.
+    """
+
+    def __init__(self, chemin: str, lexique: Lexique):
+        """
+        Ouvre l'index des suppressions d'un lexique.
+        :param chemin: Le chemin de l'index.
+        :param lexique: Le lexique dont l'index a été construit.
+        """
+        super().__init__(chemin, VERSION_SUPPRESSIONS)
+        if self.meta["empreinte"] != empreinte_lexique(lexique):
+            raise ValueError(f"{chemin} : index construit pour un autre lexique")
+        self.lexique = lexique
+        self.distance = self.meta["distance"]
+        self.hachages = self.section("hachages")
+        self.mots = self.section("mots")
+
+    def candidats(self, mot: str) -> List[Tuple[str, int]]:
+        """
+        Renvoie les mots du lexique à une distance de Levenshtein d'au plus
+        self.distance d'un mot.
+
+        :param mot: Le mot.
+        :return: Les candidats (mot, distance), dans l'ordre du lexique.
+        """
+        sondes = hachage_chaines(suppressions(mot, self.distance))
+        debuts = np.searchsorted(self.hachages, sondes, side="left")
+        fins = np.searchsorted(self.hachages, sondes, side="right")
+        rangs = np.unique(
+            np.concatenate(
+                [
+                    self.mots[debut:fin]
+                    for debut, fin in zip(debuts, fins)
+                    if fin > debut
+                ]
+                or [np.zeros(0, dtype=np.int32)]
+            )
+        )
+        # Une variante commune ne garantit pas la distance (ni l'absence de
+        # collision de hachage) : chaque candidat est vérifié
+        mots = [self.lexique.mots[rang] for rang in rangs.tolist()]
+        distances = levenshtein_plusieurs(mot, mots, self.distance)
+        return [
+            (candidat, int(distance))
+            for candidat, distance in zip(mots, distances)
+            if distance <= self.distance
+        ]
+
+
+def charger_index_suppressions(
+    lexique: Lexique,
+    chemin: str = "data/suppressions.bin",
+    distance: int = DISTANCE_SUPPRESSIONS,
+) -> IndexSuppressions:
+    """
+    Ouvre l'index des suppressions d'un lexique, en le (re)construisant s'il
+    n'existe pas ou s'il a été construit pour un autre lexique (par exemple
+    avant l'ajout de lemmes par ingestion.py).
+
+    :param lexique: Le lexique.
+    :param chemin: Le chemin de l'index.
+    :param distance: La distance d'édition maximale d'un index reconstruit.
+    :return: L'index des suppressions.
+    """
+    try:
+        return IndexSuppressions(chemin, lexique)
+    except (OSError, ValueError):
+        sauvegarde_index_suppressions(lexique, chemin, distance)
+        return IndexSuppressions(chemin, lexique)
+
+
+def construction_sections_arbre(lexique: Lexique) -> dict[str, np.ndarray]:
+    """
+    Construit l'arbre BK (Burkhard-Keller) des mots d'un lexique : chaque mot est un
+    nœud, et les enfants d'un nœud sont rangés selon leur distance de Levenshtein
+    à ce nœud (au plus un enfant par distance). Les mots sont insérés dans l'ordre
+    du lexique, le premier est la racine.
+
+    :param lexique: Le lexique.
+    :return: Les sections "enfants" (rangs des enfants de chaque nœud, à la suite,
+    par distance croissante), "enfants_distances" (leur distance à leur parent) et
+    "enfants_offsets" (les enfants du nœud i sont entre enfants_offsets[i] et
+    enfants_offsets[i + 1]).
+    """
+    enfants: List[dict[int, int]] = [{} for _ in lexique.mots]
+    for rang, mot in enumerate(lexique.mots[1:], start=1):
+        noeud = 0
+        while True:
+            distance = levenshtein(mot, lexique.mots[noeud])
+            if distance not in enfants[noeud]:
+                enfants[noeud][distance] = rang
+                break
+            noeud = enfants[noeud][distance]
+
+    offsets = np.zeros(len(lexique.mots) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([len(enfants_noeud) for enfants_noeud in enfants])
+    distances = [sorted(enfants_noeud) for enfants_noeud in enfants]
+    return {
+        "enfants": np.array(
+            [
+                enfants_noeud[distance]
+                for enfants_noeud, distances_noeud in zip(enfants, distances)
+                for distance in distances_noeud
+            ],
+            dtype=np.int32,
+        ),
+        "enfants_distances": np.array(
+            [distance for distances_noeud in distances for distance in distances_noeud],
+            dtype=np.int32,
+        ),
+        "enfants_offsets": offsets,
+    }
+
+
+def sauvegarde_arbre_bk(lexique: Lexique, chemin: str = "data/arbre_bk.bin") -> None:
+    """
+    Construit l'arbre BK des mots d'un lexique et l'enregistre.
+
+    :param lexique: Le lexique.
+    :param chemin: Le fichier de sortie.
+    :return: None
+    """
+    ecriture_sections(
+        chemin,
+        construction_sections_arbre(lexique),
+        {"empreinte": empreinte_lexique(lexique)},
+        VERSION_ARBRE,
+    )
+
+
+class ArbreBK(FichierSections):
+    """
+    Arbre BK des mots d'un lexique (voir construction_sections_arbre). L'inégalité
+    triangulaire de la distance de Levenshtein limite la recherche des mots proches
+    d'un mot aux enfants dont la distance à leur parent est à moins de la distance
+    cherchée de celle du mot au parent : seule une petite partie du lexique est
+    comparée au mot.
+    """
+
+    def __init__(self, chemin: str, lexique: Lexique):
+        """
+        Ouvre l'arbre BK d'un lexique.
+        :param chemin: Le chemin de l'arbre.
+        :param lexique: Le lexique dont l'arbre a été construit.
+        """
+        super().__init__(chemin, VERSION_ARBRE)
+        if self.meta["empreinte"] != empreinte_lexique(lexique):
+            raise ValueError(f"{chemin} : arbre construit pour un autre lexique")
+        self.lexique = lexique
+        # Listes Python : le parcours lit les nœuds un par un
+        self.enfants = self.section("enfants").tolist()
+        self.distances = self.section("enfants_distances").tolist()
+        self.offsets = self.section("enfants_offsets").tolist()
+        self.noeuds_visites = 0
+
+    def candidats(self, mot: str, distance_max: int) -> List[Tuple[str, int]]:
+        """
+        Renvoie les mots du lexique à une distance de Levenshtein d'au plus
+        distance_max d'un mot.
+
+        :param mot: Le mot.
+        :param distance_max: La distance maximale.
+        :return: Les candidats (mot, distance), dans l'ordre du lexique.
+        """
+        if not self.lexique.mots:
+            return []
+        trouves = []
+        # Parcours niveau par niveau : les distances des nœuds d'un niveau sont
+        # calculées ensemble (voir levenshtein_plusieurs)
+        niveau = [0]
+        while niveau:
+            self.noeuds_visites += len(niveau)
+            distances = levenshtein_plusieurs(
+                mot, [self.lexique.mots[noeud] for noeud in niveau]
+            ).tolist()
+            suivant = []
+            for noeud, distance in zip(niveau, distances):
+                if distance <= distance_max:
+                    trouves.append((noeud, distance))
+                # Enfants à une distance du nœud entre distance ± distance_max
+                debut, fin = self.offsets[noeud], self.offsets[noeud + 1]
+                suivant.extend(
+                    self.enfants[
+                        bisect_left(
+                            self.distances, distance - distance_max, debut, fin
+                        ) : bisect_right(
+                            self.distances, distance + distance_max, debut, fin
+                        )
+                    ]
                 )
+            niveau = suivant
+        return [
+            (self.lexique.mots[noeud], distance) for noeud, distance in sorted(trouves)
+        ]
+
+
+def charger_arbre_bk(lexique: Lexique, chemin: str = "data/arbre_bk.bin") -> ArbreBK:
+    """
+    Ouvre l'arbre BK d'un lexique, en le (re)construisant s'il n'existe pas ou s'il
+    a été construit pour un autre lexique.
+
+    :param lexique: Le lexique.
+    :param chemin: Le chemin de l'arbre.
+    :return: L'arbre BK.
+    """
+    try:
+        return ArbreBK(chemin, lexique)
+    except (OSError, ValueError):
+        sauvegarde_arbre_bk(lexique, chemin)
+        return ArbreBK(chemin, lexique)
+
+
+def distance_max_correction(mot: str) -> int:
+    """
+    Renvoie la distance de Levenshtein maximale d'une correction d'un mot trouvée
+    dans l'arbre BK ou l'index des trigrammes : une modification pour cinq
+    caractères, au plus DISTANCE_ARBRE. Un mot court est à une ou deux modifications
+    de nombreux mots du lexique (par exemple "lune" de "luxe", "dune" ou "jaune") :
+    le corriger ferait chercher un autre mot que celui de la requête.
+
+    :param mot: Le mot.
+    :return: La distance maximale (0 : pas de correction).
+    """
+    return min(DISTANCE_ARBRE, len(mot) // 5)
+
+
+def correction_trigrammes(mot: str, index_trigrammes: IndexTrigrammes) -> Optional[str]:
+    """
+    Corrige un mot vers un terme de l'index inversé : parmi les termes qui partagent
+    le plus de trigrammes avec le mot, celui à la plus petite distance de Levenshtein
+    (le plus de trigrammes communs en cas d'égalité), si elle ne dépasse pas
+    distance_max_correction.
+
+    :param mot: Le mot.
+    :param index_trigrammes: L'index des trigrammes des termes.
+    :return: Le terme, ou None si aucun terme n'est assez proche.
+    """
+    candidats = [terme for terme, _ in index_trigrammes.candidats(mot)]
+    if not candidats:
+        return None
+    distance_max = distance_max_correction(mot)
+    distances = levenshtein_plusieurs(mot, candidats, distance_max)
+    meilleur = int(np.argmin(distances))
+    return candidats[meilleur] if distances[meilleur] <= distance_max else None
+
 
-    # La distance de Levenshtein est la valeur en bas à droite de la matrice
-    return int(distance[len(mot1), len(mot2)])
+def candidats_indexes(
+    lexique: Lexique,
+    candidats: List[Tuple[str, float]],
+    termes_indexes: Optional[set[str]],
+) -> List[Tuple[str, float]]:
+    """
+    Écarte les candidats dont le lemme n'est pas un terme de l'index inversé :
+    corriger vers eux ne ferait trouver aucun document.
+
+    :param lexique: Le lexique.
+    :param candidats: Les candidats (mot, score).
+    :param termes_indexes: Les termes de l'index (aucun candidat écarté si None).
+    :return: Les candidats gardés, dans le même ordre.
+    """
+    if termes_indexes is None:
+        return candidats
+    return [
+        candidat
+        for candidat in candidats
+        if lexique.lemme(candidat[0]) in termes_indexes
+    ]
 
 
 def correcteur_orthographique(
     input_texte: str,
-    lexique: str,
+    lexique: str | Lexique,
     seuil_min: float,
     seuil_max: float,
     seuil_proximite: float,
+    strategie: str = "prefixe",
+    index_suppressions: Optional[IndexSuppressions] = None,
+    arbre_bk: Optional[ArbreBK] = None,
+    index_trigrammes: Optional[IndexTrigrammes] = None,
+    termes_indexes: Optional[set[str]] = None,
 ) -> str:
     """
     Cette fonction traite un texte en le tokenisant et en recherchant chaque mot
     dans le lexique pour en obtenir le lemme.
     Si un mot n'est pas dans le lexique, la fonction tente de trouver des mots proches
-    à l'aide de la proximité de préfixe et de la distance de Levenshtein.
+    à l'aide de la proximité de préfixe et de la distance de Levenshtein, puis, si
+    aucun mot n'a de préfixe commun assez long, dans l'arbre BK du lexique.
 
     :param input_texte: Texte à corriger sous forme de chaîne de caractères.
-    :param lexique: Fichier contenant un lexique au format (mot → lemme).
+    :param lexique: Fichier contenant un lexique au format (mot → lemme),
+    ou ce lexique déjà chargé (voir Lexique).
     :param seuil_min: Le seuil minimal pour la recherche par préfixe.
     :param seuil_max: Le seuil maximal pour la recherche par préfixe.
     :param seuil_proximite: Le seuil de proximité pour la recherche par préfixe.
+    :param strategie: La stratégie de recherche des candidats (voir
+    STRATEGIES_CORRECTION).
+    :param index_suppressions: L'index des suppressions du lexique, pour la stratégie
+    "suppressions" (chargé avec charger_index_suppressions si None).
+    :param arbre_bk: L'arbre BK du lexique (pas de recherche dans l'arbre si None).
+    :param index_trigrammes: L'index des trigrammes des termes de l'index inversé,
+    pour la stratégie "trigrammes" (chargé depuis data/trigrammes.bin si None).
+    :param termes_indexes: Les termes de l'index inversé : les mots du lexique dont
+    le lemme n'en fait pas partie ne sont pas des candidats (pas de restriction
+    si None).
     :return: Texte corrigé sous forme de chaîne de caractères
     """
+    if strategie not in STRATEGIES_CORRECTION:
+        raise ValueError(f"Stratégie de correction inconnue : {strategie}")
 
     # Initialisation des variables
     output_liste = []
-    lexique_dataframe = pd.read_csv(
-        lexique, sep="→", header=None, names=["mot", "lemme"], engine="python"
-    )
+    if not isinstance(lexique, Lexique):
+        lexique = charger_lexique(lexique)
+    if strategie == "suppressions" and index_suppressions is None:
+        index_suppressions = charger_index_suppressions(lexique)
+    if strategie == "trigrammes" and index_trigrammes is None:
+        index_trigrammes = IndexTrigrammes()
 
     for mot in tokenize(input_texte):
-        match = lexique_dataframe[lexique_dataframe["mot"] == mot]
+        lemme = lexique.lemme(mot)
         # Si le mot existe dans le lexique, ajoute son lemme
-        if not match.empty:
-            output_liste.append(match.iloc[0]["lemme"])
+        if lemme is not None:
+            output_liste.append(lemme)
 
-        # Si le mot n'est pas dans le lexique, recherche de candidats proches
-        else:
-            candidats = []
-            for candidat_potentiel in lexique_dataframe["mot"]:
-                proximite = recherche_prefixe(
-                    mot, candidat_potentiel, seuil_min, seuil_max, seuil_proximite
+        # Si le mot n'est pas dans le lexique, recherche du plus proche
+        # dans l'index des suppressions
+        elif (
+            strategie == "suppressions"
+            and (
+                correction := plus_proche(
+                    mot,
+                    candidats_indexes(
+                        lexique, index_suppressions.candidats(mot), termes_indexes
+                    ),
                 )
-                if proximite != 0:
-                    candidats.append((candidat_potentiel, proximite))
+            )
+            is not None
+        ):
+            output_liste.append(lexique.lemme(correction))
+
+        # Ou du terme de l'index le plus proche (qui est déjà un lemme)
+        elif (
+            strategie == "trigrammes"
+            and (correction := correction_trigrammes(mot, index_trigrammes)) is not None
+        ):
+            output_liste.append(correction)
+
+        # Sinon, recherche de candidats par préfixe commun
+        else:
+            candidats = candidats_indexes(
+                lexique,
+                lexique.candidats_prefixe(mot, seuil_min, seuil_max, seuil_proximite),
+                termes_indexes,
+            )
 
-            # Si aucun candidat trouvé, ajouter None
+            # Si aucun candidat trouvé, recherche dans l'arbre BK,
+            # puis ajout du mot lui-même
             if len(candidats) == 0:
-                output_liste.append(mot)
-                print(f"Aucun candidat trouvé pour le mot '{mot}'")
+                correction = (
+                    plus_proche(
+                        mot,
+                        candidats_indexes(
+                            lexique,
+                            arbre_bk.candidats(mot, distance_max_correction(mot)),
+                            termes_indexes,
+                        ),
+                    )
+                    if arbre_bk is not None and distance_max_correction(mot) > 0
+                    else None
+                )
+                if correction is not None:
+                    output_liste.append(lexique.lemme(correction))
+                else:
+                    output_liste.append(mot)
+                    print(f"Aucun candidat trouvé pour le mot '{mot}'")
             else:
                 # Trouver le candidat avec la meilleure proximité
                 max_proximite = max(c[1] for c in candidats)
@@ -143,28 +855,138 @@ def correcteur_orthographique(
                 # Si plusieurs candidats ont la même proximité,
                 # choisir celui avec la distance de Levenshtein la plus faible
                 if len(meilleur_candidats) == 1:
-                    output_liste.append(
-                        lexique_dataframe[
-                            lexique_dataframe["mot"] == meilleur_candidats[0][0]
-                        ].iloc[0]["lemme"]
-                    )
+                    output_liste.append(lexique.lemme(meilleur_candidats[0][0]))
                 else:
                     # Utilisation de la distance de Levenshtein pour choisir le meilleur candidat
-                    meilleur_candidat_lev = min(
-                        meilleur_candidats, key=lambda x: levenshtein(mot, x[0])
-                    )
-                    output_liste.append(
-                        lexique_dataframe[
-                            lexique_dataframe["mot"] == meilleur_candidat_lev[0]
-                        ].iloc[0]["lemme"]
+                    # (le premier en cas d'égalité)
+                    distances = levenshtein_plusieurs(
+                        mot, [candidat[0] for candidat in meilleur_candidats]
                     )
+                    meilleur_candidat_lev = meilleur_candidats[
+                        int(np.argmin(distances))
+                    ]
+                    output_liste.append(lexique.lemme(meilleur_candidat_lev[0]))
     # Retour du texte corrigé
     return " ".join(output_liste)
 
 
+def benchmark_correction(
+    lexique: Lexique,
+    mots: List[str],
+    chemin: str = "data/suppressions.bin",
+    seuils: Tuple[float, float, float] = (1, 12, 54),
+    repetitions: int = 5,
+) -> dict[str, float]:
+    """
+    Mesure la construction de l'index des suppressions et compare les stratégies
+    de correction sur des mots absents du lexique.
+
+    :param lexique: Le lexique.
+    :param mots: Les mots à corriger.
+    :param chemin: Le fichier où enregistrer l'index des suppressions.
+    :param seuils: Les seuils de la recherche par préfixe (min, max, proximité).
+    :param repetitions: Le nombre de corrections de chaque mot (le temps retenu est
+    celui du passage le plus rapide).
+    :return: Un dictionnaire (temps de construction, nombre de variantes, taille de
+    l'index en octets, temps moyen par mot de chaque stratégie, proportion de mots
+    dont la correction diffère entre les stratégies).
+    """
+    debut_mesure = time.perf_counter()
+    sauvegarde_index_suppressions(lexique, chemin)
+    temps_construction = time.perf_counter() - debut_mesure
+    index_suppressions = IndexSuppressions(chemin, lexique)
+    index_trigrammes = IndexTrigrammes()
+
+    resultats = {
+        "temps_construction": temps_construction,
+        "nb_variantes": len(index_suppressions.hachages),
+        "taille_index": index_suppressions.hachages.nbytes
+        + index_suppressions.mots.nbytes,
+    }
+    corrections = {}
+    for strategie in STRATEGIES_CORRECTION:
+        # Meilleur de plusieurs passages : le premier charge les pages de l'index
+        temps = []
+        for _ in range(repetitions):
+            debut_mesure = time.perf_counter()
+            corrections[strategie] = [
+                correcteur_orthographique(
+                    mot,
+                    lexique,
+                    *seuils,
+                    strategie,
+                    index_suppressions,
+                    index_trigrammes=index_trigrammes,
+                )
+                for mot in mots
+            ]
+            temps.append(time.perf_counter() - debut_mesure)
+        resultats[f"temps_{strategie}"] = min(temps) / max(1, len(mots))
+    resultats["differences"] = sum(
+        prefixe != suppression
+        for prefixe, suppression in zip(
+            corrections["prefixe"], corrections["suppressions"]
+        )
+    ) / max(1, len(mots))
+    return resultats
+
+
+def benchmark_arbre(
+    lexique: Lexique,
+    mots: List[str],
+    chemin: str = "data/arbre_bk.bin",
+    distances: Tuple[int, ...] = (1, DISTANCE_ARBRE),
+) -> dict[str, float]:
+    """
+    Mesure la construction de l'arbre BK et la recherche des mots proches de mots
+    absents du lexique, comparée au calcul de la distance à tous les mots du lexique.
+
+    :param lexique: Le lexique.
+    :param mots: Les mots cherchés.
+    :param chemin: Le fichier où enregistrer l'arbre.
+    :param distances: Les distances maximales des recherches.
+    :return: Un dictionnaire (temps de construction, puis pour chaque distance :
+    proportion moyenne du lexique visitée et temps moyen par mot ; temps moyen par
+    mot du parcours de tout le lexique).
+    """
+    debut_mesure = time.perf_counter()
+    sauvegarde_arbre_bk(lexique, chemin)
+    resultats = {"temps_construction": time.perf_counter() - debut_mesure}
+    arbre_bk = ArbreBK(chemin, lexique)
+    for distance in distances:
+        arbre_bk.noeuds_visites = 0
+        debut_mesure = time.perf_counter()
+        for mot in mots:
+            arbre_bk.candidats(mot, distance)
+        resultats[f"temps_distance_{distance}"] = (
+            time.perf_counter() - debut_mesure
+        ) / max(1, len(mots))
+        resultats[f"visites_distance_{distance}"] = arbre_bk.noeuds_visites / max(
+            1, len(mots) * len(lexique)
+        )
+    debut_mesure = time.perf_counter()
+    for mot in mots:
+        levenshtein_plusieurs(mot, lexique.mots, max(distances))
+    resultats["temps_parcours"] = (time.perf_counter() - debut_mesure) / max(
+        1, len(mots)
+    )
+    return resultats
+
+
 if __name__ == "__main__":
     TEXTE = "etudia en nanotechnolojies"
     TEXTE_CORRIGE = correcteur_orthographique(
         TEXTE, "data/lemma_stemmer.txt", 3, 12, 60
     )
     print(TEXTE_CORRIGE)
+
+    MOTS_FAUTIFS = ["systmes", "reseaux", "congres", "etudia", "nanotechnolojies"]
+    for cle, valeur in benchmark_correction(
+        charger_lexique("data/lemma_stemmer.txt"), MOTS_FAUTIFS
+    ).items():
+        print(f"{cle} : {valeur:.4g}")
+    MOTS_DEBUT_FAUTIF = ["tudiant", "qechnologie", "onférence", "ztudiants", "zystemes"]
+    for cle, valeur in benchmark_arbre(
+        charger_lexique("data/lemma_stemmer.txt"), MOTS_DEBUT_FAUTIF
+    ).items():
+        print(f"{cle} : {valeur:.4g}")
@@ -2,12 +2,35 @@
 Fonctions pour évaluer le moteur sur quelques requêtes sélectionnées.
 """
 
+import io
+import sys
 import time
+import tracemalloc
+from contextlib import redirect_stdout
 from datetime import datetime
 import xml.etree.ElementTree as et
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-from moteur import moteur
+from bitsets import cardinal, vers_masque
+from compression_index import SECTIONS_COMPRESSION
+from moteur import (
+    MoteurRecherche,
+    NB_RESULTATS_CLASSES,
+    POIDS_CLASSEMENT,
+    REQUETES_EXEMPLES,
+    charger_index,
+    moteur_partage,
+    termes_requete,
+)
+from requetes import (
+    AnalyseurRequetes,
+    nettoyage_requete,
+    replace_soit,
+    traitement_requete,
+)
+from similaires import NB_SIMILAIRES, shingles_corpus, signatures_minhash
+from vectoriel import construction_espace_latent
 
 
 def fichiers_rubrique_focus_avec_images(xml_path):
@@ -64,6 +87,486 @@ def extraire_fichiers_filtres(xml_path):
     return fichiers
 
 
+def benchmark_dictionnaire_termes(
+    requetes: list[str], repetitions: int = 10
+) -> dict[str, float]:
+    """
+    Compare, sur les termes réellement cherchés par une liste de requêtes,
+    l'accès aux postings par parcours du dataframe (df[df[0] == mot])
+    et par le dictionnaire de termes de l'index (IndexSegmente.postings).
+    Les termes sont relevés au niveau de l'index, sur un moteur qui vient d'être
+    chargé : ceux des bitsets construits à la demande comme ceux des conjonctions
+    intersectées dans l'index compressé.
+
+    :param requetes: Les requêtes dont on mesure les accès à l'index.
+    :param repetitions: Le nombre de répétitions de chaque mesure.
+    :return: Un dictionnaire (nombre de termes, temps dataframe, temps dictionnaire)
+    """
+    moteur_adit = MoteurRecherche(taille_cache=0)
+    index = moteur_adit.index
+
+    # On relève les couples (terme, champ) demandés à l'index par chaque requête
+    termes = []
+    postings_origine, intersection_origine = index.postings, index.intersection
+
+    def postings_traces(terme, champ):
+        termes.append((terme, champ))
+        return postings_origine(terme, champ)
+
+    def intersection_tracee(termes_intersectes, champ):
+        termes.extend((terme, champ) for terme in termes_intersectes)
+        return intersection_origine(termes_intersectes, champ)
+
+    index.postings, index.intersection = postings_traces, intersection_tracee
+    try:
+        with redirect_stdout(io.StringIO()):
+            for requete in requetes:
+                moteur_adit.rechercher(requete)
+    finally:
+        del index.postings, index.intersection
+
+    df_index = charger_index()
+    debut_mesure = time.perf_counter()
+    for _ in range(repetitions):
+        for terme, _ in termes:
+            df_index[df_index[0] == terme].iloc[:, 1:].values.flatten().tolist()
+    temps_dataframe = (time.perf_counter() - debut_mesure) / repetitions
+
+    debut_mesure = time.perf_counter()
+    for _ in range(repetitions):
+        for terme, champ in termes:
+            index.postings(terme, champ)
+    temps_dictionnaire = (time.perf_counter() - debut_mesure) / repetitions
+
+    return {
+        "termes": len(termes),
+        "dataframe": temps_dataframe,
+        "dictionnaire": temps_dictionnaire,
+    }
+
+
+def benchmark_agregation(
+    moteur_adit: MoteurRecherche, requete: str, repetitions: int = 100
+) -> dict[str, float]:
+    """
+    Compare, pour une requête sur les bulletins ou les rubriques, l'agrégation des
+    articles trouvés par parcours de tous les postings du champ (avant)
+    et par lecture des tables article → numéro / rubrique de l'index (après).
+
+    :param moteur_adit: Le moteur de recherche.
+    :param requete: Une requête dont le type de document est bulletin ou rubrique.
+    :param repetitions: Le nombre de répétitions de chaque mesure.
+    :return: Un dictionnaire (nombre d'articles, temps avant, temps après)
+    """
+    # On relève les articles que le moteur agrège pour cette requête
+    appels = []
+    agregation_origine = moteur_adit.agregation
+
+    def agregation_tracee(docs, champ):
+        appels.append((docs, champ))
+        return agregation_origine(docs, champ)
+
+    moteur_adit.agregation = agregation_tracee
+    try:
+        with redirect_stdout(io.StringIO()):
+            moteur_adit.rechercher(requete)
+    finally:
+        del moteur_adit.agregation
+    docs, champ = appels[0]
+
+    index = moteur_adit.index.base
+    codes_postings = index.codes_postings()
+    docs_postings = index.postings_compresses.decompression()
+
+    def agregation_parcours():
+        masque = vers_masque(docs, index.nb_documents)
+        positions = np.flatnonzero(
+            (codes_postings == index.codes[champ]) & masque[docs_postings]
+        )
+        identifiants = np.unique(
+            (np.searchsorted(index.offsets, positions, side="right") - 1)
+            // index.nb_champs
+        )
+        return {index.termes[i].strip() for i in identifiants.tolist()}
+
+    if agregation_parcours() != moteur_adit.agregation(docs, champ):
+        raise ValueError("Les deux agrégations ne donnent pas le même résultat")
+
+    debut_mesure = time.perf_counter()
+    for _ in range(repetitions):
+        agregation_parcours()
+    temps_avant = (time.perf_counter() - debut_mesure) / repetitions
+
+    debut_mesure = time.perf_counter()
+    for _ in range(repetitions):
+        moteur_adit.agregation(docs, champ)
+    temps_apres = (time.perf_counter() - debut_mesure) / repetitions
+
+    return {
+        "articles": cardinal(docs),
+        "avant": temps_avant,
+        "apres": temps_apres,
+    }
+
+
+def benchmark_elagage(
+    moteur_adit: MoteurRecherche,
+    requetes: list[str],
+    k: int = NB_RESULTATS_CLASSES,
+    repetitions: int = 10,
+) -> dict[str, float]:
+    """
+    Compare, pour le classement BM25 des requêtes sur les articles, l'évaluation
+    de tous les postings des termes et l'évaluation avec élagage (MaxScore).
+
+    :param moteur_adit: Le moteur de recherche.
+    :param requetes: Les requêtes à classer.
+    :param k: Le nombre d'articles classés.
+    :param repetitions: Le nombre de répétitions de chaque mesure.
+    :return: Un dictionnaire (nombre de requêtes classées, postings évalués,
+    postings ignorés, temps sans élagage, temps avec élagage)
+    """
+    index = moteur_adit.index
+    classements = []
+    for requete in requetes:
+        with redirect_stdout(io.StringIO()):
+            docs, type_resultats, composants = moteur_adit.evaluation(requete)
+            if docs is None or type_resultats != "article":
+                continue
+            if moteur_adit.classement(requete, k) != moteur_adit.classement(
+                requete, k, elagage=False
+            ):
+                raise ValueError(f"Classements différents pour : {requete}")
+        classements.append(
+            (termes_requete(composants), vers_masque(docs, index.nb_documents))
+        )
+
+    evalues, ignores = 0, 0
+    for termes, masque in classements:
+        _, _, compteurs = index.meilleurs_bm25(termes, POIDS_CLASSEMENT, k, masque)
+        evalues += compteurs["evalues"]
+        ignores += compteurs["ignores"]
+
+    debut_mesure = time.perf_counter()
+    for _ in range(repetitions):
+        for termes, masque in classements:
+            np.compress(masque, index.bm25(termes, POIDS_CLASSEMENT))
+    temps_sans = (time.perf_counter() - debut_mesure) / repetitions
+
+    debut_mesure = time.perf_counter()
+    for _ in range(repetitions):
+        for termes, masque in classements:
+            index.meilleurs_bm25(termes, POIDS_CLASSEMENT, k, masque)
+    temps_avec = (time.perf_counter() - debut_mesure) / repetitions
+
+    return {
+        "requetes": len(classements),
+        "evalues": evalues,
+        "ignores": ignores,
+        "sans_elagage": temps_sans,
+        "avec_elagage": temps_avec,
+    }
+
+
+def benchmark_analyse(
+    moteur_adit: MoteurRecherche, requetes: list[str], repetitions: int = 10
+) -> dict[str, float]:
+    """
+    Compare l'analyse des requêtes fonction par fonction (mots ignorés relus et mots
+    corrigés à chaque requête) à celle d'un AnalyseurRequetes (analyse_plusieurs).
+
+    :param moteur_adit: Le moteur de recherche (pour son correcteur).
+    :param requetes: Les requêtes à analyser.
+    :param repetitions: Le nombre de fois que le lot de requêtes est analysé.
+    :return: Un dictionnaire (temps moyen par requête, fonction par fonction et avec l'analyseur)
+    """
+    lot = requetes * repetitions
+    with redirect_stdout(io.StringIO()):
+        debut_mesure = time.perf_counter()
+        for requete in lot:
+            composants = traitement_requete(nettoyage_requete(replace_soit(requete)))
+            for mot in composants["keywords"]:
+                if mot != "ou":
+                    moteur_adit.corriger_texte(mot.removeprefix("pas "))
+        temps_fonctions = time.perf_counter() - debut_mesure
+
+        debut_mesure = time.perf_counter()
+        AnalyseurRequetes(moteur_adit.corriger_texte).analyse_plusieurs(lot)
+        temps_analyseur = time.perf_counter() - debut_mesure
+
+    return {
+        "fonctions": temps_fonctions / len(lot),
+        "analyseur": temps_analyseur / len(lot),
+    }
+
+
+def benchmark_cache(requetes: list[str], repetitions: int = 100) -> dict[str, float]:
+    """
+    Compare le temps de requêtes répétées avec et sans les caches du moteur
+    (résultats et corrections).
+
+    :param requetes: Les requêtes à traiter.
+    :param repetitions: Le nombre de fois que chaque requête est traitée.
+    :return: Un dictionnaire (temps moyen par requête sans et avec cache,
+    taux de succès des caches des résultats et des corrections)
+    """
+    temps = {}
+    moteurs = {"sans": MoteurRecherche(taille_cache=0), "avec": MoteurRecherche()}
+    for nom, moteur_adit in moteurs.items():
+        with redirect_stdout(io.StringIO()):
+            debut_mesure = time.perf_counter()
+            for _ in range(repetitions):
+                for requete in requetes:
+                    moteur_adit.rechercher(requete)
+            temps[nom] = (time.perf_counter() - debut_mesure) / (
+                repetitions * len(requetes)
+            )
+
+    return {
+        "sans": temps["sans"],
+        "avec": temps["avec"],
+        "taux_resultats": moteurs["avec"].cache_resultats.statistiques()["taux"],
+        "taux_corrections": moteurs["avec"].analyseur.cache_corrections.statistiques()[
+            "taux"
+        ],
+    }
+
+
+def benchmark_vectoriel(
+    moteur_adit: MoteurRecherche,
+    requetes: list[str],
+    k: int = NB_RESULTATS_CLASSES,
+    repetitions: int = 10,
+) -> dict[str, float]:
+    """
+    Compare le temps de la recherche vectorielle (similarité cosinus tf-idf)
+    à celui de la recherche booléenne sur les mêmes requêtes.
+
+    :param moteur_adit: Le moteur de recherche.
+    :param requetes: Les requêtes à traiter.
+    :param k: Le nombre d'articles renvoyés par la recherche vectorielle.
+    :param repetitions: Le nombre de répétitions de chaque mesure.
+    :return: Un dictionnaire (temps de chargement de la matrice, nombre de poids
+    non nuls, temps moyen par requête vectorielle et booléenne)
+    """
+    debut_mesure = time.perf_counter()
+    matrice = moteur_adit.matrice_tfidf
+    temps_chargement = time.perf_counter() - debut_mesure
+
+    with redirect_stdout(io.StringIO()):
+        debut_mesure = time.perf_counter()
+        for _ in range(repetitions):
+            for requete in requetes:
+                moteur_adit.recherche_vectorielle(requete, k)
+        temps_vectoriel = time.perf_counter() - debut_mesure
+
+        debut_mesure = time.perf_counter()
+        for _ in range(repetitions):
+            for requete in requetes:
+                moteur_adit.rechercher(requete)
+        temps_booleen = time.perf_counter() - debut_mesure
+
+    nb_requetes = repetitions * len(requetes)
+    return {
+        "chargement": temps_chargement,
+        "poids": len(matrice.valeurs),
+        "vectoriel": temps_vectoriel / nb_requetes,
+        "booleen": temps_booleen / nb_requetes,
+    }
+
+
+def benchmark_latent(
+    moteur_adit: MoteurRecherche,
+    requetes: list[str],
+    k: int = NB_RESULTATS_CLASSES,
+    repetitions: int = 10,
+) -> dict[str, float]:
+    """
+    Mesure la construction de l'espace latent (SVD tronquée de la matrice tf-idf),
+    sa taille, et le temps des recherches latente et vectorielle.
+
+    :param moteur_adit: Le moteur de recherche.
+    :param requetes: Les requêtes à traiter.
+    :param k: Le nombre d'articles renvoyés.
+    :param repetitions: Le nombre de répétitions de chaque mesure.
+    :return: Un dictionnaire (temps de construction, pic d'allocation pendant la
+    construction, octets des vecteurs des documents et de la projection, octets de
+    la matrice creuse, temps moyen par requête latente et vectorielle)
+    """
+    espace = moteur_adit.espace_latent
+
+    tracemalloc.start()
+    debut_mesure = time.perf_counter()
+    construction_espace_latent(espace, espace.latents.shape[1])
+    temps_construction = time.perf_counter() - debut_mesure
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    temps = {}
+    with redirect_stdout(io.StringIO()):
+        for nom, recherche in (
+            ("latente", moteur_adit.recherche_latente),
+            ("vectorielle", moteur_adit.recherche_vectorielle),
+        ):
+            debut_mesure = time.perf_counter()
+            for _ in range(repetitions):
+                for requete in requetes:
+                    recherche(requete, k)
+            temps[nom] = (time.perf_counter() - debut_mesure) / (
+                repetitions * len(requetes)
+            )
+
+    return {
+        "construction": temps_construction,
+        "pic_construction": pic,
+        "octets_latents": espace.latents.nbytes,
+        "octets_projection": espace.projection.nbytes,
+        "octets_creux": espace.indices.nbytes
+        + espace.valeurs.nbytes
+        + espace.normes.nbytes,
+        "latente": temps["latente"],
+        "vectorielle": temps["vectorielle"],
+    }
+
+
+def comparaison_rappel(
+    moteur_adit: MoteurRecherche,
+    docs_pertinents: dict[str, set[str]],
+    k: int = NB_RESULTATS_CLASSES,
+) -> pd.DataFrame:
+    """
+    Compare le rappel de la recherche booléenne (rechercher) à celui des k premiers
+    articles des recherches vectorielle et latente, pour les requêtes sur les articles.
+
+    :param moteur_adit: Le moteur de recherche.
+    :param docs_pertinents: Les articles pertinents de chaque requête.
+    :param k: Le nombre d'articles des recherches vectorielle et latente.
+    :return: Un DataFrame (requête, rappel de chaque recherche).
+    """
+    lignes = []
+    with redirect_stdout(io.StringIO()):
+        for requete, pertinents in docs_pertinents.items():
+            resultats, doc_type = moteur_adit.rechercher(requete)
+            if doc_type != "article":
+                continue
+            lignes.append(
+                {
+                    "requête": requete,
+                    "booléenne": len(pertinents & (resultats or set()))
+                    / len(pertinents),
+                    "vectorielle": len(
+                        pertinents & set(moteur_adit.recherche_vectorielle(requete, k))
+                    )
+                    / len(pertinents),
+                    "latente": len(
+                        pertinents & set(moteur_adit.recherche_latente(requete, k))
+                    )
+                    / len(pertinents),
+                }
+            )
+    return pd.DataFrame(lignes)
+
+
+def benchmark_similaires(
+    moteur_adit: MoteurRecherche,
+    fichier_corpus: str = "data/corpus_clean.xml",
+    k: int = NB_SIMILAIRES,
+) -> dict[str, float]:
+    """
+    Mesure le calcul des signatures MinHash (sur un thread puis en parallèle)
+    et la recherche des articles similaires : nombre de candidats examinés grâce
+    aux seaux LSH, rappel des k articles les plus similaires au sens de l'indice
+    de Jaccard exact, et temps par article.
+
+    :param moteur_adit: Le moteur de recherche.
+    :param fichier_corpus: Le corpus XML (nettoyé) de l'index des articles similaires.
+    :param k: Le nombre d'articles similaires cherchés.
+    :return: Un dictionnaire (temps des signatures sur un thread et en parallèle,
+    proportion moyenne d'articles candidats, rappel moyen, temps moyen par article)
+    """
+    index_similarite = moteur_adit.index_similarite
+    _, offsets, hachages = shingles_corpus(
+        fichier_corpus, index_similarite.meta["taille_shingles"]
+    )
+    coefficients = index_similarite.section("coefficients")
+
+    debut_mesure = time.perf_counter()
+    signatures_minhash(offsets, hachages, coefficients, nb_threads=1)
+    temps_sequentiel = time.perf_counter() - debut_mesure
+    debut_mesure = time.perf_counter()
+    signatures_minhash(offsets, hachages, coefficients)
+    temps_parallele = time.perf_counter() - debut_mesure
+
+    ensembles = [
+        set(hachages[offsets[i] : offsets[i + 1]].tolist())
+        for i in range(len(offsets) - 1)
+    ]
+    candidats, rappels = [], []
+    for identifiant, ensemble in enumerate(ensembles):
+        jaccard = np.array(
+            [
+                len(ensemble & autre) / max(1, len(ensemble | autre))
+                for autre in ensembles
+            ]
+        )
+        jaccard[identifiant] = -1
+        exacts = set(np.argsort(-jaccard, kind="stable")[:k].tolist())
+        trouves = set(index_similarite.candidats(identifiant).tolist())
+        candidats.append((len(trouves) - 1) / (len(ensembles) - 1))
+        rappels.append(len(exacts & trouves) / k)
+
+    debut_mesure = time.perf_counter()
+    for fichier in index_similarite.documents.tolist():
+        index_similarite.similaires(str(fichier), k)
+    temps_recherche = time.perf_counter() - debut_mesure
+
+    return {
+        "sequentiel": temps_sequentiel,
+        "parallele": temps_parallele,
+        "candidats": float(np.mean(candidats)),
+        "rappel": float(np.mean(rappels)),
+        "recherche": temps_recherche / len(index_similarite),
+    }
+
+
+def mesure_memoire_postings(
+    moteur_adit: MoteurRecherche, requetes: list[str]
+) -> dict[str, float]:
+    """
+    Mesure la mémoire occupée par les postings et les allocations faites
+    par le moteur pour chaque requête.
+
+    :param moteur_adit: Le moteur de recherche.
+    :param requetes: Les requêtes sur lesquelles mesurer les allocations.
+    :return: Un dictionnaire (octets par posting dans l'index, octets par document
+    de l'ensemble de tous les documents, pic moyen et maximal d'allocation
+    par requête en octets)
+    """
+    index = moteur_adit.index.base
+    # Les codes de champ sont implicites : ils se déduisent de la table des offsets
+    octets_index = index.offsets.nbytes + sum(
+        index.section(nom).nbytes for nom in SECTIONS_COMPRESSION
+    )
+    # L'ensemble de tous les documents est un unique bitset
+    octets_univers = sys.getsizeof(moteur_adit.univers)
+
+    pics = []
+    for requete in requetes:
+        with redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            moteur_adit.rechercher(requete)
+            _, pic = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        pics.append(pic)
+
+    return {
+        "octets_par_posting": octets_index / int(index.offsets[-1]),
+        "octets_par_document": octets_univers / index.nb_documents,
+        "pic_moyen": sum(pics) / len(pics),
+        "pic_max": max(pics),
+    }
+
+
 if __name__ == "__main__":
     # Jeu de test : 10 requêtes du TD6
     REQUETES_TEST = [
@@ -79,10 +582,13 @@ if __name__ == "__main__":
         "Je veux les articles de 2014 et de la rubrique Focus et parlant de la santé.",
     ]
 
+    # Instance partagée : l'index n'est chargé qu'une fois pour toute l'évaluation
+    moteur_adit = moteur_partage()
+
     for requete in REQUETES_TEST:
         print("#####################################################")
         print(f"Requête : {requete}")
-        print(f"Liste de documents trouvés : {moteur(requete)}")
+        print(f"Liste de documents trouvés : {moteur_adit.rechercher(requete)}")
 
     # Docs pertinents définis manuellement pour chaque requête
     docs_pertinents = {
@@ -365,27 +871,14 @@ if __name__ == "__main__":
     plt.grid(axis="y")
     plt.show()
 
-    REQUETES_TEST = [
-        "Je voudrais les articles qui parlent de cuisine moléculaire.",
-        "Quels sont les articles sur la réalité virtuelle?",
-        "Je voudrais les articles qui parlent d’airbus ou du projet Taxibot.",
-        # "Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin.", Trop lent
-        "Quels sont les articles dont le titre contient biocarburant ou le contenu parle des bioénergies ?",
-        "Je souhaite les rubriques des articles parlant de nutrition ou de vins.",
-        "Articles dont la rubrique est 'Horizon Enseignement' mais qui ne parlent pas d’ingénieurs.",
-        "Quels sont les articles dont le titre contient le mot chimie?",
-        "Lister tous les articles dont la rubrique est Focus et qui ont des images.",
-        "Je veux les articles de 2014 et de la rubrique Focus et parlant de la santé.",
-    ]
-
     temps_moyens = {}
 
-    # boucle sur chaque requête (les 9)
+    # boucle sur chaque requête (les 10)
     for REQUETE in REQUETES_TEST:
         TEMPS_TOTAL = 0.0
         for _ in range(100):
             debut = time.time()
-            moteur(REQUETE)
+            moteur_adit.rechercher(REQUETE)
             fin = time.time()
             TEMPS_TOTAL += fin - debut
         temps_moyens[REQUETE] = round(TEMPS_TOTAL / 100, 4)
@@ -407,18 +900,96 @@ if __name__ == "__main__":
     for i, (req, t) in enumerate(temps_moyens.items()):
         print(f"Q{i+1} : {t:.4f} sec — {req}")
 
+    mesures = benchmark_dictionnaire_termes(REQUETES_EXEMPLES)
+    print(
+        f"Accès à l'index pour {mesures['termes']} termes "
+        f"({len(REQUETES_EXEMPLES)} requêtes) : "
+        f"dataframe {mesures['dataframe'] * 1000:.2f} ms, "
+        f"dictionnaire {mesures['dictionnaire'] * 1000:.4f} ms"
+    )
+
+    memoire = mesure_memoire_postings(moteur_adit, REQUETES_EXEMPLES)
+    print(
+        f"Mémoire : {memoire['octets_par_posting']:.1f} octets par posting dans l'index, "
+        f"{memoire['octets_par_document']:.1f} octets par document pour l'univers, "
+        f"pic d'allocation par requête {memoire['pic_moyen'] / 1024:.0f} Ko en moyenne "
+        f"({memoire['pic_max'] / 1024:.0f} Ko au maximum)"
+    )
+
+    mesures = benchmark_elagage(moteur_adit, REQUETES_EXEMPLES)
+    print(
+        f"Classement BM25 des {mesures['requetes']} requêtes sur les articles "
+        f"(top {NB_RESULTATS_CLASSES}) : {mesures['evalues']} postings évalués, "
+        f"{mesures['ignores']} ignorés ; "
+        f"sans élagage {mesures['sans_elagage'] * 1000:.2f} ms, "
+        f"avec élagage {mesures['avec_elagage'] * 1000:.2f} ms"
+    )
+
+    mesures = benchmark_analyse(moteur_adit, REQUETES_EXEMPLES)
+    print(
+        f"Analyse des requêtes : {mesures['fonctions'] * 1000:.2f} ms par requête "
+        f"fonction par fonction, {mesures['analyseur'] * 1000:.2f} ms avec l'analyseur"
+    )
+
+    mesures = benchmark_cache(REQUETES_EXEMPLES, repetitions=10)
+    print(
+        f"Requêtes répétées : {mesures['sans'] * 1000:.2f} ms par requête sans cache, "
+        f"{mesures['avec'] * 1000:.2f} ms avec cache (succès : "
+        f"{mesures['taux_resultats']:.0%} des résultats, "
+        f"{mesures['taux_corrections']:.0%} des corrections)"
+    )
+
+    mesures = benchmark_vectoriel(moteur_adit, REQUETES_EXEMPLES)
+    print(
+        f"Recherche vectorielle ({mesures['poids']} poids tf-idf non nuls, "
+        f"chargés en {mesures['chargement'] * 1000:.2f} ms) : "
+        f"{mesures['vectoriel'] * 1000:.2f} ms par requête, "
+        f"recherche booléenne {mesures['booleen'] * 1000:.2f} ms"
+    )
+
+    mesures = benchmark_latent(moteur_adit, REQUETES_EXEMPLES)
+    print(
+        f"Espace latent : SVD en {mesures['construction']:.2f} s "
+        f"(pic {mesures['pic_construction'] / 2**20:.0f} Mo), vecteurs des documents "
+        f"{mesures['octets_latents'] / 1024:.0f} Ko, projection "
+        f"{mesures['octets_projection'] / 1024:.0f} Ko (matrice creuse "
+        f"{mesures['octets_creux'] / 1024:.0f} Ko) ; "
+        f"{mesures['latente'] * 1000:.2f} ms par requête latente, "
+        f"{mesures['vectorielle'] * 1000:.2f} ms par requête vectorielle"
+    )
+    print(
+        f"Rappel (top {NB_RESULTATS_CLASSES} pour les recherches vectorielle et latente) :"
+    )
+    print(comparaison_rappel(moteur_adit, docs_pertinents).round(2).to_string())
+
+    mesures = benchmark_similaires(moteur_adit)
+    print(
+        f"Signatures MinHash : {mesures['sequentiel'] * 1000:.1f} ms sur un thread, "
+        f"{mesures['parallele'] * 1000:.1f} ms en parallèle ; articles similaires : "
+        f"{mesures['candidats']:.0%} des articles examinés, rappel des "
+        f"{NB_SIMILAIRES} plus similaires {mesures['rappel']:.0%}, "
+        f"{mesures['recherche'] * 1000:.2f} ms par article"
+    )
+
     REQUETE_LENTE = "Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin."
 
     temps_execution = []
     for _ in range(4):
         debut = time.time()
-        moteur(REQUETE_LENTE)
+        moteur_adit.rechercher(REQUETE_LENTE)
         fin = time.time()
         temps_execution.append(fin - debut)
 
     temps_moyen = round(sum(temps_execution) / len(temps_execution), 4)
     print(f"Temps moyen pour la requête bulletins : {temps_moyen} secondes")
 
+    mesures = benchmark_agregation(moteur_adit, REQUETE_LENTE)
+    print(
+        f"Agrégation des {mesures['articles']} articles en bulletins : "
+        f"parcours des postings {mesures['avant'] * 1000:.3f} ms, "
+        f"table article → numéro {mesures['apres'] * 1000:.3f} ms"
+    )
+
     plt.figure(figsize=(10, 5))
     plt.plot(temps_execution, marker="o")
     plt.xlabel("Exécution")
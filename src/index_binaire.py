@@ -0,0 +1,843 @@
+"""
+Format binaire de l'index inversé, lisible par projection mémoire (mmap).
+
+Le fichier contient un en-tête décrivant ses sections, puis les sections
+elles-mêmes sous forme de tableaux numpy bruts alignés sur 8 octets :
+- "lexique" : les termes triés, encodés en utf-8 et séparés par des retours à la ligne ;
+- "documents" : la table des documents, qui associe à chaque identifiant dense
+  (0, 1, 2...) le numéro de fichier de l'article ;
+- "postings_offsets" : les postings sont partitionnés par champ ; pour le terme t
+  et le champ de code c (indice dans la liste des champs), avec k = t * nb_champs + c,
+  ils sont entre offsets[k] et offsets[k + 1] ;
+- "blocs_largeurs", "blocs_sauts", "blocs_donnees" : les identifiants denses des
+  documents, triés pour chaque couple (terme, champ), compressés par blocs
+  (écarts empaquetés sur le nombre de bits nécessaire, voir compression_index.py) ;
+- "postings_frequences" : le nombre d'occurrences du terme dans le champ
+  du document, dans l'ordre des postings ;
+- "longueurs_documents" : le nombre de termes de chaque champ de chaque document
+  (tableau nb_documents × nb_champs), d'où se déduisent les longueurs moyennes
+  de la collection ;
+- "positions_offsets", "positions_deltas" : les positions (rang du mot dans le champ)
+  du terme dans le document, pour chaque posting ; celles du posting j sont entre
+  positions_offsets[j] et positions_offsets[j + 1], encodées par différences
+  (la première position, puis l'écart avec la précédente) ;
+- "bornes_bm25" : pour chaque couple (terme, champ), le plus grand facteur de
+  fréquence BM25 (voir composante_bm25) de ses postings, calculé avec K1, B et les
+  longueurs moyennes de l'index ; multiplié par l'idf et le poids du champ, il borne
+  la contribution du terme au score de n'importe quel document ;
+- "dates_ordinaux", "dates_docs", "dates_mois" : l'index des dates de publication,
+  c'est-à-dire les dates (ordinaux grégoriens) triées dans l'ordre croissant,
+  le document correspondant à chacune et son mois (facette pour les exclusions) ;
+- "articles_numero", "articles_rubrique" : pour chaque document, l'identifiant
+  (dans le lexique) du terme de son champ numero ou rubrique, -1 s'il n'en a pas.
+  Les correspondances inverses (bulletin ou rubrique → articles) sont les postings
+  du terme dans ce champ.
+
+Le fichier est ouvert sans être analysé : les tableaux sont des vues sur les pages
+projetées en mémoire, partagées entre les processus qui ouvrent le même index.
+Les identifiants des documents sont décompressés à la demande, liste par liste.
+"""
+
+import json
+import mmap
+import struct
+from collections import defaultdict
+from itertools import accumulate
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from compression_index import (
+    SECTIONS_COMPRESSION,
+    PostingsCompresses,
+    benchmark_compression,
+    compression_postings,
+    postings_synthetiques,
+)
+
+# Balises indexées : le code d'un champ dans l'index binaire est sa position
+CHAMPS_INDEXES = ("fichier", "numero", "date", "rubrique", "titre", "texte", "images")
+
+MAGIC = b"ADITIDX1"
+VERSION = 9
+ALIGNEMENT = 8
+# Champs à valeur unique par article, dont la valeur est conservée pour chaque document
+CHAMPS_ARTICLES = ("numero", "rubrique")
+
+# Paramètres de BM25 : saturation de la fréquence des termes
+# et normalisation par la longueur des champs
+K1 = 1.2
+B = 0.75
+
+# magic, version, taille de l'en-tête json
+FORMAT_ENTETE = "<8sII"
+
+
+def ecriture_sections(
+    fichier_sortie: str,
+    sections: dict[str, np.ndarray],
+    meta: dict,
+    version: int = VERSION,
+) -> None:
+    """
+    Écrit des tableaux numpy dans un fichier binaire à sections.
+
+    :param fichier_sortie: Le chemin du fichier binaire à écrire.
+    :param sections: Les tableaux à écrire, indexés par nom de section.
+    :param meta: Des métadonnées (sérialisables en json) à conserver dans l'en-tête.
+    :param version: La version du format des sections (celle de l'index inversé par défaut).
+    :return: None
+    """
+    # Première passe : calcul des positions de chaque section
+    description = {}
+    position = 0
+    for nom, tableau in sections.items():
+        description[nom] = {
+            "dtype": tableau.dtype.str,
+            "shape": list(tableau.shape),
+            "offset": position,
+        }
+        position += -(-tableau.nbytes // ALIGNEMENT) * ALIGNEMENT
+
+    entete = json.dumps(
+        {"sections": description, "meta": meta}, ensure_ascii=False
+    ).encode("utf-8")
+    debut_donnees = struct.calcsize(FORMAT_ENTETE) + len(entete)
+    debut_donnees = -(-debut_donnees // ALIGNEMENT) * ALIGNEMENT
+
+    with open(fichier_sortie, "wb") as f:
+        f.write(struct.pack(FORMAT_ENTETE, MAGIC, version, len(entete)))
+        f.write(entete)
+        for nom, tableau in sections.items():
+            f.seek(debut_donnees + description[nom]["offset"])
+            f.write(np.ascontiguousarray(tableau).tobytes())
+        # Bourrage final pour que la dernière section soit complète
+        f.truncate(debut_donnees + position)
+
+
+class FichierSections:
+    """
+    Fichier binaire à sections projeté en mémoire.
+    Chaque section est accessible comme un tableau numpy en lecture seule,
+    vue sur les pages projetées (sans copie ni analyse du contenu).
+    """
+
+    def __init__(self, chemin: str, version_attendue: int = VERSION):
+        """
+        Ouvre et projette en mémoire un fichier binaire à sections.
+        :param chemin: Le chemin du fichier.
+        :param version_attendue: La version du format attendue.
+        """
+        self.chemin = chemin
+        with open(chemin, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, taille_entete = struct.unpack_from(FORMAT_ENTETE, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{chemin} n'est pas un index binaire")
+        if version != version_attendue:
+            raise ValueError(f"{chemin} : version {version} non supportée")
+
+        debut_entete = struct.calcsize(FORMAT_ENTETE)
+        entete = json.loads(
+            self._mmap[debut_entete : debut_entete + taille_entete].decode("utf-8")
+        )
+        self._debut_donnees = (
+            -(-(debut_entete + taille_entete) // ALIGNEMENT) * ALIGNEMENT
+        )
+        self._description = entete["sections"]
+        self.meta = entete["meta"]
+
+    def __contains__(self, nom: str) -> bool:
+        return nom in self._description
+
+    def section(self, nom: str) -> np.ndarray:
+        """
+        Renvoie une section du fichier sous forme de tableau numpy.
+        :param nom: Le nom de la section.
+        :return: Une vue en lecture seule sur les données projetées.
+        """
+        description = self._description[nom]
+        dtype = np.dtype(description["dtype"])
+        shape = tuple(description["shape"])
+        return np.frombuffer(
+            self._mmap,
+            dtype=dtype,
+            count=int(np.prod(shape)),
+            offset=self._debut_donnees + description["offset"],
+        ).reshape(shape)
+
+
+def construction_sections(
+    lignes: Iterable[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]],
+    champs: Tuple[str, ...] = CHAMPS_INDEXES,
+) -> dict[str, np.ndarray]:
+    """
+    Construit les sections de l'index binaire à partir des lignes de l'index.
+
+    :param lignes: Les couples (terme, liste des (numéro de fichier, champ, positions)),
+    dans n'importe quel ordre.
+    :param champs: La liste des champs indexés (le code d'un champ est sa position).
+    :return: Les sections de l'index binaire.
+    """
+    code_champ = {champ: code for code, champ in enumerate(champs)}
+    lignes = sorted(lignes, key=lambda ligne: ligne[0])
+
+    # Identifiants denses : les fichiers sont numérotés dans l'ordre croissant
+    documents = np.array(
+        sorted({posting[0] for _, postings in lignes for posting in postings}),
+        dtype=np.int32,
+    )
+    identifiant = {int(fichier): i for i, fichier in enumerate(documents)}
+
+    # Postings triés par (terme, champ, document) : chaque couple (terme, champ)
+    # occupe une plage contiguë
+    nb_champs = len(champs)
+    comptes = np.zeros(len(lignes) * nb_champs, dtype=np.int64)
+    longueurs = np.zeros((len(documents), nb_champs), dtype=np.uint32)
+    docs = []
+    positions = []
+    for i, (_, postings) in enumerate(lignes):
+        for code, doc, positions_posting in sorted(
+            (code_champ[champ], identifiant[doc], positions_posting)
+            for doc, champ, positions_posting in postings
+        ):
+            comptes[i * nb_champs + code] += 1
+            longueurs[doc, code] += len(positions_posting)
+            docs.append(doc)
+            positions.append(positions_posting)
+
+    offsets = np.zeros(len(comptes) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum(comptes)
+    docs = np.array(docs, dtype=np.int32)
+    frequences = np.array([len(posting) for posting in positions], dtype=np.uint16)
+
+    lexique = "\n".join(terme for terme, _ in lignes).encode("utf-8")
+    return {
+        "lexique": np.frombuffer(lexique, dtype=np.uint8),
+        "documents": documents,
+        "postings_offsets": offsets,
+        **compression_postings(offsets, docs),
+        "postings_frequences": frequences,
+        "longueurs_documents": longueurs,
+        "bornes_bm25": construction_bornes_bm25(offsets, docs, frequences, longueurs),
+        **construction_positions(positions),
+        **construction_index_dates(lignes, identifiant),
+        **construction_champs_articles(lignes, identifiant, code_champ),
+    }
+
+
+def encodage_positions(positions: Iterable[int]) -> List[int]:
+    """
+    Encode des positions croissantes par différences : la première position,
+    puis l'écart avec la précédente.
+
+    :param positions: Les positions, triées.
+    :return: Les différences.
+    """
+    precedente = 0
+    differences = []
+    for position in positions:
+        differences.append(position - precedente)
+        precedente = position
+    return differences
+
+
+def decodage_positions(differences: Iterable[int]) -> List[int]:
+    """
+    Décode des positions encodées par encodage_positions.
+
+    :param differences: Les différences.
+    :return: Les positions.
+    """
+    return list(accumulate(differences))
+
+
+def construction_positions(positions: List[Tuple[int, ...]]) -> dict[str, np.ndarray]:
+    """
+    Construit les sections des positions à partir des positions de chaque posting.
+
+    :param positions: Les positions (triées) de chaque posting, dans l'ordre des postings.
+    :return: Les sections "positions_offsets" et "positions_deltas".
+    """
+    offsets = np.zeros(len(positions) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([len(posting) for posting in positions])
+    deltas = [delta for posting in positions for delta in encodage_positions(posting)]
+    # Les écarts tiennent sur 16 bits, sauf dans un champ de plus de 65535 mots
+    type_deltas = np.promote_types(
+        np.min_scalar_type(max(deltas, default=0)), np.uint16
+    )
+    return {
+        "positions_offsets": offsets,
+        "positions_deltas": np.array(deltas, dtype=type_deltas),
+    }
+
+
+def composante_bm25(
+    frequences: np.ndarray,
+    longueurs: np.ndarray,
+    longueur_moyenne: float | np.ndarray,
+    k1: float = K1,
+    b: float = B,
+) -> np.ndarray:
+    """
+    Calcule le facteur de fréquence BM25 de postings (le score BM25 d'un terme
+    dans un champ est ce facteur multiplié par l'idf du terme).
+
+    :param frequences: Le nombre d'occurrences du terme dans le champ de chaque document.
+    :param longueurs: La longueur du champ de chaque document.
+    :param longueur_moyenne: La longueur moyenne du champ dans la collection.
+    :param k1: Le paramètre de saturation de la fréquence des termes.
+    :param b: Le paramètre de normalisation par la longueur du champ.
+    :return: Les facteurs, entre 0 et k1 + 1.
+    """
+    normalisation = k1 * (1 - b + b * longueurs / longueur_moyenne)
+    return frequences * (k1 + 1) / (frequences + normalisation)
+
+
+def construction_bornes_bm25(
+    offsets: np.ndarray,
+    docs: np.ndarray,
+    frequences: np.ndarray,
+    longueurs: np.ndarray,
+) -> np.ndarray:
+    """
+    Calcule, pour chaque couple (terme, champ), le plus grand facteur BM25
+    de ses postings.
+
+    :param offsets: Les offsets des postings de chaque couple (terme, champ).
+    :param docs: Les identifiants des documents des postings.
+    :param frequences: Les fréquences des postings.
+    :param longueurs: Les longueurs des champs de chaque document.
+    :return: Les bornes (0 pour un couple sans postings), arrondies vers le haut.
+    """
+    nb_champs = longueurs.shape[1]
+    codes = np.repeat(
+        np.tile(np.arange(nb_champs), (len(offsets) - 1) // nb_champs),
+        np.diff(offsets),
+    )
+    moyennes = np.maximum(longueurs.mean(axis=0, dtype=np.float64), 1.0)
+    composantes = composante_bm25(
+        frequences, longueurs[docs, codes].astype(np.float64), moyennes[codes]
+    )
+
+    bornes = np.zeros(len(offsets) - 1, dtype=np.float64)
+    non_vides = np.diff(offsets) > 0
+    if len(composantes):
+        bornes[non_vides] = np.maximum.reduceat(
+            composantes, offsets[:-1][non_vides].astype(np.int64)
+        )
+    # Arrondi vers le haut pour rester une borne après la conversion en float32
+    return np.nextafter(bornes.astype(np.float32), np.float32(np.inf))
+
+
+def construction_champs_articles(
+    lignes: List[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]],
+    identifiant: dict[int, int],
+    code_champ: dict[str, int],
+) -> dict[str, np.ndarray]:
+    """
+    Construit, pour chaque champ de CHAMPS_ARTICLES, la table document → terme.
+
+    :param lignes: Les couples (terme, liste des (numéro de fichier, champ, positions)),
+    triés par terme.
+    :param identifiant: La table numéro de fichier → identifiant dense.
+    :param code_champ: La table champ → code.
+    :return: Les sections "articles_<champ>".
+    """
+    sections = {}
+    for champ in CHAMPS_ARTICLES:
+        if champ not in code_champ:
+            continue
+        termes = np.full(len(identifiant), -1, dtype=np.int32)
+        for i, (_, postings) in enumerate(lignes):
+            for doc, champ_posting, _ in postings:
+                if champ_posting != champ:
+                    continue
+                if termes[identifiant[doc]] not in (-1, i):
+                    raise ValueError(f"L'article {doc} a plusieurs valeurs de {champ}")
+                termes[identifiant[doc]] = i
+        sections[f"articles_{champ}"] = termes
+    return sections
+
+
+def construction_index_dates(
+    lignes: List[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]],
+    identifiant: dict[int, int],
+) -> dict[str, np.ndarray]:
+    """
+    Construit les sections de l'index des dates à partir des termes du champ date.
+
+    :param lignes: Les couples (terme, liste des (numéro de fichier, champ, positions)).
+    :param identifiant: La table numéro de fichier → identifiant dense.
+    :return: Les sections "dates_ordinaux", "dates_docs" et "dates_mois".
+    """
+    dates = []
+    for terme, postings in lignes:
+        try:
+            date_publication = datetime.strptime(terme, "%d/%m/%Y").date()
+        except ValueError:
+            continue
+        dates.extend(
+            (date_publication.toordinal(), identifiant[doc], date_publication.month)
+            for doc, champ, _ in postings
+            if champ == "date"
+        )
+    dates = np.array(sorted(dates), dtype=np.int32).reshape(-1, 3)
+    return {
+        "dates_ordinaux": np.ascontiguousarray(dates[:, 0]),
+        "dates_docs": np.ascontiguousarray(dates[:, 1]),
+        "dates_mois": dates[:, 2].astype(np.uint8),
+    }
+
+
+def sauvegarde_index_binaire(
+    index_inverse: dict[str, dict[str, dict[str, List[int]]]], fichier_sortie: str
+) -> None:
+    """
+    Sauvegarde un index inversé (construit par creation_index_inverse)
+    au format binaire.
+
+    :param index_inverse: Dictionnaire contenant l'index inversé
+    (balise → lemme → doc_id → positions).
+    :param fichier_sortie: Chemin du fichier binaire de sortie.
+    :return: None
+    """
+    ecriture_sections(
+        fichier_sortie,
+        construction_sections(lignes_index(index_inverse)),
+        {"champs": CHAMPS_INDEXES},
+    )
+
+
+def lignes_index(
+    index_inverse: dict[str, dict[str, dict[str, List[int]]]],
+) -> List[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]]:
+    """
+    Regroupe les postings d'un index inversé (construit par creation_index_inverse)
+    par terme, tous champs confondus.
+
+    :param index_inverse: Dictionnaire contenant l'index inversé
+    (balise → lemme → doc_id → positions).
+    :return: La liste des couples (terme, liste des (numéro de fichier, champ, positions)).
+    """
+    postings_par_mot = defaultdict(list)
+    for tag, mots in index_inverse.items():
+        for mot, docs in mots.items():
+            postings_par_mot[mot].extend(
+                (int(doc_id), tag, tuple(positions))
+                for doc_id, positions in docs.items()
+            )
+    return list(postings_par_mot.items())
+
+
+def lecture_index_texte(
+    fichier_texte: str,
+) -> List[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]]:
+    """
+    Lit un index inversé au format texte (terme,doc:champ:fréquence:positions,...),
+    les positions étant encodées par différences et séparées par des espaces.
+
+    :param fichier_texte: Le chemin de l'index texte.
+    :return: La liste des couples (terme, liste des (numéro de fichier, champ, positions)).
+    """
+    lignes = []
+    with open(fichier_texte, "r", encoding="utf-8") as f:
+        for ligne in f:
+            terme, *postings = ligne.rstrip("\n").split(",")
+            lignes.append(
+                (
+                    terme,
+                    [
+                        (
+                            int(doc),
+                            champ,
+                            tuple(decodage_positions(map(int, positions.split()))),
+                        )
+                        for doc, champ, _, positions in (
+                            posting.split(":") for posting in postings
+                        )
+                    ],
+                )
+            )
+    return lignes
+
+
+def conversion_index_texte(fichier_texte: str, fichier_binaire: str) -> None:
+    """
+    Convertit un index inversé au format texte vers le format binaire.
+
+    :param fichier_texte: Le chemin de l'index texte.
+    :param fichier_binaire: Le chemin de l'index binaire à écrire.
+    :return: None
+    """
+    ecriture_sections(
+        fichier_binaire,
+        construction_sections(lecture_index_texte(fichier_texte)),
+        {"champs": CHAMPS_INDEXES},
+    )
+
+
+class IndexDates:
+    """
+    Index des dates de publication : les dates sont des ordinaux triés,
+    une plage de dates se trouve par deux recherches dichotomiques.
+    """
+
+    def __init__(self, ordinaux: np.ndarray, docs: np.ndarray, mois: np.ndarray):
+        """
+        :param ordinaux: Les dates (ordinaux grégoriens), triées.
+        :param docs: Le document publié à chacune de ces dates.
+        :param mois: Le mois de chacune de ces dates (1 à 12).
+        """
+        self.ordinaux = ordinaux
+        self.docs = docs
+        self.mois = mois
+
+    def entre(
+        self, date_min: Optional[date] = None, date_max: Optional[date] = None
+    ) -> np.ndarray:
+        """
+        Renvoie les documents publiés entre deux dates (bornes incluses).
+        :param date_min: La date minimale (aucune borne si None).
+        :param date_max: La date maximale (aucune borne si None).
+        :return: Les identifiants des documents.
+        """
+        debut = (
+            0
+            if date_min is None
+            else np.searchsorted(self.ordinaux, date_min.toordinal(), side="left")
+        )
+        fin = (
+            len(self.ordinaux)
+            if date_max is None
+            else np.searchsorted(self.ordinaux, date_max.toordinal(), side="right")
+        )
+        return self.docs[debut:fin]
+
+    def du_mois(self, mois: int) -> np.ndarray:
+        """
+        Renvoie les documents publiés un mois donné, quelle que soit l'année.
+        :param mois: Le mois (1 à 12).
+        :return: Les identifiants des documents.
+        """
+        return self.docs[self.mois == mois]
+
+
+class IndexBinaire(FichierSections):
+    """
+    Index inversé au format binaire, projeté en mémoire.
+    """
+
+    def __init__(self, chemin: str = "data/index_inverse.bin"):
+        """
+        Ouvre un index binaire. Seul le lexique est décodé à l'ouverture.
+        :param chemin: Le chemin de l'index binaire.
+        """
+        super().__init__(chemin)
+        self.champs = tuple(self.meta["champs"])
+        self.nb_champs = len(self.champs)
+        self.codes = {champ: code for code, champ in enumerate(self.champs)}
+        self.documents = self.section("documents")
+        self.offsets = self.section("postings_offsets")
+        self.postings_compresses = PostingsCompresses(
+            self.offsets, {nom: self.section(nom) for nom in SECTIONS_COMPRESSION}
+        )
+        self.frequences = self.section("postings_frequences")
+        self.longueurs = self.section("longueurs_documents")
+        self.bornes = self.section("bornes_bm25")
+        self.positions = (
+            self.section("positions_offsets"),
+            self.section("positions_deltas"),
+        )
+        self.dates = IndexDates(
+            self.section("dates_ordinaux"),
+            self.section("dates_docs"),
+            self.section("dates_mois"),
+        )
+
+        # Terme du champ numero (ou rubrique) de chaque document
+        self.terme_par_document = {
+            champ: self.section(f"articles_{champ}")
+            for champ in CHAMPS_ARTICLES
+            if f"articles_{champ}" in self
+        }
+
+        lexique = self.section("lexique").tobytes().decode("utf-8")
+        self.termes = lexique.split("\n") if lexique else []
+        self.identifiants = {terme: i for i, terme in enumerate(self.termes)}
+
+    def __len__(self) -> int:
+        return len(self.termes)
+
+    @property
+    def nb_documents(self) -> int:
+        """
+        Le nombre de documents indexés (les identifiants vont de 0 à nb_documents - 1).
+        """
+        return len(self.documents)
+
+    def identifiant_document(self, fichier: int) -> Optional[int]:
+        """
+        Renvoie l'identifiant dense d'un document à partir de son numéro de fichier.
+        :param fichier: Le numéro de fichier de l'article.
+        :return: Son identifiant, ou None s'il n'est pas indexé.
+        """
+        position = int(np.searchsorted(self.documents, fichier))
+        if position < len(self.documents) and self.documents[position] == fichier:
+            return position
+        return None
+
+    def recherche_terme(self, terme: str) -> Optional[int]:
+        """
+        Renvoie l'identifiant d'un terme dans le lexique.
+        :param terme: Le terme recherché.
+        :return: Son identifiant, ou None s'il n'est pas indexé.
+        """
+        return self.identifiants.get(terme)
+
+    def plage(self, identifiant: int, code: int) -> Tuple[int, int]:
+        """
+        Renvoie la plage occupée dans les postings par un couple (terme, champ).
+        :param identifiant: L'identifiant du terme.
+        :param code: Le code du champ.
+        :return: Un tuple (début, fin).
+        """
+        k = identifiant * self.nb_champs + code
+        return int(self.offsets[k]), int(self.offsets[k + 1])
+
+    def frequences_postings(
+        self, terme: str, champ: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Renvoie les documents dans lesquels un terme apparaît dans un champ,
+        avec le nombre d'occurrences du terme dans chacun.
+        :param terme: Le terme recherché.
+        :param champ: Le champ.
+        :return: Un tuple (identifiants des documents, fréquences).
+        """
+        identifiant = self.identifiants.get(terme)
+        if identifiant is None:
+            return np.zeros(0, dtype=np.int32), self.frequences[:0]
+        k = identifiant * self.nb_champs + self.codes[champ]
+        debut, fin = self.plage(identifiant, self.codes[champ])
+        return self.postings_compresses.liste(k), self.frequences[debut:fin]
+
+    def longueur_moyenne(self, champ: str) -> float:
+        """
+        Renvoie la longueur moyenne d'un champ dans l'index (celle des bornes BM25).
+        :param champ: Le champ.
+        :return: La longueur moyenne (au moins 1).
+        """
+        colonne = self.longueurs[:, self.codes[champ]]
+        return max(float(colonne.mean(dtype=np.float64)) if len(colonne) else 0.0, 1.0)
+
+    def borne_bm25(self, terme: str, champ: str) -> float:
+        """
+        Renvoie le plus grand facteur BM25 d'un terme dans un champ (voir "bornes_bm25").
+        :param terme: Le terme.
+        :param champ: Le champ.
+        :return: La borne, 0 si le terme n'a pas de postings dans le champ.
+        """
+        identifiant = self.identifiants.get(terme)
+        if identifiant is None:
+            return 0.0
+        return float(self.bornes[identifiant * self.nb_champs + self.codes[champ]])
+
+    def postings(self, terme: str, champs: Iterable[str]) -> np.ndarray:
+        """
+        Renvoie les documents dans lesquels un terme apparaît dans un
+        ou plusieurs champs, sans parcourir les postings des autres champs.
+        :param terme: Le terme recherché.
+        :param champs: Les champs dans lesquels chercher le terme.
+        :return: Les identifiants des documents, triés et sans doublons
+        (vide si le terme n'est pas indexé).
+        """
+        identifiant = self.identifiants.get(terme)
+        if identifiant is None:
+            return np.zeros(0, dtype=np.int32)
+        listes = sorted(
+            identifiant * self.nb_champs + self.codes[champ] for champ in champs
+        )
+        if len(listes) == 1:
+            return self.postings_compresses.liste(listes[0])
+        return np.unique(self.postings_compresses.listes(listes))
+
+    def intersection(self, termes: List[str], champ: str) -> np.ndarray:
+        """
+        Renvoie les documents dans lesquels tous les termes apparaissent dans
+        un champ. Seule la liste la plus courte est entièrement décodée : dans les
+        autres, les pointeurs de saut désignent les blocs à décoder.
+        :param termes: Les termes recherchés.
+        :param champ: Le champ.
+        :return: Les identifiants des documents, triés.
+        """
+        listes = []
+        for terme in termes:
+            identifiant = self.identifiants.get(terme)
+            if identifiant is None:
+                return np.zeros(0, dtype=np.int32)
+            listes.append(identifiant * self.nb_champs + self.codes[champ])
+        return self.postings_compresses.intersection(listes)[0]
+
+    def positions_postings(self, postings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Décode les positions d'une liste de postings, sans boucle sur les postings.
+        :param postings: Les rangs des postings (comme dans les offsets).
+        :return: Un tuple (rang dans la liste du posting de chaque position, positions),
+        les positions de chaque posting étant triées.
+        """
+        offsets, deltas = self.positions
+        debuts = offsets[postings].astype(np.int64)
+        longueurs = offsets[np.asarray(postings) + 1].astype(np.int64) - debuts
+        rangs = np.repeat(np.arange(len(longueurs)), longueurs)
+        # Indice, dans la sortie, de la première position de chaque posting
+        premieres = np.cumsum(longueurs) - longueurs
+        indices = np.arange(int(longueurs.sum())) + np.repeat(
+            debuts - premieres, longueurs
+        )
+        differences = deltas[indices].astype(np.int64)
+        # Somme cumulée des différences, remise à zéro au début de chaque posting
+        cumul = np.cumsum(differences)
+        return rangs, cumul - (cumul - differences)[premieres][rangs]
+
+    def phrase(self, termes: List[str], champ: str, ecart: int = 0) -> np.ndarray:
+        """
+        Renvoie les documents dans lesquels des termes apparaissent dans l'ordre,
+        dans un même champ, avec au plus `ecart` mots intercalés au total
+        (0 pour une expression exacte).
+
+        Les postings sont d'abord intersectés, en partant du terme le plus rare :
+        seules les positions des documents candidats sont décodées. Pour chaque
+        occurrence du premier terme, on cherche ensuite (par fusion des listes
+        de positions triées) l'occurrence suivante la plus proche de chaque terme.
+
+        :param termes: Les termes de l'expression, dans l'ordre.
+        :param champ: Le champ.
+        :param ecart: Le nombre maximal de mots intercalés.
+        :return: Les identifiants des documents, triés.
+        """
+        candidats = self.intersection(termes, champ)
+        if len(termes) == 1 or len(candidats) == 0:
+            return candidats
+
+        # Une occurrence est codée par (document << 32) | position : les clés
+        # d'un terme sont triées, et deux documents différents sont très éloignés
+        cles = []
+        for terme in termes:
+            k = self.identifiants[terme] * self.nb_champs + self.codes[champ]
+            postings = self.postings_compresses.rangs_postings(k, candidats)
+            rangs, positions = self.positions_postings(postings)
+            cles.append((candidats[rangs].astype(np.int64) << 32) | positions)
+
+        debuts = fins = cles[0]
+        for i, cles_terme in enumerate(cles[1:], start=1):
+            suivantes = np.searchsorted(cles_terme, fins, side="right")
+            trouvees = suivantes < len(cles_terme)
+            debuts, fins = debuts[trouvees], cles_terme[suivantes[trouvees]]
+            proches = fins - debuts <= i + ecart
+            debuts, fins = debuts[proches], fins[proches]
+        return np.unique(debuts >> 32).astype(candidats.dtype)
+
+    def termes_documents(self, docs: np.ndarray, champ: str) -> List[str]:
+        """
+        Renvoie les termes distincts d'un champ de CHAMPS_ARTICLES pour
+        un ensemble de documents (ex : les numéros de bulletin d'une liste d'articles).
+        :param docs: Les identifiants denses des documents.
+        :param champ: Le champ ("numero" ou "rubrique").
+        :return: La liste des termes, dans l'ordre du lexique.
+        """
+        identifiants = np.unique(self.terme_par_document[champ][docs])
+        return [self.termes[i] for i in identifiants[identifiants >= 0].tolist()]
+
+    def termes_champ(self, champ: str) -> List[str]:
+        """
+        Renvoie les termes ayant au moins un posting dans un champ.
+        :param champ: Le champ.
+        :return: La liste des termes, dans l'ordre du lexique.
+        """
+        longueurs = np.diff(self.offsets).reshape(-1, self.nb_champs)
+        return [
+            self.termes[i]
+            for i in np.flatnonzero(longueurs[:, self.codes[champ]]).tolist()
+        ]
+
+    def docs_champ(self, champ: str) -> np.ndarray:
+        """
+        Renvoie les documents ayant au moins un posting dans un champ.
+        :param champ: Le champ.
+        :return: Les identifiants des documents, triés.
+        """
+        listes = np.arange(self.codes[champ], len(self.offsets) - 1, self.nb_champs)
+        return np.unique(self.postings_compresses.listes(listes))
+
+    def codes_postings(self) -> np.ndarray:
+        """
+        Renvoie le code du champ de chaque posting (reconstruit à partir des offsets).
+        :return: Un tableau parallèle aux postings.
+        """
+        codes = np.tile(np.arange(self.nb_champs, dtype=np.uint8), len(self.termes))
+        return np.repeat(codes, np.diff(self.offsets))
+
+    def lignes(self) -> List[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]]:
+        """
+        Reconstruit les lignes de l'index (le format d'entrée de construction_sections).
+        :return: La liste des couples (terme, liste des (numéro de fichier, champ, positions)).
+        """
+        fichiers = self.documents[self.postings_compresses.decompression()].tolist()
+        champs = [self.champs[code] for code in self.codes_postings().tolist()]
+        _, positions = self.positions_postings(np.arange(int(self.offsets[-1])))
+        offsets = self.positions[0].tolist()
+        positions = positions.tolist()
+        positions = [
+            tuple(positions[debut:fin]) for debut, fin in zip(offsets, offsets[1:])
+        ]
+        debuts = self.offsets[:: self.nb_champs].tolist()
+        return [
+            (
+                terme,
+                list(zip(fichiers[debut:fin], champs[debut:fin], positions[debut:fin])),
+            )
+            for terme, debut, fin in zip(self.termes, debuts, debuts[1:])
+        ]
+
+
+def verification_aller_retour(fichier_texte: str, fichier_binaire: str) -> bool:
+    """
+    Vérifie que l'index binaire contient exactement les mêmes postings
+    que l'index texte dont il est issu.
+
+    :param fichier_texte: Le chemin de l'index texte.
+    :param fichier_binaire: Le chemin de l'index binaire.
+    :return: True si les deux index sont identiques.
+    """
+    lignes = sorted(lecture_index_texte(fichier_texte), key=lambda ligne: ligne[0])
+    relues = IndexBinaire(fichier_binaire).lignes()
+    if [terme for terme, _ in lignes] != [terme for terme, _ in relues]:
+        return False
+    return all(
+        sorted(postings) == sorted(postings_relus)
+        for (_, postings), (_, postings_relus) in zip(lignes, relues)
+    )
+
+
+if __name__ == "__main__":
+    print("Conversion de l'index texte en index binaire...")
+    conversion_index_texte("data/index_inverse.txt", "data/index_inverse.bin")
+    print("Vérification de l'aller-retour texte → binaire...")
+    print(
+        "OK"
+        if verification_aller_retour("data/index_inverse.txt", "data/index_inverse.bin")
+        else "ÉCHEC"
+    )
+    print("Mesure de la compression des postings...")
+    index_mesure = IndexBinaire("data/index_inverse.bin")
+    for nom, (offsets_mesure, docs_mesure) in (
+        (
+            "Index du corpus",
+            (index_mesure.offsets, index_mesure.postings_compresses.decompression()),
+        ),
+        ("Listes synthétiques", postings_synthetiques(50000, 1_000_000)),
+    ):
+        print(f"{nom} : {len(docs_mesure)} postings")
+        for cle, valeur in benchmark_compression(offsets_mesure, docs_mesure).items():
+            print(f"  {cle} : {valeur:.4g}")
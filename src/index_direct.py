@@ -0,0 +1,165 @@
+"""
+Index direct (document → métadonnées) des articles, pour l'affichage des résultats.
+
+Les articles sont numérotés comme dans l'index inversé (identifiants denses attribués
+dans l'ordre croissant des numéros de fichier). Pour chaque champ affiché, le fichier
+contient deux sections :
+- "<champ>_texte" : les valeurs de tous les articles, encodées en utf-8 et concaténées ;
+- "<champ>_offsets" : la valeur de l'article i est entre offsets[i] et offsets[i + 1].
+L'accès à un article ne dépend donc pas de la taille du corpus.
+"""
+
+from typing import Optional
+import xml.etree.ElementTree as ET
+import numpy as np
+from index_binaire import FichierSections, ecriture_sections
+from utils import parse_xml
+
+# Champs conservés pour chaque article, "extrait" est calculé à partir du texte
+CHAMPS_AFFICHES = ("titre", "date", "numero", "rubrique", "extrait")
+
+# Version du format de l'index direct, indépendante de celle de l'index inversé
+VERSION_INDEX_DIRECT = 1
+
+# Nombre de mots du texte conservés dans l'extrait
+TAILLE_EXTRAIT = 50
+
+
+def extrait(texte: Optional[str], nb_mots: int = TAILLE_EXTRAIT) -> str:
+    """
+    Renvoie l'extrait d'un texte affiché dans les résultats.
+    :param texte: Le texte de l'article.
+    :param nb_mots: Le nombre de mots conservés.
+    :return: Les premiers mots du texte suivis de "...".
+    """
+    return " ".join((texte or "").split()[:nb_mots]) + "..."
+
+
+def fiche_article(article: ET.Element) -> dict[str, str]:
+    """
+    Renvoie les informations affichées d'un article du corpus.
+    :param article: L'élément XML de l'article.
+    :return: Un dictionnaire (id, titre, date, numero, rubrique, extrait).
+    """
+    fiche = {"id": article.findtext("fichier")}
+    for champ in CHAMPS_AFFICHES:
+        if champ == "extrait":
+            fiche[champ] = extrait(article.findtext("texte"))
+        else:
+            fiche[champ] = article.findtext(champ) or ""
+    return fiche
+
+
+def construction_sections_direct(fiches: list[dict[str, str]]) -> dict[str, np.ndarray]:
+    """
+    Construit les sections de l'index direct à partir des fiches des articles.
+
+    :param fiches: Les fiches des articles (voir fiche_article), dans n'importe quel ordre.
+    :return: Les sections de l'index direct.
+    """
+    fiches = sorted(fiches, key=lambda fiche: int(fiche["id"]))
+    sections = {
+        "documents": np.array([int(fiche["id"]) for fiche in fiches], dtype=np.int32)
+    }
+    for champ in CHAMPS_AFFICHES:
+        encodees = [fiche[champ].encode("utf-8") for fiche in fiches]
+        offsets = np.zeros(len(encodees) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(valeur) for valeur in encodees])
+        sections[f"{champ}_offsets"] = offsets
+        sections[f"{champ}_texte"] = np.frombuffer(b"".join(encodees), dtype=np.uint8)
+    return sections
+
+
+def ecriture_index_direct(fiches: list[dict[str, str]], fichier_sortie: str) -> None:
+    """
+    Écrit l'index direct d'une liste de fiches d'articles au format binaire.
+
+    :param fiches: Les fiches des articles.
+    :param fichier_sortie: Le chemin du fichier binaire à écrire.
+    :return: None
+    """
+    ecriture_sections(
+        fichier_sortie,
+        construction_sections_direct(fiches),
+        {"champs": CHAMPS_AFFICHES},
+        VERSION_INDEX_DIRECT,
+    )
+
+
+def sauvegarde_index_direct(fichier_corpus: str, fichier_sortie: str) -> None:
+    """
+    Construit l'index direct d'un corpus et l'écrit au format binaire.
+
+    :param fichier_corpus: Le chemin du corpus XML.
+    :param fichier_sortie: Le chemin du fichier binaire à écrire.
+    :return: None
+    """
+    ecriture_index_direct(
+        [
+            fiche_article(article)
+            for article in parse_xml(fichier_corpus).findall(".//article")
+        ],
+        fichier_sortie,
+    )
+
+
+class IndexDirect(FichierSections):
+    """
+    Index direct des articles, projeté en mémoire.
+    """
+
+    def __init__(self, chemin: str = "data/index_direct.bin"):
+        """
+        Ouvre un index direct.
+        :param chemin: Le chemin de l'index direct.
+        """
+        super().__init__(chemin, VERSION_INDEX_DIRECT)
+        self.champs = tuple(self.meta["champs"])
+        self.documents = self.section("documents")
+        self.valeurs = {
+            champ: (self.section(f"{champ}_offsets"), self.section(f"{champ}_texte"))
+            for champ in self.champs
+        }
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def valeur(self, identifiant: int, champ: str) -> str:
+        """
+        Renvoie la valeur d'un champ d'un article.
+        :param identifiant: L'identifiant dense de l'article.
+        :param champ: Le champ (parmi CHAMPS_AFFICHES).
+        :return: La valeur du champ.
+        """
+        offsets, texte = self.valeurs[champ]
+        debut, fin = int(offsets[identifiant]), int(offsets[identifiant + 1])
+        return texte[debut:fin].tobytes().decode("utf-8")
+
+    def article(self, fichier: str) -> Optional[dict[str, str]]:
+        """
+        Renvoie les informations affichées d'un article.
+        :param fichier: Le numéro de fichier de l'article.
+        :return: Un dictionnaire (id, titre, date, numero, rubrique, extrait),
+        ou None si l'article n'est pas dans l'index.
+        """
+        numero = int(fichier)
+        identifiant = int(np.searchsorted(self.documents, numero))
+        if identifiant == len(self.documents) or self.documents[identifiant] != numero:
+            return None
+        resultat = {"id": fichier}
+        for champ in self.champs:
+            resultat[champ] = self.valeur(identifiant, champ)
+        return resultat
+
+
+if __name__ == "__main__":
+    print("Création de l'index direct...")
+    sauvegarde_index_direct("data/corpus.xml", "data/index_direct.bin")
+
+    # Vérification : chaque article relu est identique à celui du corpus
+    index_direct = IndexDirect("data/index_direct.bin")
+    identiques = all(
+        index_direct.article(article.findtext("fichier")) == fiche_article(article)
+        for article in parse_xml("data/corpus.xml").findall(".//article")
+    )
+    print("OK" if identiques else "ÉCHEC")
@@ -6,22 +6,30 @@ import xml.etree.ElementTree as ET
 from collections import defaultdict
 from typing import List
 from utils import parse_xml
+from index_binaire import CHAMPS_INDEXES, encodage_positions, sauvegarde_index_binaire
+from index_direct import sauvegarde_index_direct
+from similaires import sauvegarde_index_similarite
+from trigrammes import sauvegarde_index_trigrammes
 
 
 def creation_index_inverse(
     root: ET.Element, tags: List[str]
-) -> dict[str, dict[str, dict[str, int]]]:
+) -> dict[str, dict[str, dict[str, List[int]]]]:
     """
     Crée un index inversé sous forme de dictionnaire à partir d'un corpus XML.
+    Les postings sont séparés par balise : on peut ainsi chercher un lemme
+    dans un champ donné sans parcourir les postings des autres champs.
+    Chaque posting garde les positions du lemme dans le champ (rang du mot,
+    à partir de 0), sa fréquence est leur nombre.
 
     :param root: Élément racine du fichier XML.
     :param tags: Liste des balises à indexer.
-    :return: Dictionnaire ayant la structure lemme → {doc_id → {tag → fréquence}}.
+    :return: Dictionnaire ayant la structure tag → {lemme → {doc_id → positions}}.
     """
 
-    index_inverse: dict[str, dict[str, dict[str, int]]] = defaultdict(
-        lambda: defaultdict(lambda: defaultdict(int))
-    )
+    index_inverse: dict[str, dict[str, dict[str, List[int]]]] = {
+        tag: defaultdict(lambda: defaultdict(list)) for tag in tags
+    }
 
     for article in root.findall("article"):
         doc_id = article.findtext("fichier", default="inconnu")
@@ -33,16 +41,16 @@ def creation_index_inverse(
             # Cas spécial : images
             if tag == "images":
                 if texte:
-                    index_inverse["presence_image"][doc_id][tag] += 1
+                    index_inverse[tag]["presence_image"][doc_id].append(0)
                 else:
-                    index_inverse["pas_image"][doc_id][tag] += 1
+                    index_inverse[tag]["pas_image"][doc_id].append(0)
                 continue
 
             # Cas spécial : rubrique
             if tag == "rubrique":
                 if texte:
                     mot = texte.strip().lower()
-                    index_inverse[mot][doc_id][tag] += 1
+                    index_inverse[tag][mot][doc_id].append(0)
                 continue
 
             if not texte:
@@ -50,46 +58,66 @@ def creation_index_inverse(
 
             # Cas général
             mots = texte.lower().split()
-            for mot in mots:
+            for position, mot in enumerate(mots):
                 mot = mot.strip()
                 if mot:
-                    index_inverse[mot][doc_id][tag] += 1
+                    index_inverse[tag][mot][doc_id].append(position)
 
     return index_inverse
 
 
 def sauvegarde_index_inverse(
-    index_inverse: dict[str, dict[str, dict[str, int]]], fichier_sortie: str
+    index_inverse: dict[str, dict[str, dict[str, List[int]]]], fichier_sortie: str
 ):
     """
-    Sauvegarde un index inverse dans un fichier texte trié alphabétiquement
+    Sauvegarde un index inverse dans un fichier texte trié alphabétiquement,
+    une ligne par terme : terme,doc:champ:fréquence:positions,...
+    Les positions sont encodées par différences (voir encodage_positions)
+    et séparées par des espaces.
 
     :param index_inverse: Dictionnaire contenant l'index inverse
+    (tag → lemme → doc_id → positions)
     :param fichier_sortie: Chemin du fichier texte de sortie
     :return: None
     """
+    # Regroupement des postings de chaque mot, tous champs confondus
+    rang_tag = {tag: rang for rang, tag in enumerate(index_inverse)}
+    postings_par_mot = defaultdict(list)
+    for tag, mots in index_inverse.items():
+        for mot, docs in mots.items():
+            postings_par_mot[mot].extend(
+                (doc_id, tag, positions) for doc_id, positions in docs.items()
+            )
+
     with open(fichier_sortie, "w", encoding="utf-8") as f:
         # Parcours des mots triés alphabétiquement
-        for mot in sorted(index_inverse.keys()):
-            liste_docs = []
-            for doc_id, tags in index_inverse[mot].items():
-                for tag, _ in tags.items():
-                    liste_docs.append(f"{doc_id}:{tag}")
+        for mot in sorted(postings_par_mot.keys()):
+            postings = sorted(
+                postings_par_mot[mot],
+                key=lambda posting: (int(posting[0]), rang_tag[posting[1]]),
+            )
+            liste_docs = [
+                f"{doc_id}:{tag}:{len(positions)}:"
+                + " ".join(map(str, encodage_positions(positions)))
+                for doc_id, tag, positions in postings
+            ]
             f.write(f"{mot},{','.join(liste_docs)}\n")
 
 
 if __name__ == "__main__":
-    tags_a_indexer = [
-        "fichier",
-        "numero",
-        "date",
-        "rubrique",
-        "titre",
-        "texte",
-        "images",
-    ]
+    tags_a_indexer = list(CHAMPS_INDEXES)
     FICHIER_XML = "data/corpus_clean.xml"
     print("Création de l'index inversé...")
     index = creation_index_inverse(parse_xml(FICHIER_XML), tags_a_indexer)
     print("Sauvegarde de l'index inversé...")
     sauvegarde_index_inverse(index, "data/index_inverse.txt")
+    print("Sauvegarde de l'index inversé binaire...")
+    sauvegarde_index_binaire(index, "data/index_inverse.bin")
+    print("Sauvegarde de l'index direct...")
+    sauvegarde_index_direct("data/corpus.xml", "data/index_direct.bin")
+    print("Sauvegarde de l'index des articles similaires...")
+    sauvegarde_index_similarite(FICHIER_XML, "data/similarite.bin")
+    print("Sauvegarde de l'index des trigrammes des termes...")
+    sauvegarde_index_trigrammes(
+        [mot for mots in index.values() for mot in mots], "data/trigrammes.bin"
+    )
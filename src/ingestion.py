@@ -0,0 +1,160 @@
+"""
+Ajout incrémental de nouveaux bulletins à l'index, sans relancer toute la chaîne
+de traitement (traitement_donnees, segmente, anti_dictionnaire, lemmatisation,
+index_inverse) sur l'ensemble des bulletins.
+
+Seuls les nouveaux fichiers .htm sont extraits, nettoyés (anti-dictionnaire et
+lemmes du fichier de substitution existant, les mots inconnus étant racinisés)
+puis indexés dans un segment (voir segments.py). Le coût d'une ingestion dépend
+donc de la taille du lot, pas de celle de l'archive. L'anti-dictionnaire n'est
+pas recalculé : il le sera à la prochaine reconstruction complète.
+"""
+
+import os
+import shutil
+import sys
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+from typing import List, Optional
+from nltk.stem.snowball import FrenchStemmer
+from traitement_donnees import genere_article
+from substitue import charger_substitutions, substitue_texte
+from index_binaire import CHAMPS_INDEXES, lignes_index
+from index_direct import fiche_article
+from index_inverse import creation_index_inverse
+from segments import (
+    SEUIL_FUSION,
+    IndexSegmente,
+    ecriture_segment,
+    fusion_en_arriere_plan,
+    liste_segments,
+)
+from utils import tokenize
+
+
+def generation_articles(fichiers_htm: List[str]) -> ET.Element:
+    """
+    Extrait les articles de fichiers .htm, comme genere_corpus mais pour
+    une liste de fichiers.
+
+    :param fichiers_htm: Les chemins des fichiers .htm.
+    :return: L'élément racine d'un corpus contenant les articles.
+    """
+    corpus = ET.Element("corpus")
+    for fichier in fichiers_htm:
+        article = genere_article(fichier)
+        if article is None:
+            raise ValueError(f"Impossible de générer l'article pour {fichier}")
+        corpus.append(article)
+
+    # Même mise en forme que corpus.xml (les balises images non vides
+    # ont alors un texte, ce qui compte pour l'index)
+    return ET.fromstring(
+        minidom.parseString(ET.tostring(corpus)).toprettyxml(indent="  ")
+    )
+
+
+def nettoyage_articles(
+    corpus: ET.Element, substitutions: dict[str, str], stemmer: FrenchStemmer
+) -> dict[str, str]:
+    """
+    Nettoie les titres et les textes des articles d'un corpus, comme
+    nettoyage_corpus_xml. Les mots absents du fichier de substitution
+    sont racinisés et ajoutés aux substitutions.
+
+    :param corpus: L'élément racine du corpus (modifié en place).
+    :param substitutions: Les substitutions (voir charger_substitutions).
+    :param stemmer: Le raciniseur.
+    :return: Les nouveaux mots et leurs lemmes.
+    """
+    nouveaux_lemmes = {}
+    for article in corpus.findall("article"):
+        for balise in ("titre", "texte"):
+            element = article.find(balise)
+            tokens = tokenize(element.text or "")
+            for token in tokens:
+                if token not in substitutions:
+                    nouveaux_lemmes[token] = stemmer.stem(token)
+                    substitutions[token] = nouveaux_lemmes[token]
+            # .split() permet de retirer des espaces consécutifs
+            element.text = " ".join(substitue_texte(tokens, substitutions).split())
+    return nouveaux_lemmes
+
+
+def ajout_lemmes(
+    nouveaux_lemmes: dict[str, str], fichier_subs: str, fichier_lemmes: str
+) -> None:
+    """
+    Ajoute de nouveaux mots au fichier de substitution et au lexique des lemmes.
+
+    :param nouveaux_lemmes: Les nouveaux mots et leurs lemmes.
+    :param fichier_subs: Le fichier de substitution.
+    :param fichier_lemmes: Le fichier des lemmes (lexique du correcteur).
+    :return: None
+    """
+    with open(fichier_subs, "a", encoding="utf-8") as subs, open(
+        fichier_lemmes, "a", encoding="utf-8"
+    ) as lemmes:
+        for mot, lemme in nouveaux_lemmes.items():
+            subs.write(f"{mot}\t{lemme}\n")
+            lemmes.write(f"{mot}→{lemme}\n")
+
+
+def ingestion_bulletins(
+    fichiers_htm: List[str],
+    index: str = "data/index_inverse.bin",
+    documents: str = "data/index_direct.bin",
+    dossier_segments: str = "data/segments",
+    fichier_subs: str = "data/subs.txt",
+    fichier_lemmes: str = "data/lemma_stemmer.txt",
+    dossier_bulletins: str = "data/BULLETINS",
+) -> Optional[str]:
+    """
+    Ajoute de nouveaux bulletins à l'index sous la forme d'un segment.
+    Au-delà de SEUIL_FUSION segments, une fusion est lancée en arrière-plan.
+
+    :param fichiers_htm: Les chemins des nouveaux fichiers .htm.
+    :param index: Le chemin de l'index inversé de base.
+    :param documents: Le chemin de l'index direct de base.
+    :param dossier_segments: Le dossier des segments.
+    :param fichier_subs: Le fichier de substitution (anti-dictionnaire et lemmes).
+    :param fichier_lemmes: Le fichier des lemmes (lexique du correcteur).
+    :param dossier_bulletins: Le dossier où sont copiés les bulletins (pour l'interface).
+    :return: Le chemin du segment écrit, ou None si aucun article n'était nouveau.
+    """
+    corpus = generation_articles(fichiers_htm)
+
+    # Les articles déjà indexés (dans la base ou un segment) sont ignorés
+    deja_indexes = set(
+        IndexSegmente(index, documents, dossier_segments).documents.tolist()
+    )
+    for article in corpus.findall("article"):
+        if int(article.findtext("fichier")) in deja_indexes:
+            print(f"Article {article.findtext('fichier')} déjà indexé, ignoré")
+            corpus.remove(article)
+    if not corpus.findall("article"):
+        return None
+
+    fiches = [fiche_article(article) for article in corpus.findall("article")]
+    nouveaux_lemmes = nettoyage_articles(
+        corpus, charger_substitutions(fichier_subs), FrenchStemmer()
+    )
+    lignes = lignes_index(creation_index_inverse(corpus, list(CHAMPS_INDEXES)))
+
+    ajout_lemmes(nouveaux_lemmes, fichier_subs, fichier_lemmes)
+    for fichier in fichiers_htm:
+        cible = os.path.join(dossier_bulletins, os.path.basename(fichier))
+        if not os.path.exists(cible):
+            shutil.copy(fichier, cible)
+    segment = ecriture_segment(lignes, fiches, dossier_segments)
+
+    if len(liste_segments(dossier_segments)) >= SEUIL_FUSION:
+        fusion_en_arriere_plan(index, documents, dossier_segments)
+    return segment
+
+
+if __name__ == "__main__":
+    # Usage : python ingestion.py nouveau_bulletin1.htm nouveau_bulletin2.htm ...
+    print("Ingestion des nouveaux bulletins...")
+    chemin_segment = ingestion_bulletins(sys.argv[1:])
+    print(f"Segment écrit : {chemin_segment}" if chemin_segment else "Rien à indexer")
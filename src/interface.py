@@ -8,8 +8,7 @@ import datetime
 import webbrowser
 import tkinter as tk
 import customtkinter as ctk
-from moteur import moteur
-from utils import parse_xml
+from moteur import moteur_partage
 
 
 class RechercheApp:
@@ -31,6 +30,9 @@ class RechercheApp:
 
         self.tri_var = tk.StringVar(value="Classique")
 
+        # Le moteur (index, corpus, lexique) est chargé une seule fois
+        self.moteur = moteur_partage()
+
         self.build_interface()
         self.root.mainloop()
 
@@ -67,7 +69,7 @@ class RechercheApp:
         ctk.CTkComboBox(
             tri_frame,
             variable=self.tri_var,
-            values=["Classique", "Date Croissante", "Date Décroissante"],
+            values=["Classique", "Pertinence", "Date Croissante", "Date Décroissante"],
             width=200,
         ).grid(row=0, column=1)
 
@@ -105,31 +107,21 @@ class RechercheApp:
         :return: None
         """
         doc_type = None
-        root_corpus = parse_xml("data/corpus.xml")
         filtered_results = []
 
         if query:
-            resultats, doc_type = moteur(query)
+            if critere_tri == "Pertinence":
+                # Articles les plus pertinents (BM25), déjà dans l'ordre d'affichage
+                resultats, doc_type = self.moteur.classement(query)
+            else:
+                resultats, doc_type = self.moteur.rechercher(query)
             if doc_type == "article":
-                resultats_structured = []
-                for result in resultats:
-                    for article in root_corpus.findall(".//article"):
-                        fichier = article.find("fichier")
-                        if fichier is not None and fichier.text == result:
-                            dico = {
-                                "id": result,
-                                "titre": article.find("titre").text,
-                                "date": article.find("date").text,
-                                "numero": article.find("numero").text,
-                                "rubrique": article.find("rubrique").text,
-                                "extrait": " ".join(
-                                    article.find("texte").text.split()[:50]
-                                )
-                                + "...",
-                            }
-                            resultats_structured.append(dico)
-                            break
-                filtered_results = resultats_structured
+                # Les informations affichées viennent de l'index direct
+                filtered_results = [
+                    article
+                    for article in map(self.moteur.article, resultats)
+                    if article is not None
+                ]
             elif doc_type in ["bulletin", "rubrique"]:
                 filtered_results = list(resultats)
 
@@ -169,6 +161,7 @@ class RechercheApp:
                 "Rubrique",
                 "Extrait",
                 "Consulter",
+                "Similaires",
             ]
             for i, header in enumerate(headers):
                 ctk.CTkLabel(
@@ -208,12 +201,33 @@ class RechercheApp:
                     height=28,
                     command=lambda id=resultat["id"]: self.ouvrir_fichier(id),
                 ).grid(row=row_index, column=6, padx=5, pady=2)
+
+                ctk.CTkButton(
+                    self.scrollable_resultats,
+                    text="Voir",
+                    width=60,
+                    height=28,
+                    command=lambda id=resultat["id"]: self.afficher_similaires(id),
+                ).grid(row=row_index, column=7, padx=5, pady=2)
         else:
             for i, item in enumerate(filtered_results):
                 ctk.CTkLabel(
                     self.scrollable_resultats, text=item, font=ctk.CTkFont(size=14)
                 ).pack(fill="x", padx=10, pady=4)
 
+    def afficher_similaires(self, id_value):
+        """
+        Affiche les articles les plus similaires à un article.
+        :param id_value: L'ID de l'article.
+        :return: None
+        """
+        similaires = [
+            article
+            for article in map(self.moteur.article, self.moteur.similaires(id_value))
+            if article is not None
+        ]
+        self.afficher_resultats(similaires, "article")
+
     def ouvrir_fichier(self, id_value):
         """
         Permet d'ouvrir les fichiers .htm sur un navigateur.
@@ -9,6 +9,12 @@ from matplotlib_venn import venn2
 from nltk.stem.snowball import FrenchStemmer
 from lxml import etree
 from anti_dictionnaire import nettoyage_corpus_xml
+from correcteur import (
+    charger_lexique,
+    sauvegarde_arbre_bk,
+    sauvegarde_index_suppressions,
+)
+from trigrammes import sauvegarde_index_trigrammes
 from utils import tokenize
 
 
@@ -278,6 +284,12 @@ if __name__ == "__main__":
     lemmatisation_stemmer("data/words_segmentation_clean.txt", "data/lemma_stemmer.txt")
     print("Calcul de statistiques...")
     calcul_stats_lemmes("data/lemma_spacy.txt", "data/lemma_stemmer.txt")
+    print("Index des suppressions et arbre BK du correcteur...")
+    lexique = charger_lexique("data/lemma_stemmer.txt")
+    sauvegarde_index_suppressions(lexique)
+    sauvegarde_arbre_bk(lexique)
+    print("Index des trigrammes des mots du lexique...")
+    sauvegarde_index_trigrammes(lexique.mots, "data/trigrammes_lexique.bin")
     print("Mis-à-jour du fichier de substitution...")
     ajout_fichier_subs("data/lemma_stemmer.txt", "data/subs.txt")
     print("Nettoyage du corpus...")
@@ -2,13 +2,144 @@
 Fonction principale qui permet la recherche d'information à partir d'une requête.
 """
 
-import re
+import copy
+import json
+import logging
+import threading
+from functools import cached_property, reduce
+from operator import and_
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import Iterable, Tuple, Optional
+import numpy as np
 import pandas as pd
-from requetes import nettoyage_requete, traitement_requete, replace_soit
-from correcteur import correcteur_orthographique
-from utils import get_min_max_dates, replace_min_and_max
+from requetes import (
+    AnalyseurRequetes,
+    analyse_phrase,
+    est_motif,
+    expression_phrase,
+)
+from index_binaire import CHAMPS_INDEXES
+from cache import DUREE_VIE_CACHE, TAILLE_CACHE, CacheLRU
+from segments import IndexSegmente
+from bitsets import univers, depuis_docs, vers_docs, vers_masque
+from correcteur import (
+    STRATEGIES_CORRECTION,
+    charger_arbre_bk,
+    charger_index_suppressions,
+    charger_lexique,
+    correcteur_orthographique,
+)
+from utils import get_min_max_dates, replace_min_and_max, tokenize
+from vectoriel import EspaceLatent, MatriceTfIdf
+from similaires import NB_SIMILAIRES, IndexSimilarite
+from trigrammes import charger_index_trigrammes
+
+# Journal du moteur : le détail de l'évaluation des requêtes est au niveau DEBUG
+JOURNAL = logging.getLogger(__name__)
+
+# Champs dont les postings sont longs (métadonnées partagées par beaucoup d'articles) :
+# leurs bitsets sont construits dès le chargement du moteur
+CHAMPS_DENSES = ("fichier", "numero", "date", "rubrique", "images")
+
+# Champs pris en compte par le classement BM25, et leur poids
+POIDS_CLASSEMENT = {"titre": 2.0, "texte": 1.0}
+
+# Nombre d'articles renvoyés par le classement (une page de l'interface)
+NB_RESULTATS_CLASSES = 20
+
+# Requêtes d'exemple du TD, utilisées pour les tests et les mesures de performance
+REQUETES_EXEMPLES = [
+    "Afficher la liste des articles qui parlent des systèmes embarqués dans la rubrique Horizons Enseignement.",
+    "Je voudrais les articles qui parlent de cuisine moléculaire.",
+    "Quels sont les articles sur la réalité virtuelle ?",
+    "Je voudrais les articles qui parlent d’airbus ou du projet Taxibot.",
+    "Je voudrais les articles qui parlent du tennis.",
+    "Je voudrais les articles traitant de la Lune.",
+    "Quels sont les articles parus entre le 3 mars 2013 et le 4 mai 2013 évoquant les Etats-Unis ?",
+    "Afficher les articles de la rubrique en direct des laboratoires.",
+    "Je veux les articles de la rubrique Focus parlant d’innovation.",
+    "Quels sont les articles parlant de la Russie ou du Japon ?",
+    "Je voudrais les articles de 2011 sur l’enseignement.",
+    "Je voudrais les articles dont le titre contient le mot chimie.",
+    "Je veux les articles de 2014 et de la rubrique Focus et parlant de la santé.",
+    "Je souhaite les rubriques des articles parlant de nutrition ou de vins.",
+    "Je cherche les recherches sur l’aéronautique.",
+    "Article traitant des Serious Game et de la réalité virtuelle.",
+    "Quels sont les articles traitant d’informatique ou de reseaux.",
+    "Je voudrais les articles de la rubrique Focus mentionnant un laboratoire.",
+    "Quels sont les articles publiés au mois de novembre 2011 portant sur de la recherche.",
+    "Je veux des articles sur la plasturgie.",
+    "Quels articles portent à la fois sur les nanotechnologies et les microsatellites.",
+    "Je voudrais les articles liés à la recherche scientifique publiés en Février 2010.",
+    "Donner les articles qui parlent d’apprentissage et de la rubrique Horizons Enseignement.",
+    "Chercher les articles dans le domaine industriel et datés à partir de 2012.",
+    "Nous souhaitons obtenir les articles du mois de Juin 2013 et parlant du cerveau.",
+    "Rechercher tous les articles sur le CNRS et l’innovation à partir de 2013.",
+    "Je cherche des articles sur les avions.",
+    "Donner les articles qui portent sur l’alimentation de l’année 2013.",
+    "Articles dont le titre traite du Tara Oceans Polar Circle.",
+    "Je veux des articles parlant de smartphones.",
+    "Quels sont les articles parlant de projet européen de l’année 2014 ?",
+    "Afficher les articles de la rubrique A lire.",
+    "Je veux les articles parlant de Neurobiologie.",
+    "Quels sont les articles possédant le mot France ?",
+    "Articles écrits en Décembre 2012 qui parlent de l’environnement ?",
+    "Quels sont les articles contenant les mots voitures et électrique ?",
+    "Je voudrais les articles avec des images dont le titre contient le mot croissance.",
+    "Quels sont les articles qui parlent de microbiologie ?",
+    "J’aimerais la liste des articles écrits après janvier 2014 et qui parlent d’informatique ou de télécommunications.",
+    "Je veux les articles de 2012 qui parlent de l’écologie en France.",
+    "Quels articles parlent de réalité virtuelle ?",
+    "Dans quelles rubriques trouve-t-on des articles sur l’alimentation ?",
+    "Liste des articles qui parlent soit du CNRS, soit des grandes écoles, mais pas de Centrale Paris.",
+    "J’aimerais un article qui parle de biologie et qui date d’après le 2 juillet 2012 ?",
+    "Quels sont les articles qui parlent d’innovations technologiques ?",
+    "Je cherche les articles dont le titre contient le mot performants.",
+    "Je voudrais tout les articles provenant de la rubrique événement et contenant le mot congres dans le titre.",
+    "Je cherche les articles à propos des fleurs ou des arbres.",
+    "Je souhaites avoir tout les articles donc la rubrique est focus ou Actualités Innovations et qui contiennent les mots chercheurs et paris.",
+    "Je veux les articles qui parlent du sénégal.",
+    "Je voudrais les articles qui parlent d’innovation.",
+    "Je voudrais les articles dont le titre contient le mot europe.",
+    "Je voudrais les articles qui contiennent les mots Ecole et Polytechnique.",
+    "Je cherche les articles provenant de la rubrique en direct des laboratoires.",
+    "Je voudrais les articles qui datent du 1 décembre 2012 et dont la rubrique est Actualités Innovations.",
+    "Dans quels articles Laurent Lagrost est-il cité ?",
+    "Quels articles évoquent la ville de Grenoble ?",
+    "Articles parlant de drones.",
+    "Articles parlant de molécules.",
+    "Articles contenant une image.",
+    "Articles parlant d’université.",
+    "Lister tous les articles dont la rubrique est Focus et qui ont des images.",
+    "Quels sont les articles dont le titre évoque la recherche ?",
+    "Articles dont la rubrique est 'Horizon Enseignement' mais qui ne parlent pas d’ingénieurs.",
+    "Tous les articles dont la rubrique est 'En direct des laboratoires' ou 'Focus' et qui évoquent la médecine.",
+    "Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin.",
+    "Quels sont les articles dont le titre contient le terme 'marché' et le mot 'projet' ?",
+    "Je voudrais les articles dont le titre contient le mot 3D.",
+    "Je veux voir les articles de la rubrique Focus et publiés entre 30/08/2011 et 29/09/2011.",
+    "Je cherche les articles sur le Changement climatique publiés après 29/09/2011.",
+    "Quels articles parlent d’aviation et ont été publiés en 2015 ?",
+    "Quels sont les articles de la rubrique évènement qui parlent de la ville de Paris ?",
+    "Je veux les articles impliquant le CNRS et qui parlent de chimie.",
+    "Trouver les articles qui mentionnent Fink.",
+    "Quels articles parlent de la France et de l’Allemagne ?",
+    "Je veux les articles parlant de l’Argentine ou du Brésil.",
+    "Je veux les articles qui parlent de l’hydravion.",
+    "Je veux les articles qui parlent du fauteuil roulant et qui ont pour rubrique Actualité Innovation.",
+    "Je veux les articles qui sont écrits en 2012 et parlent du « chrono-environnement ».",
+    "Quels sont les articles qui parlent des robots et des chirurgiens ?",
+    "Je veux les articles qui parlent des systmes embarqués et non pas la robotique.",
+    "Je cherche les articles qui parlent des alimentations ou des agricultures.",
+    "Quels sont les articles dont le titre contient le mot histoire ?",
+    "Je veux les articles dont le titre est « bi-mot filière agricole ».",
+    "Listez-moi les articles qui parlent de 3D et qui sont écrits entre 2010 et 2011.",
+    "Quels sont les articles dont le titre contient biocarburant ou le contenu parle des bioénergies ?",
+    "Quelle sont les articles qui concernent le CEA ?",
+    "Je veux les articles qui parlent philosophie.",
+    "Je veux les articles sans image.",
+    "Retournez les articles dont le titre contient le mot nucléaire.",
+]
 
 
 def charger_index(index: str = "data/index_inverse.txt") -> pd.DataFrame:
@@ -23,418 +154,728 @@ def charger_index(index: str = "data/index_inverse.txt") -> pd.DataFrame:
     return pd.DataFrame(lines)
 
 
-def corriger_texte(texte: str) -> str:
+def termes_requete(composants: dict) -> list[str]:
     """
-    Applique le correcteur orthographique sur un texte.
-    :param texte: Le texte à corriger.
-    :return: Le texte corrigé.
+    Renvoie les termes d'une requête structurée qui servent à classer les résultats
+    (mots-clés, titre et contenu, sans les mots exclus).
+    :param composants: Les composants de la requête structurée.
+    :return: La liste des termes.
     """
-    return correcteur_orthographique(texte, "data/lemma_stemmer.txt", 1, 12, 54).strip()
+    expressions = [
+        keyword
+        for keyword in composants["keywords"] or []
+        if keyword != "ou" and not keyword.startswith("pas ")
+    ]
+    expressions += [
+        composants[champ]
+        for champ in ("titre", "contenu")
+        if composants[champ] is not None
+    ]
+    termes = []
+    for expression in expressions:
+        # Les mots d'une expression entre guillemets comptent chacun
+        phrase = analyse_phrase(expression)
+        termes.extend(expression.split() if phrase is None else phrase[0])
+    return termes
 
 
-def filtrer_par(field: str, docs_set: set[str]) -> None:
+def cle_requete(composants: dict) -> str:
     """
-    Modifie un set de docs:champ en ne conservant que ceux pour lesquels champ=field.
-    :param field: Le champ sur lequel filtrer.
-    :param docs_set: Le set à filtrer.
-    :return: None.
+    Renvoie la forme canonique d'une requête structurée, qui sert de clé au cache
+    des résultats : deux formulations qui donnent les mêmes critères (au texte de la
+    requête et à l'ordre des rubriques près) ont la même clé.
+    :param composants: Les composants de la requête structurée, après correction.
+    :return: La clé.
     """
-    docs_set.intersection_update(
-        {doc for doc in docs_set if ":" in doc and doc.split(":")[1].strip() == field}
-    )
+    criteres = {nom: valeur for nom, valeur in composants.items() if nom != "query"}
+    criteres["rubriques"] = sorted(criteres["rubriques"] or [])
+    return json.dumps(criteres, sort_keys=True, ensure_ascii=False)
 
 
-def moteur(requete: str) -> Tuple[Optional[set], str]:
+def selection_meilleurs(fichiers: np.ndarray, scores: np.ndarray, k: int) -> list[str]:
+    """
+    Renvoie les k articles de meilleur score, sans trier l'ensemble des articles.
+    À score égal, les articles les plus récents (numéro de fichier le plus grand)
+    passent en premier.
+    :param fichiers: Les numéros de fichier des articles.
+    :param scores: Leurs scores.
+    :param k: Le nombre d'articles renvoyés.
+    :return: Les numéros de fichier des k meilleurs articles, du meilleur au moins bon.
+    """
+    fichiers = fichiers.astype(np.int64)
+    if len(scores) > k > 0:
+        # Les articles à égalité avec le k-ième sont gardés pour départager
+        kieme = np.partition(scores, len(scores) - k)[len(scores) - k]
+        gardes = scores >= kieme
+        fichiers, scores = fichiers[gardes], scores[gardes]
+    ordre = np.lexsort((-fichiers, -scores))[:k]
+    return [str(fichier) for fichier in fichiers[ordre].tolist()]
+
+
+class MoteurRecherche:
     """
     Moteur de recherche de la base d'information de l'ADIT.
-    Il reçoit en entrée une requête, la traite, la transforme en requête structurée
-    puis parcourt l'index inversé intelligemment pour renvoyer les résultats.
-    :param requete: La requête à traiter.
-    :return: Un tuple (set de résultats, type de doc à retourner)
+    L'index inversé, l'index direct et le lexique sont chargés une seule fois
+    à la création du moteur puis conservés en mémoire : le coût d'une
+    recherche ne dépend plus que de la requête.
+    Les segments ajoutés par ingestion.py sont cherchés avec l'index de base :
+    le moteur les recharge dès qu'ils changent.
     """
 
-    # chargement de l'index inversé sous forme de dataframe
-    df = charger_index()
-
-    liste_champs_requis = []
-
-    tous_docs = df.iloc[:, 1:].values.flatten().tolist()
-    tous_docs = [doc for doc in tous_docs if doc is not None and pd.notna(doc)]
-    tous_docs = set(tous_docs)
-
-    docs_date = set()
-    dates_liste = set()
-    docs_rubrique = set()
-    docs_titre = tous_docs.copy()
-    docs_contenu = set()
-    docs_non_keywords = tous_docs.copy()
-    docs_keywords = tous_docs.copy()
-    docs_image = set()
-
-    # Correction et traitement des requêtes
-    composants = traitement_requete(nettoyage_requete(replace_soit(requete)))
-    print(composants)
-    if composants["titre"] is not None:
-        composants["titre"] = corriger_texte(composants["titre"])
-    if composants["contenu"] is not None:
-        composants["contenu"] = corriger_texte(composants["contenu"])
-    if composants["keywords"] is not None:
-        for mot in composants["keywords"]:
-            if mot == "ou":
-                continue
-            if not mot.startswith("pas "):
-                composants["keywords"][composants["keywords"].index(mot)] = (
-                    corriger_texte(mot)
+    def __init__(
+        self,
+        index: str = "data/index_inverse.bin",
+        documents: str = "data/index_direct.bin",
+        lexique: str = "data/lemma_stemmer.txt",
+        segments: str = "data/segments",
+        tfidf: str = "data/tfidf",
+        similarite: str = "data/similarite.bin",
+        taille_cache: int = TAILLE_CACHE,
+        duree_cache: Optional[float] = DUREE_VIE_CACHE,
+        strategie_correction: str = "prefixe",
+        suppressions: str = "data/suppressions.bin",
+        arbre_bk: str = "data/arbre_bk.bin",
+        trigrammes: str = "data/trigrammes.bin",
+        trigrammes_lexique: str = "data/trigrammes_lexique.bin",
+    ):
+        """
+        Charge les ressources du moteur.
+        :param index: Le chemin vers l'index inversé binaire.
+        :param documents: Le chemin vers l'index direct (métadonnées des articles).
+        :param lexique: Le chemin vers le lexique (mot → lemme) du correcteur.
+        :param segments: Le dossier des segments ajoutés depuis la construction de l'index.
+        :param tfidf: Le dossier de la matrice tf-idf (voir vectoriel.py).
+        :param similarite: L'index des articles similaires (voir similaires.py).
+        :param taille_cache: Le nombre de requêtes (et de textes corrigés) gardées
+        en cache (0 désactive les caches).
+        :param duree_cache: La durée de vie d'une entrée des caches, en secondes.
+        :param strategie_correction: La stratégie de correction des mots absents du
+        lexique (voir correcteur.STRATEGIES_CORRECTION).
+        :param suppressions: L'index des suppressions du lexique, pour la stratégie
+        "suppressions" (reconstruit s'il manque ou si le lexique a changé).
+        :param arbre_bk: L'arbre BK du lexique, où sont cherchés les mots sans
+        préfixe commun avec le lexique (reconstruit comme l'index des suppressions).
+        :param trigrammes: L'index des trigrammes des termes de l'index inversé, pour
+        la stratégie "trigrammes" (reconstruit s'il manque ou si les termes ont changé).
+        :param trigrammes_lexique: L'index des trigrammes des mots du lexique, où sont
+        cherchés les mots-clés avec jokers (reconstruit comme celui des termes).
+        """
+        if strategie_correction not in STRATEGIES_CORRECTION:
+            raise ValueError(
+                f"Stratégie de correction inconnue : {strategie_correction}"
+            )
+        self.strategie_correction = strategie_correction
+        self.chemin_suppressions = suppressions
+        self.chemin_arbre_bk = arbre_bk
+        self.chemin_trigrammes = trigrammes
+        self.chemin_trigrammes_lexique = trigrammes_lexique
+        self.chemin_lexique = lexique
+        self.chemin_tfidf = tfidf
+        self.chemin_similarite = similarite
+        self._verrou = threading.Lock()
+        # Les caches sont vidés dès que l'état de l'index change (voir CacheLRU)
+        self.cache_resultats = CacheLRU(taille_cache, duree_cache)
+        self.analyseur = AnalyseurRequetes(
+            self.corriger_texte, taille_cache=taille_cache, duree_cache=duree_cache
+        )
+        self.chargement(IndexSegmente(index, documents, segments))
+
+    def chargement(self, index: IndexSegmente) -> None:
+        """
+        Charge un index (base et segments) et les ensembles de documents qui en dépendent.
+        :param index: L'index segmenté.
+        :return: None
+        """
+        self.index = index
+        self.lexique = charger_lexique(self.chemin_lexique)
+        self.index_suppressions = (
+            charger_index_suppressions(self.lexique, self.chemin_suppressions)
+            if self.strategie_correction == "suppressions"
+            else None
+        )
+        self.arbre_bk = charger_arbre_bk(self.lexique, self.chemin_arbre_bk)
+        # Le correcteur ne propose que des mots dont le lemme a des postings
+        vocabulaire = self.index.vocabulaire()
+        self.termes_indexes = set(vocabulaire)
+        self.index_trigrammes = (
+            charger_index_trigrammes(vocabulaire, self.chemin_trigrammes)
+            if self.strategie_correction == "trigrammes"
+            else None
+        )
+        self.trigrammes_lexique = None
+
+        # Les ensembles de documents sont des bitsets sur les identifiants denses,
+        # l'univers (tous les documents) est une constante
+        self.univers = univers(self.index.nb_documents)
+        self.bitsets = {}
+
+        # Documents ayant au moins un posting dans chaque champ
+        self.docs_par_champ = {
+            champ: depuis_docs(self.index.docs_champ(champ), self.index.nb_documents)
+            for champ in CHAMPS_INDEXES
+        }
+
+        # Facette des mois de publication, pour les exclusions ("pas au mois de juin")
+        self.docs_par_mois = {
+            mois: depuis_docs(self.index.dates_du_mois(mois), self.index.nb_documents)
+            for mois in range(1, 13)
+        }
+
+        # Bitsets des termes des champs denses
+        for champ in CHAMPS_DENSES:
+            for terme in self.index.termes_champ(champ):
+                self.bitset_terme(terme, champ)
+
+    def actualiser(self) -> None:
+        """
+        Recharge l'index si des segments ont été ajoutés ou fusionnés depuis son chargement.
+        :return: None
+        """
+        if self.index.est_a_jour():
+            return
+        with self._verrou:
+            if not self.index.est_a_jour():
+                self.chargement(IndexSegmente(*self.index.chemins))
+
+    def bitset_terme(self, terme: str, champ: str) -> int:
+        """
+        Renvoie le bitset des postings d'un terme dans un champ, en le construisant
+        à la première demande. Une expression entre guillemets (voir
+        requetes.expression_phrase) est cherchée dans l'index des positions, et un
+        motif avec jokers ("nano*") réunit les postings des termes qui y correspondent.
+        :param terme: Le terme, ou l'expression.
+        :param champ: Le champ.
+        :return: Le bitset des documents.
+        """
+        cle = (terme, champ)
+        if cle not in self.bitsets:
+            phrase = analyse_phrase(terme)
+            if phrase is not None:
+                docs = self.index.phrase(phrase[0], champ, phrase[1])
+            elif est_motif(terme):
+                docs = np.concatenate(
+                    [np.zeros(0, dtype=np.int64)]
+                    + [
+                        self.index.postings(correspondant, champ)
+                        for correspondant in self.termes_motif(terme)
+                    ]
                 )
             else:
-                composants["keywords"][composants["keywords"].index(mot)] = (
-                    "pas " + corriger_texte(mot[4:])
-                )
-    print(composants)
-    # Docs date
-    if composants["date"] is not None:
-        liste_champs_requis.append("date")
-        if "exact" in composants["date"]:
-            date = composants["date"]["exact"]
-            composants["date"]["min"], composants["date"]["max"] = get_min_max_dates(
-                date
+                docs = self.index.postings(terme, champ)
+            self.bitsets[cle] = depuis_docs(docs, self.index.nb_documents)
+        return self.bitsets[cle]
+
+    def termes_motif(self, motif: str) -> list[str]:
+        """
+        Renvoie les termes de l'index qui correspondent à un motif avec jokers : les
+        lemmes des mots du lexique qui y correspondent ("chimie*" : chimie, chimiez...),
+        et les termes qui y correspondent eux-mêmes ("nano*"). Les mots et les termes
+        sont trouvés dans les index de leurs trigrammes, chargés à la première demande.
+        :param motif: Le motif (par exemple "nano*", "*techno*" ou "r?seau").
+        :return: Les termes, triés.
+        """
+        if self.index_trigrammes is None:
+            self.index_trigrammes = charger_index_trigrammes(
+                self.index.vocabulaire(), self.chemin_trigrammes
             )
-            del composants["date"]["exact"]
-        replace_min_and_max(composants["date"])
-        if "min" in composants["date"] and "max" in composants["date"]:
-            for valeur in df[0]:
-                try:
-                    date_valeur = datetime.strptime(valeur, "%d/%m/%Y")
-                    date_min = datetime.strptime(composants["date"]["min"], "%d/%m/%Y")
-                    date_max = datetime.strptime(composants["date"]["max"], "%d/%m/%Y")
-                    if date_min <= date_valeur <= date_max:
-                        dates_liste.add(valeur)
-                except ValueError:
-                    pass
-
-        elif "min" in composants["date"]:
-            for valeur in df[0]:
-                try:
-                    date_valeur = datetime.strptime(valeur, "%d/%m/%Y")
-                    date_min = datetime.strptime(composants["date"]["min"], "%d/%m/%Y")
-                    if date_min <= date_valeur:
-                        dates_liste.add(valeur)
-                except ValueError:
-                    pass
-        elif "max" in composants["date"]:
-            for valeur in df[0]:
-                try:
-                    date_valeur = datetime.strptime(valeur, "%d/%m/%Y")
-                    date_max = datetime.strptime(composants["date"]["max"], "%d/%m/%Y")
-                    if date_valeur <= date_max:
-                        dates_liste.add(valeur)
-                except ValueError:
-                    pass
-        if "pas" in composants["date"]:
-            pas_pattern = composants["date"]["pas"]
-            pas_pattern = pas_pattern.replace("****", ".*")
-            pas_pattern = pas_pattern.replace("**", ".*")
-            annee = pas_pattern[0:2]
-            mois = pas_pattern[3:5]
-            jour = pas_pattern[6:8]
-            pas_pattern = f"{jour}/{mois}/{annee}"
-            dates_filtre = set(
-                d for d in dates_liste if not re.fullmatch(pas_pattern, d)
+        if self.trigrammes_lexique is None:
+            self.trigrammes_lexique = charger_index_trigrammes(
+                self.lexique.mots, self.chemin_trigrammes_lexique
             )
-        else:
-            dates_filtre = dates_liste
-
-        for date in dates_filtre:
-            docs_date.update(df[df[0] == date].iloc[:, 1:].values.flatten().tolist())
-
-    docs_date = set(doc for doc in docs_date if doc is not None and pd.notna(doc))
-    filtrer_par("date", docs_date)
-
-    # Docs rubrique
-    dico_rubriques = {
-        "focus": "focus",
-        "au coeur regions": "au coeur des régions",
-        "evenement": "evénement",
-        "evénement": "evénement",
-        "événement": "evénement",
-        "évènement": "evénement",
-        "actualité innovation": "actualité innovation",
-        "actualités innovation": "actualités innovation",
-        "actualités innovations": "actualités innovations",
-        "direct laboratoires": "en direct des laboratoires",
-        "direct labos": "en direct des labos",
-        "a lire": "a lire",
-        "horizon enseignement": "horizon enseignement",
-        "horizons enseignement": "horizons enseignement",
-        "horizons formation enseignement": "horizon formation enseignement",
-        "horizon formation": "horizon formation",
-        "côté pôles": "du côté des pôles",
-    }
-
-    if composants["rubriques"] is not None and composants["rubriques"]:
-        liste_champs_requis.append("rubrique")
-        for rubrique in composants["rubriques"]:
-            docs_rubrique.update(
-                df[df[0] == dico_rubriques[rubrique]]
-                .iloc[:, 1:]
-                .values.flatten()
-                .tolist()
-            )
-    docs_rubrique = set(
-        doc for doc in docs_rubrique if doc is not None and pd.notna(doc)
-    )
-    filtrer_par("rubrique", docs_rubrique)
-
-    # Docs titre
-    if composants["titre"] is not None:
-        liste_champs_requis.append("titre")
-        titre_propre = composants["titre"].strip()  # retire les espaces en trop
-        for mot in titre_propre.split(" "):
-            docs_titre &= set(df[df[0] == mot].iloc[:, 1:].values.flatten().tolist())
-
-    docs_titre = set(doc for doc in docs_titre if doc and pd.notna(doc))
-    filtrer_par("titre", docs_titre)
-
-    # Docs contenu
-    if composants["contenu"] is not None:
-        liste_champs_requis.append("contenu")
-        contenu_propre = composants["contenu"].strip()
-        docs_contenu = df[df[0] == contenu_propre].iloc[:, 1:].values.flatten().tolist()
-
-    docs_contenu = set(doc for doc in docs_contenu if doc and pd.notna(doc))
-    filtrer_par("texte", docs_contenu)
-
-    # Docs keywords négatifs
-    pas_keywords_remove = None
-    if composants["keywords"]:
-        liste_champs_requis.append("keywords")
-        for keyword in composants["keywords"]:
-            if keyword.startswith("pas "):
-                pas_keywords_remove = keyword
-                pas_keywords = keyword.split()
-                pas_keywords = pas_keywords[1:]
-
-                for pas_keyword in pas_keywords:
-                    docs_non_keywords &= set(
-                        df[df[0] == pas_keyword].iloc[:, 1:].values.flatten().tolist()
-                    )
-
-    docs_non_keywords = set(
-        doc for doc in docs_non_keywords if doc.split(":")[1] in ("texte", "titre")
-    )
-
-    if pas_keywords_remove is not None:
-        composants["keywords"].remove(pas_keywords_remove)
-    else:
-        docs_non_keywords = set()
-
-    # Si le mot 'ou' est resté seul dans les keywords, on renvoie un OU
-    # sur le titre et le contenu
-    if len(composants["keywords"]) == 1 and composants["keywords"][0] == "ou":
-        print(docs_titre, docs_contenu)
-        doc_retourne = set(docs_titre) | set(docs_contenu)
-        doc_retourne = set(doc.split(":")[0] for doc in doc_retourne)
-        return doc_retourne, composants["doc_type"]
-
-    # S'il y a un OU dans les keywords, on prend tout ce qu'il y a avant
-    # et l'on fait la disjonction avec ce qu'il y a après
-    if "ou" in composants["keywords"]:
-        liste_ou = composants["keywords"].index("ou")
-        liste_ou1 = composants["keywords"][:liste_ou]
-        liste_ou2 = composants["keywords"][liste_ou + 1 :]
-        docs_liste1 = tous_docs.copy()
-        docs_liste2 = tous_docs.copy()
-
-        for keyword in liste_ou1:
-            docs_liste1 &= set(
-                df[df[0] == keyword].iloc[:, 1:].values.flatten().tolist()
-            )
-
-        for keyword in liste_ou2:
-            docs_liste2 &= set(
-                df[df[0] == keyword].iloc[:, 1:].values.flatten().tolist()
+        termes = set(self.index_trigrammes.motif(motif))
+        for mot in self.trigrammes_lexique.motif(motif):
+            lemme = self.lexique.lemme(mot)
+            if lemme in self.termes_indexes:
+                termes.add(lemme)
+        return sorted(termes)
+
+    def postings(self, terme: str, champs: Iterable[str] = CHAMPS_INDEXES) -> int:
+        """
+        Renvoie les documents dans lesquels un terme apparaît dans
+        un des champs demandés.
+        :param terme: Le terme recherché.
+        :param champs: Les champs dans lesquels chercher le terme (tous par défaut).
+        :return: Le bitset des documents (vide si le terme n'est pas indexé).
+        """
+        docs = 0
+        for champ in champs:
+            docs |= self.bitset_terme(terme, champ)
+        return docs
+
+    def conjonction(
+        self, termes: list[str], champs: Iterable[str] = CHAMPS_INDEXES
+    ) -> int:
+        """
+        Renvoie les documents contenant tous les termes dans un même champ,
+        pour au moins un des champs demandés.
+        :param termes: Les termes recherchés.
+        :param champs: Les champs dans lesquels chercher les termes (tous par défaut).
+        :return: Le bitset des documents.
+        """
+        docs = 0
+        for champ in champs:
+            docs_champ = self.docs_par_champ[champ]
+            # Les termes sans bitset sont intersectés dans l'index compressé, qui
+            # ne décode que les blocs utiles de leurs postings
+            sans_bitset = [
+                terme
+                for terme in termes
+                if (terme, champ) not in self.bitsets
+                and analyse_phrase(terme) is None
+                and not est_motif(terme)
+            ]
+            if len(sans_bitset) < 2:
+                sans_bitset = []
+            else:
+                docs_champ &= depuis_docs(
+                    self.index.intersection(sans_bitset, champ),
+                    self.index.nb_documents,
+                )
+            for terme in termes:
+                if terme not in sans_bitset:
+                    docs_champ &= self.postings(terme, [champ])
+            docs |= docs_champ
+        return docs
+
+    def fichiers(self, docs: int) -> set[str]:
+        """
+        Renvoie les numéros de fichier d'un ensemble de documents.
+        :param docs: Le bitset des documents.
+        :return: Le set des numéros de fichier (sous forme de chaînes).
+        """
+        identifiants = vers_docs(docs, self.index.nb_documents)
+        return {str(fichier) for fichier in self.index.documents[identifiants].tolist()}
+
+    def agregation(self, docs: int, champ: str) -> set[str]:
+        """
+        Renvoie les valeurs d'un champ (numero ou rubrique) pour un ensemble d'articles.
+        :param docs: Le bitset des articles.
+        :param champ: Le champ agrégé ("numero" pour les bulletins, ou "rubrique").
+        :return: Le set des valeurs distinctes.
+        """
+        identifiants = vers_docs(docs, self.index.nb_documents)
+        return {
+            terme.strip() for terme in self.index.termes_documents(identifiants, champ)
+        }
+
+    def article(self, fichier: str) -> Optional[dict[str, str]]:
+        """
+        Renvoie les informations affichées d'un article (titre, date, extrait...).
+        :param fichier: Le numéro de fichier de l'article.
+        :return: Un dictionnaire, ou None si l'article n'est pas indexé.
+        """
+        return self.index.article(fichier)
+
+    def corriger_texte(self, texte: str) -> str:
+        """
+        Applique le correcteur orthographique sur un texte.
+        :param texte: Le texte à corriger (ou une expression entre guillemets).
+        Les mots avec jokers sont laissés tels quels.
+        :return: Le texte corrigé.
+        """
+        phrase = analyse_phrase(texte)
+        if phrase is not None:
+            return expression_phrase(
+                self.corriger_texte(" ".join(phrase[0])), phrase[1]
             )
-        docs_keywords = docs_liste1 | docs_liste2
-    else:
-        for keyword in composants["keywords"]:
-            docs_keywords &= set(
-                df[df[0] == keyword].iloc[:, 1:].values.flatten().tolist()
+        if est_motif(texte):
+            return " ".join(
+                mot if est_motif(mot) else self.corriger_texte(mot)
+                for mot in texte.split()
             )
-
-    if composants["image"] is not None:
-        liste_champs_requis.append("images")
-        if composants["image"] == 1:
-            docs_image.update(
-                df[df[0] == "presence_image"].iloc[:, 1:].values.flatten().tolist()
+        return correcteur_orthographique(
+            texte,
+            self.lexique,
+            1,
+            12,
+            54,
+            self.strategie_correction,
+            self.index_suppressions,
+            self.arbre_bk,
+            self.index_trigrammes,
+            self.termes_indexes,
+        ).strip()
+
+    def rechercher(self, requete: str) -> Tuple[Optional[set], str]:
+        """
+        Reçoit une requête, la traite, la transforme en requête structurée
+        puis parcourt l'index inversé intelligemment pour renvoyer les résultats.
+        :param requete: La requête à traiter.
+        :return: Un tuple (set de résultats, type de doc à retourner)
+        """
+        docs, type_resultats, composants = self.evaluation(requete)
+        if docs is None:
+            return None, composants["doc_type"]
+
+        # Traitement des différents cas de retour (article ou bulletin ou rubrique)
+        if type_resultats == "article":
+            return self.fichiers(docs), composants["doc_type"]
+
+        if type_resultats in ("rubrique", "bulletin"):
+            # Numéros de bulletin (ou rubriques) des articles trouvés
+            champ = "rubrique" if type_resultats == "rubrique" else "numero"
+            return self.agregation(docs, champ), composants["doc_type"]
+
+        return set(), "article"
+
+    def classement(
+        self, requete: str, k: int = NB_RESULTATS_CLASSES, elagage: bool = True
+    ) -> Tuple[Optional[list], str]:
+        """
+        Comme rechercher, mais renvoie les k articles les plus pertinents selon BM25,
+        du plus pertinent au moins pertinent. Les critères structurés de la requête
+        (date, rubrique, images, mots exclus...) filtrent les articles,
+        ses mots les classent. Les bulletins et les rubriques ne sont pas classés.
+        :param requete: La requête à traiter.
+        :param k: Le nombre d'articles renvoyés.
+        :param elagage: Si True, seuls les documents qui peuvent faire partie des k
+        meilleurs sont évalués (voir IndexSegmente.meilleurs_bm25), sinon tous les
+        documents sont évalués. Le résultat est le même.
+        :return: Un tuple (liste de résultats, type de doc à retourner)
+        """
+        docs, type_resultats, composants = self.evaluation(requete)
+        if docs is None:
+            return None, composants["doc_type"]
+
+        if type_resultats in ("rubrique", "bulletin"):
+            champ = "rubrique" if type_resultats == "rubrique" else "numero"
+            return sorted(self.agregation(docs, champ)), composants["doc_type"]
+
+        masque = vers_masque(docs, self.index.nb_documents)
+        if elagage:
+            candidats, scores, _ = self.index.meilleurs_bm25(
+                termes_requete(composants), POIDS_CLASSEMENT, k, masque
             )
+            if len(candidats) < k:
+                # Moins de k articles contiennent un terme : on complète avec
+                # les autres résultats (de score nul)
+                autres = np.setdiff1d(np.flatnonzero(masque), candidats)
+                candidats = np.concatenate([candidats, autres])
+                scores = np.concatenate([scores, np.zeros(len(autres))])
         else:
-            docs_image.update(
-                df[df[0] == "pas_image"].iloc[:, 1:].values.flatten().tolist()
-            )
-    docs_image = set(doc for doc in docs_image if doc is not None and pd.notna(doc))
-
-    # On récupère seulement les n° de fichiers et pas le champ associé
-    docs_date = set(doc.split(":")[0] for doc in docs_date)
-    docs_rubrique = set(doc.split(":")[0] for doc in docs_rubrique)
-    docs_titre = set(doc.split(":")[0] for doc in docs_titre)
-    docs_contenu = set(doc.split(":")[0] for doc in docs_contenu)
-    docs_keywords = set(doc.split(":")[0] for doc in docs_keywords)
-    docs_non_keywords = set(doc.split(":")[0] for doc in docs_non_keywords)
-    docs_image = set(doc.split(":")[0] for doc in docs_image)
-
-    # On prépare l'intersection des documents seulement sur les champs qui étaient requis
-    # (sinon on renverrait tout le temps des sets vides
-    # car l'intersection avec un set vide est un set vide)
-    docs_possibles = []
-    for champ_requis in liste_champs_requis:
-        if champ_requis == "date":
-            docs_possibles.append(docs_date)
-        elif champ_requis == "rubrique":
-            docs_possibles.append(docs_rubrique)
-        elif champ_requis == "titre":
-            docs_possibles.append(docs_titre)
-        elif champ_requis == "contenu":
-            docs_possibles.append(docs_contenu)
-        elif champ_requis == "keywords":
-            docs_possibles.append(docs_keywords)
-        elif champ_requis == "images":
-            docs_possibles.append(docs_image)
-
-    print(f"Docs sur keywords : {docs_keywords}")
-    print(f"Docs non keywords : {docs_non_keywords}")
-    print(f"Docs sur titre : {docs_titre}")
-    print(f"Docs sur contenu : {docs_contenu}")
-    print(f"Docs sur date : {docs_date}")
-    print(f"Docs sur rubrique : {docs_rubrique}")
-    print(f"Docs sur image : {docs_image}")
-
-    if not docs_possibles:
-        return None, composants["doc_type"]
-    intersect = set.intersection(*docs_possibles)
-
-    # Nettoyer et filtrer l'intersection
-    # On enlève les docs correspondant aux "pas keywords"
-    intersect = {doc.strip() for doc in intersect}
-    intersect -= docs_non_keywords
-
-    # Traitement des différents cas de retour (article ou bulletin ou rubrique)
-    if composants["doc_type"] == "article":
-        return intersect, composants["doc_type"]
-
-    df_str = df.astype(str).map(str.strip)
-    col0 = df_str.iloc[:, 0]
-    if composants["doc_type"] == "rubrique":
-        motifs = [f"{article}:rubrique" for article in intersect]
-        mask = df_str.apply(
-            lambda row: any(motif in row.values for motif in motifs), axis=1
+            # Scores accumulés pour tous les documents, puis restreints aux résultats
+            candidats = np.flatnonzero(masque)
+            scores = self.index.bm25(termes_requete(composants), POIDS_CLASSEMENT)[
+                candidats
+            ]
+
+        return (
+            selection_meilleurs(self.index.documents[candidats], scores, k),
+            composants["doc_type"],
         )
-        resultat = col0[mask].str.strip().unique()
-        return set(resultat), composants["doc_type"]
 
-    if composants["doc_type"] == "bulletin":
-        motifs = [f"{article}:numero" for article in intersect]
-        mask = df_str.apply(
-            lambda row: any(motif in row.values for motif in motifs), axis=1
+    @cached_property
+    def matrice_tfidf(self) -> MatriceTfIdf:
+        """
+        Matrice tf-idf du modèle vectoriel, chargée à la première recherche vectorielle.
+        """
+        return MatriceTfIdf(self.chemin_tfidf)
+
+    @cached_property
+    def espace_latent(self) -> EspaceLatent:
+        """
+        Espace latent (SVD tronquée) de la matrice tf-idf, chargé à la première
+        recherche latente.
+        """
+        return EspaceLatent(self.chemin_tfidf)
+
+    def tokens_requete(self, requete: str) -> list[str]:
+        """
+        Renvoie les mots d'une requête comparés aux articles par le modèle vectoriel :
+        ses termes de classement (voir termes_requete), non corrigés et tokenisés.
+        :param requete: La requête à traiter.
+        :return: La liste des tokens.
+        """
+        return tokenize(" ".join(termes_requete(self.analyseur.structure(requete))))
+
+    def recherche_vectorielle(
+        self, requete: str, k: int = NB_RESULTATS_CLASSES
+    ) -> list[str]:
+        """
+        Renvoie les k articles les plus proches d'une requête dans le modèle vectoriel
+        (similarité cosinus des poids tf-idf), du plus proche au moins proche.
+        Seuls les mots de la requête comptent : ses critères structurés (date,
+        rubrique, images...) sont ignorés, et ses mots ne sont pas corrigés.
+        :param requete: La requête à traiter.
+        :param k: Le nombre d'articles renvoyés.
+        :return: La liste des numéros de fichier des articles de similarité non nulle.
+        """
+        scores = self.matrice_tfidf.similarites(self.tokens_requete(requete))
+        candidats = np.flatnonzero(scores > 0)
+        return selection_meilleurs(
+            self.matrice_tfidf.documents[candidats], scores[candidats], k
         )
-        resultat = col0[mask].unique()
-        return set(resultat), composants["doc_type"]
 
-    return set(), "article"
+    def recherche_latente(
+        self, requete: str, k: int = NB_RESULTATS_CLASSES
+    ) -> list[str]:
+        """
+        Comme recherche_vectorielle, mais dans l'espace latent : les articles proches
+        de la requête peuvent ne contenir aucun de ses mots (synonymes).
+        :param requete: La requête à traiter.
+        :param k: Le nombre d'articles renvoyés.
+        :return: La liste des numéros de fichier des articles de similarité positive.
+        """
+        scores = self.espace_latent.similarites_latentes(self.tokens_requete(requete))
+        candidats = np.flatnonzero(scores > 0)
+        return selection_meilleurs(
+            self.espace_latent.documents[candidats], scores[candidats], k
+        )
 
+    @cached_property
+    def index_similarite(self) -> IndexSimilarite:
+        """
+        Index des articles similaires, chargé à la première demande.
+        """
+        return IndexSimilarite(self.chemin_similarite)
+
+    def similaires(self, fichier: str, k: int = NB_SIMILAIRES) -> list[str]:
+        """
+        Renvoie les articles les plus similaires à un article (MinHash et LSH).
+        Les articles ajoutés par ingestion.py n'y figurent qu'après une
+        reconstruction de l'index des articles similaires.
+        :param fichier: Le numéro de fichier de l'article.
+        :param k: Le nombre maximal d'articles renvoyés.
+        :return: La liste des numéros de fichier, du plus similaire au moins similaire
+        (vide si l'article n'est pas dans l'index des articles similaires).
+        """
+        similaires = self.index_similarite.similaires(fichier, k)
+        return [fichier_similaire for fichier_similaire, _ in similaires or []]
+
+    def evaluation(self, requete: str) -> Tuple[Optional[int], str, dict]:
+        """
+        Traite une requête et évalue ses critères sur l'index. Les résultats sont
+        gardés en cache, sous la forme canonique de la requête corrigée (voir
+        cle_requete) : une requête déjà évaluée n'est que corrigée.
+        :param requete: La requête à traiter.
+        :return: Un tuple (bitset des articles trouvés, ou None si la requête n'a aucun
+        critère ; type de résultats : article, bulletin ou rubrique ; composants de
+        la requête structurée, après correction)
+        """
+        # Prise en compte des bulletins ajoutés (ou fusionnés) depuis le chargement
+        self.actualiser()
+
+        composants = self.analyse(requete)
+        docs, type_resultats, composants = self.cache_resultats.obtenir(
+            cle_requete(composants),
+            lambda: self.evaluation_composants(composants),
+            self.index.etat,
+        )
+        # Les composants sont modifiés par les appelants : chacun a sa copie
+        return docs, type_resultats, copy.deepcopy(composants)
+
+    def analyse(self, requete: str) -> dict:
+        """
+        Transforme une requête en requête structurée et corrige ses mots
+        (voir AnalyseurRequetes).
+        :param requete: La requête à traiter.
+        :return: Les composants de la requête structurée.
+        """
+        composants = self.analyseur.analyse(requete, self.index.etat)
+        JOURNAL.debug("Requête structurée : %s", composants)
+        return composants
+
+    def evaluation_composants(
+        self, composants: dict
+    ) -> Tuple[Optional[int], str, dict]:
+        """
+        Évalue les critères d'une requête structurée sur l'index.
+        :param composants: Les composants de la requête structurée, après correction
+        (modifiés en place).
+        :return: Un tuple (bitset des articles trouvés, ou None si la requête n'a aucun
+        critère ; type de résultats ; composants)
+        """
+        liste_champs_requis = []
+
+        docs_date = 0
+        docs_rubrique = 0
+        docs_contenu = 0
+        docs_image = 0
+
+        # Docs date
+        if composants["date"] is not None:
+            liste_champs_requis.append("date")
+            if "exact" in composants["date"]:
+                date = composants["date"]["exact"]
+                composants["date"]["min"], composants["date"]["max"] = (
+                    get_min_max_dates(date)
+                )
+                del composants["date"]["exact"]
+            replace_min_and_max(composants["date"])
+            # Sans borne min ni max (exclusion seule), aucune date n'est retenue
+            if "min" in composants["date"] or "max" in composants["date"]:
+                bornes = [
+                    (
+                        datetime.strptime(composants["date"][borne], "%d/%m/%Y").date()
+                        if borne in composants["date"]
+                        else None
+                    )
+                    for borne in ("min", "max")
+                ]
+                docs_date = depuis_docs(
+                    self.index.dates_entre(*bornes), self.index.nb_documents
+                )
+            if "pas" in composants["date"]:
+                # Exclusion d'un mois (****-MM-**) par la facette des mois
+                mois = int(composants["date"]["pas"].split("-")[1])
+                docs_date &= ~self.docs_par_mois[mois]
+
+        # Docs rubrique
+        dico_rubriques = {
+            "focus": "focus",
+            "au coeur regions": "au coeur des régions",
+            "evenement": "evénement",
+            "evénement": "evénement",
+            "événement": "evénement",
+            "évènement": "evénement",
+            "actualité innovation": "actualité innovation",
+            "actualités innovation": "actualités innovation",
+            "actualités innovations": "actualités innovations",
+            "direct laboratoires": "en direct des laboratoires",
+            "direct labos": "en direct des labos",
+            "a lire": "a lire",
+            "horizon enseignement": "horizon enseignement",
+            "horizons enseignement": "horizons enseignement",
+            "horizons formation enseignement": "horizon formation enseignement",
+            "horizon formation": "horizon formation",
+            "côté pôles": "du côté des pôles",
+        }
+
+        if composants["rubriques"] is not None and composants["rubriques"]:
+            liste_champs_requis.append("rubrique")
+            for rubrique in composants["rubriques"]:
+                docs_rubrique |= self.postings(dico_rubriques[rubrique], ["rubrique"])
+
+        # Docs titre
+        mots_titre = []
+        if composants["titre"] is not None:
+            liste_champs_requis.append("titre")
+            titre_propre = composants["titre"].strip()  # retire les espaces en trop
+            # Une expression entre guillemets est cherchée telle quelle
+            if analyse_phrase(titre_propre) is not None:
+                mots_titre = [titre_propre]
+            else:
+                mots_titre = titre_propre.split(" ")
+        docs_titre = self.conjonction(mots_titre, ["titre"])
+
+        # Docs contenu
+        if composants["contenu"] is not None:
+            liste_champs_requis.append("contenu")
+            contenu_propre = composants["contenu"].strip()
+            docs_contenu = self.postings(contenu_propre, ["texte"])
+
+        # Docs keywords négatifs
+        pas_keywords_remove = None
+        mots_pas = []
+        if composants["keywords"]:
+            liste_champs_requis.append("keywords")
+            for keyword in composants["keywords"]:
+                if keyword.startswith("pas "):
+                    pas_keywords_remove = keyword
+                    expression = keyword[len("pas ") :]
+                    if analyse_phrase(expression) is not None:
+                        mots_pas.append(expression)
+                    else:
+                        mots_pas.extend(expression.split())
+
+        if pas_keywords_remove is not None:
+            docs_non_keywords = self.conjonction(mots_pas, ["titre", "texte"])
+            composants["keywords"].remove(pas_keywords_remove)
+        else:
+            docs_non_keywords = 0
+
+        # Si le mot 'ou' est resté seul dans les keywords, on renvoie un OU
+        # sur le titre et le contenu
+        if len(composants["keywords"]) == 1 and composants["keywords"][0] == "ou":
+            return docs_titre | docs_contenu, "article", composants
+
+        # S'il y a un OU dans les keywords, on prend tout ce qu'il y a avant
+        # et l'on fait la disjonction avec ce qu'il y a après
+        if "ou" in composants["keywords"]:
+            liste_ou = composants["keywords"].index("ou")
+            liste_ou1 = composants["keywords"][:liste_ou]
+            liste_ou2 = composants["keywords"][liste_ou + 1 :]
+            docs_keywords = self.conjonction(liste_ou1) | self.conjonction(liste_ou2)
+        else:
+            docs_keywords = self.conjonction(composants["keywords"])
 
-if __name__ == "__main__":
-    queries = [
-        "Afficher la liste des articles qui parlent des systèmes embarqués dans la rubrique Horizons Enseignement.",
-        "Je voudrais les articles qui parlent de cuisine moléculaire.",
-        "Quels sont les articles sur la réalité virtuelle ?",
-        "Je voudrais les articles qui parlent d’airbus ou du projet Taxibot.",
-        "Je voudrais les articles qui parlent du tennis.",
-        "Je voudrais les articles traitant de la Lune.",
-        "Quels sont les articles parus entre le 3 mars 2013 et le 4 mai 2013 évoquant les Etats-Unis ?",
-        "Afficher les articles de la rubrique en direct des laboratoires.",
-        "Je veux les articles de la rubrique Focus parlant d’innovation.",
-        "Quels sont les articles parlant de la Russie ou du Japon ?",
-        "Je voudrais les articles de 2011 sur l’enseignement.",
-        "Je voudrais les articles dont le titre contient le mot chimie.",
-        "Je veux les articles de 2014 et de la rubrique Focus et parlant de la santé.",
-        "Je souhaite les rubriques des articles parlant de nutrition ou de vins.",
-        "Je cherche les recherches sur l’aéronautique.",
-        "Article traitant des Serious Game et de la réalité virtuelle.",
-        "Quels sont les articles traitant d’informatique ou de reseaux.",
-        "Je voudrais les articles de la rubrique Focus mentionnant un laboratoire.",
-        "Quels sont les articles publiés au mois de novembre 2011 portant sur de la recherche.",
-        "Je veux des articles sur la plasturgie.",
-        "Quels articles portent à la fois sur les nanotechnologies et les microsatellites.",
-        "Je voudrais les articles liés à la recherche scientifique publiés en Février 2010.",
-        "Donner les articles qui parlent d’apprentissage et de la rubrique Horizons Enseignement.",
-        "Chercher les articles dans le domaine industriel et datés à partir de 2012.",
-        "Nous souhaitons obtenir les articles du mois de Juin 2013 et parlant du cerveau.",
-        "Rechercher tous les articles sur le CNRS et l’innovation à partir de 2013.",
-        "Je cherche des articles sur les avions.",
-        "Donner les articles qui portent sur l’alimentation de l’année 2013.",
-        "Articles dont le titre traite du Tara Oceans Polar Circle.",
-        "Je veux des articles parlant de smartphones.",
-        "Quels sont les articles parlant de projet européen de l’année 2014 ?",
-        "Afficher les articles de la rubrique A lire.",
-        "Je veux les articles parlant de Neurobiologie.",
-        "Quels sont les articles possédant le mot France ?",
-        "Articles écrits en Décembre 2012 qui parlent de l’environnement ?",
-        "Quels sont les articles contenant les mots voitures et électrique ?",
-        "Je voudrais les articles avec des images dont le titre contient le mot croissance.",
-        "Quels sont les articles qui parlent de microbiologie ?",
-        "J’aimerais la liste des articles écrits après janvier 2014 et qui parlent d’informatique ou de télécommunications.",
-        "Je veux les articles de 2012 qui parlent de l’écologie en France.",
-        "Quels articles parlent de réalité virtuelle ?",
-        "Dans quelles rubriques trouve-t-on des articles sur l’alimentation ?",
-        "Liste des articles qui parlent soit du CNRS, soit des grandes écoles, mais pas de Centrale Paris.",
-        "J’aimerais un article qui parle de biologie et qui date d’après le 2 juillet 2012 ?",
-        "Quels sont les articles qui parlent d’innovations technologiques ?",
-        "Je cherche les articles dont le titre contient le mot performants.",
-        "Je voudrais tout les articles provenant de la rubrique événement et contenant le mot congres dans le titre.",
-        "Je cherche les articles à propos des fleurs ou des arbres.",
-        "Je souhaites avoir tout les articles donc la rubrique est focus ou Actualités Innovations et qui contiennent les mots chercheurs et paris.",
-        "Je veux les articles qui parlent du sénégal.",
-        "Je voudrais les articles qui parlent d’innovation.",
-        "Je voudrais les articles dont le titre contient le mot europe.",
-        "Je voudrais les articles qui contiennent les mots Ecole et Polytechnique.",
-        "Je cherche les articles provenant de la rubrique en direct des laboratoires.",
-        "Je voudrais les articles qui datent du 1 décembre 2012 et dont la rubrique est Actualités Innovations.",
-        "Dans quels articles Laurent Lagrost est-il cité ?",
-        "Quels articles évoquent la ville de Grenoble ?",
-        "Articles parlant de drones.",
-        "Articles parlant de molécules.",
-        "Articles contenant une image.",
-        "Articles parlant d’université.",
-        "Lister tous les articles dont la rubrique est Focus et qui ont des images.",
-        "Quels sont les articles dont le titre évoque la recherche ?",
-        "Articles dont la rubrique est 'Horizon Enseignement' mais qui ne parlent pas d’ingénieurs.",
-        "Tous les articles dont la rubrique est 'En direct des laboratoires' ou 'Focus' et qui évoquent la médecine.",
-        "Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin.",
-        "Quels sont les articles dont le titre contient le terme 'marché' et le mot 'projet' ?",
-        "Je voudrais les articles dont le titre contient le mot 3D.",
-        "Je veux voir les articles de la rubrique Focus et publiés entre 30/08/2011 et 29/09/2011.",
-        "Je cherche les articles sur le Changement climatique publiés après 29/09/2011.",
-        "Quels articles parlent d’aviation et ont été publiés en 2015 ?",
-        "Quels sont les articles de la rubrique évènement qui parlent de la ville de Paris ?",
-        "Je veux les articles impliquant le CNRS et qui parlent de chimie.",
-        "Trouver les articles qui mentionnent Fink.",
-        "Quels articles parlent de la France et de l’Allemagne ?",
-        "Je veux les articles parlant de l’Argentine ou du Brésil.",
-        "Je veux les articles qui parlent de l’hydravion.",
-        "Je veux les articles qui parlent du fauteuil roulant et qui ont pour rubrique Actualité Innovation.",
-        "Je veux les articles qui sont écrits en 2012 et parlent du « chrono-environnement ».",
-        "Quels sont les articles qui parlent des robots et des chirurgiens ?",
-        "Je veux les articles qui parlent des systmes embarqués et non pas la robotique.",
-        "Je cherche les articles qui parlent des alimentations ou des agricultures.",
-        "Quels sont les articles dont le titre contient le mot histoire ?",
-        "Je veux les articles dont le titre est « bi-mot filière agricole ».",
-        "Listez-moi les articles qui parlent de 3D et qui sont écrits entre 2010 et 2011.",
-        "Quels sont les articles dont le titre contient biocarburant ou le contenu parle des bioénergies ?",
-        "Quelle sont les articles qui concernent le CEA ?",
-        "Je veux les articles qui parlent philosophie.",
-        "Je veux les articles sans image.",
-        "Retournez les articles dont le titre contient le mot nucléaire.",
-    ]
+        if composants["image"] is not None:
+            liste_champs_requis.append("images")
+            if composants["image"] == 1:
+                docs_image = self.postings("presence_image", ["images"])
+            else:
+                docs_image = self.postings("pas_image", ["images"])
+
+        # On prépare l'intersection des documents seulement sur les champs qui étaient requis
+        # (sinon on renverrait tout le temps des sets vides
+        # car l'intersection avec un set vide est un set vide)
+        docs_possibles = []
+        for champ_requis in liste_champs_requis:
+            if champ_requis == "date":
+                docs_possibles.append(docs_date)
+            elif champ_requis == "rubrique":
+                docs_possibles.append(docs_rubrique)
+            elif champ_requis == "titre":
+                docs_possibles.append(docs_titre)
+            elif champ_requis == "contenu":
+                docs_possibles.append(docs_contenu)
+            elif champ_requis == "keywords":
+                docs_possibles.append(docs_keywords)
+            elif champ_requis == "images":
+                docs_possibles.append(docs_image)
+
+        # Décoder les bitsets en numéros de fichier a un coût proportionnel au
+        # corpus : seulement si le journal de débogage est actif
+        if JOURNAL.isEnabledFor(logging.DEBUG):
+            for nom, docs in (
+                ("keywords", docs_keywords),
+                ("non keywords", docs_non_keywords),
+                ("titre", docs_titre),
+                ("contenu", docs_contenu),
+                ("date", docs_date),
+                ("rubrique", docs_rubrique),
+                ("image", docs_image),
+            ):
+                JOURNAL.debug("Docs sur %s : %s", nom, self.fichiers(docs))
+
+        if not docs_possibles:
+            return None, composants["doc_type"], composants
+        intersect = reduce(and_, docs_possibles, self.univers)
+
+        # On enlève les docs correspondant aux "pas keywords"
+        intersect &= ~docs_non_keywords
+
+        return intersect, composants["doc_type"], composants
+
+
+_MOTEUR_PARTAGE: Optional[MoteurRecherche] = None
+_VERROU_MOTEUR = threading.Lock()
+
+
+def moteur_partage() -> MoteurRecherche:
+    """
+    Renvoie l'instance de moteur partagée par l'application,
+    en la créant au premier appel.
+    :return: Le moteur de recherche.
+    """
+    global _MOTEUR_PARTAGE  # pylint: disable=global-statement
+    with _VERROU_MOTEUR:
+        if _MOTEUR_PARTAGE is None:
+            _MOTEUR_PARTAGE = MoteurRecherche()
+    return _MOTEUR_PARTAGE
 
-    for queri in queries:
+
+def moteur(requete: str) -> Tuple[Optional[set], str]:
+    """
+    Moteur de recherche de la base d'information de l'ADIT.
+    Il reçoit en entrée une requête, la traite, la transforme en requête structurée
+    puis parcourt l'index inversé intelligemment pour renvoyer les résultats.
+    :param requete: La requête à traiter.
+    :return: Un tuple (set de résultats, type de doc à retourner)
+    """
+    return moteur_partage().rechercher(requete)
+
+
+if __name__ == "__main__":
+    for queri in REQUETES_EXEMPLES:
         moteur(queri)
@@ -2,36 +2,120 @@
 Fonctions pour le traitement des requêtes.
 """
 
+import copy
 import string
 import re
 from datetime import datetime
-from typing import Tuple, List, Dict, Optional
+from typing import Callable, Hashable, Tuple, List, Dict, Optional
+from cache import DUREE_VIE_CACHE, TAILLE_CACHE, CacheLRU
 
+# Fichier des mots ignorés dans les requêtes
+FICHIER_STOP_WORDS = "data/stop_words_requetes.txt"
 
-def nettoyage_requete(requete: str) -> str:
+# Expression entre guillemets, éventuellement suivie de ~N : ses mots doivent se suivre,
+# avec au plus N mots intercalés au total. Des guillemets vides (ceux d'une rubrique
+# déjà extraite de la requête) ne sont pas une expression
+MOTIF_PHRASE = re.compile(r"«\s*([^«»\s][^«»]*?)\s*»(?:~(\d+))?")
+
+# Expression entre guillemets droits, traitée comme entre « »
+MOTIF_GUILLEMETS = re.compile(r'"([^"]+)"')
+
+# Jokers d'un mot-clé : "*" (une suite de caractères quelconque) et "?" (un caractère)
+JOKERS = "*?"
+
+# Ponctuation retirée des requêtes (le ~ indique le nombre de mots intercalés
+# permis dans une expression)
+PONCTUATION_RETIREE = str.maketrans(
+    "", "", "".join(c for c in string.punctuation if c not in "-~" + JOKERS)
+)
+
+# Point d'interrogation qui n'est pas suivi d'une lettre ou d'un joker : c'est une
+# ponctuation ("virtuelle ?"), pas un joker ("r?seau")
+MOTIF_INTERROGATION = re.compile(r"\?(?![\w*?])")
+
+MOTIF_ESPACES = re.compile(r"\s+")
+
+
+def expression_phrase(texte: str, ecart: int = 0) -> str:
+    """
+    Écrit une expression à chercher telle quelle (« mot1 mot2 », ou « mot1 mot2 »~N
+    si N mots peuvent être intercalés).
+    :param texte: Les mots de l'expression.
+    :param ecart: Le nombre maximal de mots intercalés.
+    :return: L'expression.
+    """
+    return f"« {' '.join(texte.split())} »" + (f"~{ecart}" if ecart else "")
+
+
+def analyse_phrase(expression: str) -> Optional[Tuple[List[str], int]]:
+    """
+    Décompose une expression écrite par expression_phrase.
+    :param expression: Un mot-clé, un titre ou un contenu de la requête structurée.
+    :return: Un tuple (mots, nombre maximal de mots intercalés),
+    ou None si ce n'est pas une expression entre guillemets.
+    """
+    m = MOTIF_PHRASE.fullmatch(expression.strip())
+    if m is None:
+        return None
+    return m.group(1).split(), int(m.group(2) or 0)
+
+
+def mot_ou_phrase(m: re.Match) -> str:
+    """
+    Renvoie le mot-clé correspondant à une expression entre guillemets trouvée
+    par MOTIF_PHRASE : l'expression si elle a plusieurs mots, sinon le mot seul.
+    :param m: La correspondance.
+    :return: Le mot-clé.
+    """
+    if len(m.group(1).split()) > 1:
+        return expression_phrase(m.group(1), int(m.group(2) or 0))
+    return m.group(1)
+
+
+def est_motif(mot: str) -> bool:
+    """
+    Indique si un mot-clé contient des jokers (voir trigrammes.IndexTrigrammes.motif).
+    :param mot: Le mot-clé.
+    :return: True si le mot-clé est un motif.
+    """
+    return any(joker in mot for joker in JOKERS)
+
+
+def charger_stop_words(fichier_stop_words: str = FICHIER_STOP_WORDS) -> set[str]:
+    """
+    Charge les mots ignorés dans les requêtes.
+    :param fichier_stop_words: Le fichier des mots (un par ligne).
+    :return: L'ensemble des mots.
+    """
+    with open(fichier_stop_words, "r", encoding="utf-8") as f:
+        return {ligne.strip() for ligne in f}
+
+
+def nettoyage_requete(requete: str, stop_words: Optional[set[str]] = None) -> str:
     """
     Corrige les requêtes en supprimant les 'stop words' (par rapport aux requêtes du TD)
     et les ponctuations.
     :param requete: La requête à corriger.
+    :param stop_words: Les mots ignorés (voir charger_stop_words), lus dans
+    FICHIER_STOP_WORDS s'ils ne sont pas donnés.
     :return: La requête corrigée
     """
+    # Les expressions entre guillemets droits sont traitées comme entre « »
+    requete = MOTIF_GUILLEMETS.sub(r"« \1 »", requete)
+
     # Normalisation apostrophes
     requete = requete.replace("’", "'")
     requete = requete.replace("'", " ' ")
 
-    with open("data/stop_words_requetes.txt", "r", encoding="utf-8") as f:
-        liste_stop_words = [ligne.strip() for ligne in f]
+    if stop_words is None:
+        stop_words = charger_stop_words()
 
     requete = requete.lower()
-    liste_mots = [mot for mot in requete.split() if mot not in liste_stop_words]
-
-    requete_propre = " ".join(liste_mots)
-    punct = string.punctuation
-    for c in punct:
-        if c != "-":
-            requete_propre = requete_propre.replace(c, "")
+    liste_mots = [mot for mot in requete.split() if mot not in stop_words]
 
-    return requete_propre
+    return MOTIF_INTERROGATION.sub("", " ".join(liste_mots)).translate(
+        PONCTUATION_RETIREE
+    )
 
 
 def extract_doctype(requete: str) -> Tuple[str, str]:
@@ -65,57 +149,71 @@ def extract_doctype(requete: str) -> Tuple[str, str]:
     return doc_type, texte_propre
 
 
+# Le texte est sans stop-words quand les rubriques en sont extraites,
+# il faut donc lister les rubriques sans stop-words
+# (et certaines avec possiblement des fautes).
+LISTE_RUBRIQUES = [
+    "focus",
+    "au coeur regions",
+    "evenement",
+    "événement",
+    "evénement",
+    "évènement",
+    "direct laboratoires",
+    "direct labos",
+    "a lire",
+    "horizon enseignement",
+    "horizons enseignement",
+    "horizons formation enseignement",
+    "horizon formation",
+    "actualités innovations",
+    "actualités innovation",
+    "actualité innovation",
+    "côté pôles",
+]
+
+# Cas : rubrique1 ou rubrique2
+_MOTIF_RUBRIQUE = "|".join(re.escape(r) for r in LISTE_RUBRIQUES)
+MOTIF_OU_RUBRIQUES = re.compile(rf"({_MOTIF_RUBRIQUE})\s+ou\s+({_MOTIF_RUBRIQUE})")
+
+
 def extract_rubriques(requete: str) -> Tuple[List[str], str]:
     """
     Extrait la ou les rubriques demandées dans une requête.
     :param requete: La requête à analyser.
     :return: Un tuple (rubrique, requête sans la rubrique)
     """
-    # Le texte est sans stop-words à ce stade,
-    # il faut donc lister les rubriques sans stop-words
-    # (et certaines avec possiblement des fautes).
-    liste_rubriques = [
-        "focus",
-        "au coeur regions",
-        "evenement",
-        "événement",
-        "evénement",
-        "évènement",
-        "direct laboratoires",
-        "direct labos",
-        "a lire",
-        "horizon enseignement",
-        "horizons enseignement",
-        "horizons formation enseignement",
-        "horizon formation",
-        "actualités innovations",
-        "actualités innovation",
-        "actualité innovation",
-        "côté pôles",
-    ]
-
     rubriques = []
     texte = requete.lower()
 
     # Remplacer tous les " ou " entre les rubriques par juste un espace
-    # (on prépare la regex avant de supprimer les rubriques)
-    rubrique_pattern = "|".join(re.escape(r) for r in liste_rubriques)
-    # Cas : rubrique1 ou rubrique2
-    texte = re.sub(
-        rf"({rubrique_pattern})\s+ou\s+({rubrique_pattern})", r"\1 \2", texte
-    )
+    # (avant de supprimer les rubriques)
+    texte = MOTIF_OU_RUBRIQUES.sub(r"\1 \2", texte)
 
-    for rubrique in liste_rubriques:
+    for rubrique in LISTE_RUBRIQUES:
         if rubrique in texte:
             rubriques.append(rubrique)
             texte = texte.replace(rubrique, "")
 
     # Nettoyage des espaces
-    requete_propre = re.sub(r"\s+", " ", texte).strip()
+    requete_propre = MOTIF_ESPACES.sub(" ", texte).strip()
 
     return rubriques, requete_propre
 
 
+# Mots avec apostrophe (d'ingénieurs)
+MOTIF_ELISION = re.compile(r"\b(d|l|qu|n|s|c|j|t)'", flags=re.IGNORECASE)
+
+# Mot-clé : une expression entre guillemets ou un mot (éventuellement composé),
+# éventuellement avec des jokers
+MOTIF_MOT_CLE = re.compile(
+    MOTIF_PHRASE.pattern + r"|[*?]*\b\w+(?:(?:-|[*?]+)\w+)*\b[*?]*"
+)
+
+# Petits mots ignorés entre "pas" et le mot-clé exclu
+STOPWORDS_APRES_PAS = {"de", "du", "des", "d", "la", "le", "les", "l"}
+
+
 def extract_keywords(requete: str) -> List[str]:
     """
     Extrait les mots-clés d'une requête (à supposer qu'elle ne contienne plus de dates,
@@ -126,18 +224,21 @@ def extract_keywords(requete: str) -> List[str]:
     keywords = []
 
     # 2. Séparer les mots avec apostrophes comme d'ingénieurs → d ingénieurs
-    requete = re.sub(r"\b(d|l|qu|n|s|c|j|t)'", r"\1 ", requete, flags=re.IGNORECASE)
+    requete = MOTIF_ELISION.sub(r"\1 ", requete)
     print(requete)
 
-    mots = re.findall(r"\b\w+(?:-\w+)*\b", requete)
-    stopwords_apres_pas = {"de", "du", "des", "d", "la", "le", "les", "l"}
+    # Une expression entre guillemets compte pour un seul mot-clé
+    mots = [
+        m.group(0) if m.group(1) is None else mot_ou_phrase(m)
+        for m in MOTIF_MOT_CLE.finditer(requete)
+    ]
 
     i = 0
     while i < len(mots):
         if mots[i].lower() == "pas":
             j = i + 1
             # Sauter les petits mots inutiles entre "pas" et le mot-clé
-            while j < len(mots) and mots[j].lower() in stopwords_apres_pas:
+            while j < len(mots) and mots[j].lower() in STOPWORDS_APRES_PAS:
                 j += 1
             if j < len(mots):
                 keywords.append("pas " + mots[j])
@@ -151,6 +252,12 @@ def extract_keywords(requete: str) -> List[str]:
     return keywords
 
 
+# "titre" suivi d'une expression entre guillemets, ou d'un mot ; mot suivi de "titre"
+MOTIF_TITRE_PHRASE = re.compile(r"\btitre\s+(" + MOTIF_PHRASE.pattern + ")")
+MOTIF_TITRE_MOT = re.compile(r"\btitre\s+(\S+)")
+MOTIF_MOT_TITRE = re.compile(r"\b(\w+)\s+titre\b")
+
+
 def extract_titre(requete: str) -> Tuple[Optional[str], str]:
     """
     Extrait une chaîne de caractère si le titre est mentionné
@@ -160,45 +267,37 @@ def extract_titre(requete: str) -> Tuple[Optional[str], str]:
     """
     titre = None
 
-    # Cas "titre" + contenu entre « » ou " " ou ' '
-    m = re.search(r'\btitre\s+(["«\'])(.+?)["»\']', requete)
+    # Cas "titre" + contenu entre « » (éventuellement suivi de ~N)
+    m = MOTIF_TITRE_PHRASE.search(requete)
     if m:
-        titre = m.group(2)
-        # Supprimer 'titre «...», titre "...", titre '...'
-        pattern = (
-            r"\btitre\s+["
-            + re.escape(m.group(1))
-            + r"]"
-            + re.escape(titre)
-            + r"["
-            + ("»" if m.group(1) == "«" else re.escape(m.group(1)))
-            + r"]"
-        )
-        requete = re.sub(pattern, "", requete, count=1)
+        # Un titre de plusieurs mots est cherché comme une expression
+        titre = mot_ou_phrase(MOTIF_PHRASE.fullmatch(m.group(1)))
+        # Supprimer 'titre «...»'
+        requete = requete[: m.start()] + requete[m.end() :]
     else:
         # Cas "titre" + <mot>
-        m = re.search(r"\btitre\s+(\S+)", requete)
+        m = MOTIF_TITRE_MOT.search(requete)
         if m:
-            titre_candidat = m.group(1)
-            titre = titre_candidat
-            requete = re.sub(
-                r"\btitre\s+" + re.escape(titre_candidat), "", requete, count=1
-            )
+            titre = m.group(1)
+            # Supprimer 'titre <mot>'
+            requete = requete[: m.start()] + requete[m.end() :]
 
     # Cas <mot> + "titre" (si titre est en dernier)
     if not titre:
-        m = re.search(r"\b(\w+)\s+titre\b", requete)
+        m = MOTIF_MOT_TITRE.search(requete)
         if m:
             titre = m.group(1)
-            requete = re.sub(
-                r"\b" + re.escape(titre) + r"\s+titre\b", "", requete, count=1
-            )
+            requete = requete[: m.start()] + requete[m.end() :]
 
-    requete_propre = re.sub(r"\s+", " ", requete).strip()
+    requete_propre = MOTIF_ESPACES.sub(" ", requete).strip()
 
     return titre, requete_propre
 
 
+# "contenu" suivi d'un mot ou d'une expression entre guillemets
+MOTIF_CONTENU = re.compile(r"\bcontenu\s+(" + MOTIF_PHRASE.pattern + r"|\S+)")
+
+
 def extract_contenu(requete: str) -> Tuple[Optional[str], str]:
     """
     Extrait un mot en lien avec le contenu si le mot "contenu"
@@ -207,14 +306,15 @@ def extract_contenu(requete: str) -> Tuple[Optional[str], str]:
     :return: Un tuple (contenu, requete sans contenu)
     """
     contenu = None
-    # Chercher "contenu" + <mot>
-    m = re.search(r"\bcontenu\s+(\S+)", requete)
+    # Chercher "contenu" + <mot> ou "contenu" + « expression »
+    m = MOTIF_CONTENU.search(requete)
     if m:
-        contenu = m.group(1)
+        phrase = MOTIF_PHRASE.fullmatch(m.group(1))
+        contenu = m.group(1) if phrase is None else mot_ou_phrase(phrase)
         # Supprimer "contenu <mot>" du texte
-        requete = re.sub(r"\bcontenu\s+" + re.escape(contenu), "", requete, count=1)
+        requete = requete[: m.start()] + requete[m.end() :]
 
-    requete_propre = re.sub(r"\s+", " ", requete).strip()
+    requete_propre = MOTIF_ESPACES.sub(" ", requete).strip()
     return contenu, requete_propre
 
 
@@ -237,6 +337,15 @@ MOIS_FR = {
 }
 
 
+_MOTIF_MOIS = "|".join(MOIS_FR)
+
+# Formats de date reconnus : 14 juin 2013, juin 2013, 14062013, 2013
+MOTIF_JOUR_MOIS_ANNEE = re.compile(r"(\d{1,2})\s+([a-zéèêç]+)\s+(\d{4})")
+MOTIF_MOIS_ANNEE = re.compile(r"([a-zéèêç]+)\s+(\d{4})")
+MOTIF_JJMMAAAA = re.compile(r"(\d{8})")
+MOTIF_ANNEE = re.compile(r"(19|20)\d{2}")
+
+
 def parse_date_str(date_texte: str) -> Optional[str]:
     """
     Renvoie un pattern de date étant donné une chaîne de caractères.
@@ -244,72 +353,85 @@ def parse_date_str(date_texte: str) -> Optional[str]:
     :return: Une version formatée de la date (YYYY-MM-DD).
     """
     date_texte = date_texte.strip()
-    m = re.match(r"(\d{1,2})\s+([a-zéèêç]+)\s+(\d{4})", date_texte)
+    m = MOTIF_JOUR_MOIS_ANNEE.match(date_texte)
     if m:
         jour, mois, annee = m.groups()
         if mois in MOIS_FR:
             return f"{annee}-{MOIS_FR[mois]}-{int(jour):02d}"
-    m = re.match(r"([a-zéèêç]+)\s+(\d{4})", date_texte)
+    m = MOTIF_MOIS_ANNEE.match(date_texte)
     if m:
         mois, annee = m.groups()
         if mois in MOIS_FR:
             return f"{annee}-{MOIS_FR[mois]}-**"
-    m = re.match(r"(\d{8})", date_texte)
+    m = MOTIF_JJMMAAAA.match(date_texte)
     if m:
         try:
             d = datetime.strptime(m.group(1), "%d%m%Y")
             return d.strftime("%Y-%m-%d")
         except ValueError:
             return None
-    m = re.match(r"(19|20)\d{2}", date_texte)
+    m = MOTIF_ANNEE.match(date_texte)
     if m:
         return f"{m.group(0)}-**-**"
     return None
 
 
+# Informations de date retirées des requêtes, dans l'ordre
+MOTIFS_SANS_DATES = [
+    re.compile(r"\b\d{1,2}\s+(" + _MOTIF_MOIS + r")\s+\d{4}\b"),
+    re.compile(r"\b(" + _MOTIF_MOIS + r")\s+\d{4}\b"),
+    re.compile(r"\b(au mois de|au mois|en|de|du|dans)\s+(" + _MOTIF_MOIS + r")\b"),
+    re.compile(r"\b(19|20)\d{2}\b"),
+    re.compile(r"\b\d{8}\b"),  # important pour enlever 14062013 etc.
+    re.compile(
+        r"\b(entre|et|avant|après|apres|d’après|d\'apres|année|depuis|pas au mois de|au mois|mois|à partir)\b"
+    ),
+]
+
+
 def requete_sans_dates(requete: str) -> str:
     """
     Supprime d'une requête toutes les informations de date.
     :param requete: La requête à nettoyer.
     :return: LA requête nettoyée.
     """
-    mois_pattern = "|".join(
-        [
-            "janvier",
-            "février",
-            "fevrier",
-            "mars",
-            "avril",
-            "mai",
-            "juin",
-            "juillet",
-            "août",
-            "aout",
-            "septembre",
-            "octobre",
-            "novembre",
-            "décembre",
-            "decembre",
-        ]
-    )
-    requete = re.sub(r"\b\d{1,2}\s+(" + mois_pattern + r")\s+\d{4}\b", "", requete)
-    requete = re.sub(r"\b(" + mois_pattern + r")\s+\d{4}\b", "", requete)
-    requete = re.sub(
-        r"\b(au mois de|au mois|en|de|du|dans)\s+(" + mois_pattern + r")\b",
-        "",
-        requete,
-    )
-    requete = re.sub(r"\b(19|20)\d{2}\b", "", requete)
-    requete = re.sub(r"\b\d{8}\b", "", requete)  # important pour enlever 14062013 etc.
-    requete = re.sub(
-        r"\b(entre|et|avant|après|apres|d’après|d\'apres|année|depuis|pas au mois de|au mois|mois|à partir)\b",
-        "",
-        requete,
-    )
-    requete = re.sub(r"\s+", " ", requete)
+    for motif in MOTIFS_SANS_DATES:
+        requete = motif.sub("", requete)
+    requete = MOTIF_ESPACES.sub(" ", requete)
     return requete.strip()
 
 
+# Exclusion d'un mois avec "pas"
+MOTIF_PAS_MOIS = re.compile(
+    r"pas\s+(au mois de|au mois|en|de|du)?\s*([a-zéèêç]+)(?:[\s,\.]|$)"
+)
+
+# Dates introduites par un préfixe temporel, et leur interprétation
+MOTIFS_DATES = [
+    (
+        re.compile(r"entre\s+(.*?)\s+et\s+(.*)"),
+        lambda m: {
+            "min": parse_date_str(m.group(1)),
+            "max": parse_date_str(m.group(2)),
+        },
+    ),
+    (
+        re.compile(
+            r"(à partir de|à partir|après|apres|d’après|d\'apres|depuis)\s+([^\.,;]*)"
+        ),
+        lambda m: {"min": parse_date_str(m.group(2))},
+    ),
+    (
+        re.compile(r"avant\s+(.+?)(?:[\s,\.]|$)"),
+        lambda m: {"max": parse_date_str(m.group(1))},
+    ),
+    (
+        re.compile(r"(en|de|du|dans|au mois de|au mois)\s+(.+?)(?:[\s,\.]|$)"),
+        lambda m: {"exact": parse_date_str(m.group(2))},
+    ),
+]
+
+
 def extract_date_info(requete: str) -> Tuple[Dict[str, str] | None, str]:
     """
     Extrait toutes les informations de dates dans une requête pour les convertir
@@ -323,36 +445,15 @@ def extract_date_info(requete: str) -> Tuple[Dict[str, str] | None, str]:
     resultat = {}
 
     # Cas 0 : exclusion avec "pas"
-    m = re.search(
-        r"pas\s+(au mois de|au mois|en|de|du)?\s*([a-zéèêç]+)(?:[\s,\.]|$)", requete
-    )
+    m = MOTIF_PAS_MOIS.search(requete)
     if m:
         mot = m.group(2)
         if mot in MOIS_FR:
             resultat["pas"] = f"****-{MOIS_FR[mot]}-**"
 
     # Cas avec des préfixes temporels
-    patterns = [
-        (
-            r"entre\s+(.*?)\s+et\s+(.*)",
-            lambda m: {
-                "min": parse_date_str(m.group(1)),
-                "max": parse_date_str(m.group(2)),
-            },
-        ),
-        (
-            r"(à partir de|à partir|après|apres|d’après|d\'apres|depuis)\s+([^\.,;]*)",
-            lambda m: {"min": parse_date_str(m.group(2))},
-        ),
-        (r"avant\s+(.+?)(?:[\s,\.]|$)", lambda m: {"max": parse_date_str(m.group(1))}),
-        (
-            r"(en|de|du|dans|au mois de|au mois)\s+(.+?)(?:[\s,\.]|$)",
-            lambda m: {"exact": parse_date_str(m.group(2))},
-        ),
-    ]
-
-    for pattern, fonction in patterns:
-        m = re.search(pattern, requete)
+    for motif, fonction in MOTIFS_DATES:
+        m = motif.search(requete)
         if m:
             result = fonction(m)
             if any(result.values()):
@@ -482,3 +583,99 @@ def traitement_requete(requete_langage_naturel):
     }
 
     return requete_structure
+
+
+class AnalyseurRequetes:
+    """
+    Chaîne d'analyse des requêtes : replace_soit, nettoyage_requete et
+    traitement_requete, puis correction des mots de la requête structurée.
+    Les mots ignorés sont chargés une seule fois, et les requêtes structurées
+    comme les corrections déjà calculées sont gardées en cache.
+    """
+
+    def __init__(
+        self,
+        correction: Optional[Callable[[str], str]] = None,
+        fichier_stop_words: str = FICHIER_STOP_WORDS,
+        taille_cache: int = TAILLE_CACHE,
+        duree_cache: Optional[float] = DUREE_VIE_CACHE,
+    ):
+        """
+        Charge les ressources de l'analyseur.
+        :param correction: La fonction qui corrige un mot-clé, un titre ou un contenu
+        (aucune correction si None).
+        :param fichier_stop_words: Le fichier des mots ignorés dans les requêtes.
+        :param taille_cache: Le nombre de requêtes (et de corrections) gardées en cache.
+        :param duree_cache: La durée de vie d'une entrée des caches, en secondes.
+        """
+        self.correction = correction
+        self.stop_words = charger_stop_words(fichier_stop_words)
+        self.cache_structures = CacheLRU(taille_cache, duree_cache)
+        self.cache_corrections = CacheLRU(taille_cache, duree_cache)
+
+    def structure(self, requete: str) -> dict:
+        """
+        Transforme une requête en requête structurée, sans correction.
+        :param requete: La requête en langage naturel.
+        :return: Les composants de la requête structurée (voir traitement_requete).
+        """
+        composants = self.cache_structures.obtenir(
+            requete,
+            lambda: traitement_requete(
+                nettoyage_requete(replace_soit(requete), self.stop_words)
+            ),
+        )
+        # Les composants sont modifiés par la correction : chacun a sa copie
+        return copy.deepcopy(composants)
+
+    def corriger(self, texte: str, version: Hashable = None) -> str:
+        """
+        Corrige un mot-clé, un titre ou un contenu.
+        :param texte: Le texte à corriger.
+        :param version: La version des données de la correction (par exemple l'état
+        de l'index) : les corrections gardées en cache sont oubliées si elle change.
+        :return: Le texte corrigé.
+        """
+        if self.correction is None:
+            return texte
+        return self.cache_corrections.obtenir(
+            texte, lambda: self.correction(texte), version
+        )
+
+    def analyse(self, requete: str, version: Hashable = None) -> dict:
+        """
+        Transforme une requête en requête structurée et corrige ses mots.
+        :param requete: La requête en langage naturel.
+        :param version: La version des données de la correction (voir corriger).
+        :return: Les composants de la requête structurée.
+        """
+        composants = self.structure(requete)
+        if composants["titre"] is not None:
+            composants["titre"] = self.corriger(composants["titre"], version)
+        if composants["contenu"] is not None:
+            composants["contenu"] = self.corriger(composants["contenu"], version)
+        if composants["keywords"] is not None:
+            for mot in composants["keywords"]:
+                if mot == "ou":
+                    continue
+                if not mot.startswith("pas "):
+                    composants["keywords"][composants["keywords"].index(mot)] = (
+                        self.corriger(mot, version)
+                    )
+                else:
+                    composants["keywords"][composants["keywords"].index(mot)] = (
+                        "pas " + self.corriger(mot[4:], version)
+                    )
+        return composants
+
+    def analyse_plusieurs(
+        self, requetes: List[str], version: Hashable = None
+    ) -> List[dict]:
+        """
+        Analyse un lot de requêtes (par exemple un journal de requêtes) : les requêtes
+        et les mots répétés ne sont analysés et corrigés qu'une fois.
+        :param requetes: Les requêtes en langage naturel.
+        :param version: La version des données de la correction (voir corriger).
+        :return: Les composants de chaque requête structurée, dans l'ordre.
+        """
+        return [self.analyse(requete, version) for requete in requetes]
@@ -0,0 +1,621 @@
+"""
+Index segmenté : l'index de base et les segments ajoutés depuis sa construction.
+
+Un segment est un petit index (inversé et direct) construit uniquement sur un lot
+de nouveaux bulletins (voir ingestion.py), dans le même format binaire que l'index
+de base. Les documents d'un segment ont leurs propres identifiants denses
+(0, 1, 2...) : dans l'index segmenté, ils sont décalés du nombre de documents
+des segments qui le précèdent, de sorte que le moteur voit un seul espace
+d'identifiants.
+
+Les segments sont régulièrement fusionnés dans l'index de base, dans un thread
+en arrière-plan. Le nouvel index de base remplace l'ancien (os.replace) avant que
+les segments fusionnés ne soient supprimés : un segment dont les documents sont
+déjà dans la base est donc ignoré. Dans un processus, ce remplacement et l'ouverture
+d'un index segmenté ne se chevauchent pas (_VERROU_REMPLACEMENT) ; une ouverture
+pendant laquelle l'état de l'index a changé (fusion d'un autre processus) est
+recommencée.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import List, Optional, Tuple
+import numpy as np
+from index_binaire import (
+    B,
+    CHAMPS_INDEXES,
+    K1,
+    IndexBinaire,
+    composante_bm25,
+    construction_sections,
+    ecriture_sections,
+)
+from index_direct import IndexDirect, ecriture_index_direct
+
+# Nombre de segments à partir duquel l'ingestion déclenche une fusion
+SEUIL_FUSION = 4
+
+PREFIXE_SEGMENT = "segment_"
+SUFFIXE_DIRECT = "_direct.bin"
+
+# Une seule fusion à la fois dans un processus
+_VERROU_FUSION = threading.Lock()
+
+# Les fichiers d'une fusion ne sont pas remplacés pendant l'ouverture d'un index segmenté
+_VERROU_REMPLACEMENT = threading.Lock()
+
+
+def liste_segments(dossier_segments: str) -> List[str]:
+    """
+    Renvoie les noms des segments d'un dossier, dans l'ordre de leur création.
+    :param dossier_segments: Le dossier des segments.
+    :return: La liste des noms (sans extension) des segments.
+    """
+    if not os.path.isdir(dossier_segments):
+        return []
+    return sorted(
+        nom[: -len(".bin")]
+        for nom in os.listdir(dossier_segments)
+        if nom.startswith(PREFIXE_SEGMENT)
+        and nom.endswith(".bin")
+        and not nom.endswith(SUFFIXE_DIRECT)
+    )
+
+
+def etat_index(index: str, dossier_segments: str) -> Tuple:
+    """
+    Renvoie un état de l'index segmenté qui change à chaque ajout de segment
+    ou remplacement de l'index de base.
+    :param index: Le chemin de l'index de base.
+    :param dossier_segments: Le dossier des segments.
+    :return: Un tuple comparable.
+    """
+    stat = os.stat(index)
+    return stat.st_ino, stat.st_mtime_ns, tuple(liste_segments(dossier_segments))
+
+
+def ecriture_segment(
+    lignes: List[Tuple[str, List[Tuple[int, str, Tuple[int, ...]]]]],
+    fiches: List[dict[str, str]],
+    dossier_segments: str,
+) -> str:
+    """
+    Écrit un nouveau segment (index inversé et index direct) après les segments existants.
+
+    :param lignes: Les lignes de l'index inversé du segment
+    (couples (terme, liste des (numéro de fichier, champ, positions))).
+    :param fiches: Les fiches des articles du segment (voir index_direct.fiche_article).
+    :param dossier_segments: Le dossier des segments.
+    :return: Le chemin de l'index inversé du segment.
+    """
+    os.makedirs(dossier_segments, exist_ok=True)
+    existants = liste_segments(dossier_segments)
+    numero = int(existants[-1][len(PREFIXE_SEGMENT) :]) + 1 if existants else 1
+    base = os.path.join(dossier_segments, f"{PREFIXE_SEGMENT}{numero:05d}")
+
+    # L'index direct est écrit en premier : un segment visible est toujours complet
+    ecriture_index_direct(fiches, base + SUFFIXE_DIRECT + ".tmp")
+    os.replace(base + SUFFIXE_DIRECT + ".tmp", base + SUFFIXE_DIRECT)
+    ecriture_sections(
+        base + ".bin.tmp", construction_sections(lignes), {"champs": CHAMPS_INDEXES}
+    )
+    os.replace(base + ".bin.tmp", base + ".bin")
+    return base + ".bin"
+
+
+def ouverture_segments(
+    index: str, documents: str, dossier_segments: str, noms: Tuple[str, ...]
+) -> Tuple[List[IndexBinaire], List[IndexDirect]]:
+    """
+    Ouvre l'index de base et des segments.
+    :param index: Le chemin de l'index inversé de base.
+    :param documents: Le chemin de l'index direct de base.
+    :param dossier_segments: Le dossier des segments.
+    :param noms: Les noms des segments (voir liste_segments).
+    :return: Un tuple (index inversés, index directs), celui de la base en premier.
+    """
+    base = IndexBinaire(index)
+    segments = [base]
+    directs = [IndexDirect(documents)]
+    for nom in noms:
+        chemin = os.path.join(dossier_segments, nom)
+        segment = IndexBinaire(chemin + ".bin")
+        # Segment déjà fusionné dans la base (fusion en cours de finalisation)
+        if np.isin(segment.documents, base.documents).any():
+            continue
+        segments.append(segment)
+        directs.append(IndexDirect(chemin + SUFFIXE_DIRECT))
+    return segments, directs
+
+
+class IndexSegmente:
+    """
+    Vue unique sur l'index de base et ses segments, avec des identifiants
+    de documents globaux.
+    """
+
+    def __init__(
+        self,
+        index: str = "data/index_inverse.bin",
+        documents: str = "data/index_direct.bin",
+        dossier_segments: str = "data/segments",
+    ):
+        """
+        Ouvre l'index de base et les segments.
+        :param index: Le chemin de l'index inversé de base.
+        :param documents: Le chemin de l'index direct de base.
+        :param dossier_segments: Le dossier des segments.
+        """
+        self.chemins = (index, documents, dossier_segments)
+        while True:
+            with _VERROU_REMPLACEMENT:
+                self.etat = etat_index(index, dossier_segments)
+                try:
+                    # Le premier segment est l'index de base
+                    self.segments, self.directs = ouverture_segments(
+                        index, documents, dossier_segments, self.etat[2]
+                    )
+                except FileNotFoundError:
+                    # Segment supprimé par la fusion d'un autre processus
+                    if self.est_a_jour():
+                        raise
+                    continue
+            # Si l'état a changé pendant l'ouverture, les fichiers ouverts
+            # peuvent être de deux états différents
+            if self.est_a_jour():
+                break
+        self.base = self.segments[0]
+
+        self.decalages = np.cumsum(
+            [0] + [segment.nb_documents for segment in self.segments]
+        )
+        self.documents = np.concatenate(
+            [segment.documents for segment in self.segments]
+        )
+
+    @property
+    def nb_documents(self) -> int:
+        """
+        Le nombre total de documents (base et segments).
+        """
+        return int(self.decalages[-1])
+
+    def est_a_jour(self) -> bool:
+        """
+        Indique si l'index ouvert correspond toujours aux fichiers sur le disque.
+        :return: False si un segment a été ajouté ou si la base a été remplacée.
+        """
+        return etat_index(self.chemins[0], self.chemins[2]) == self.etat
+
+    def _globaux(self, docs_par_segment: List[np.ndarray]) -> np.ndarray:
+        """
+        Convertit des identifiants locaux à chaque segment en identifiants globaux.
+        :param docs_par_segment: Les identifiants locaux, pour chaque segment.
+        :return: Les identifiants globaux.
+        """
+        if len(docs_par_segment) == 1:
+            return docs_par_segment[0]
+        return np.concatenate(
+            [
+                docs.astype(np.int64) + decalage
+                for docs, decalage in zip(docs_par_segment, self.decalages.tolist())
+            ]
+        )
+
+    def postings(self, terme: str, champ: str) -> np.ndarray:
+        """
+        Renvoie les documents dans lesquels un terme apparaît dans un champ.
+        :param terme: Le terme recherché.
+        :param champ: Le champ.
+        :return: Les identifiants globaux des documents.
+        """
+        return self._globaux(
+            [segment.postings(terme, [champ]) for segment in self.segments]
+        )
+
+    def intersection(self, termes: List[str], champ: str) -> np.ndarray:
+        """
+        Renvoie les documents dans lesquels tous les termes apparaissent dans
+        un champ (voir IndexBinaire.intersection).
+        :param termes: Les termes recherchés.
+        :param champ: Le champ.
+        :return: Les identifiants globaux des documents.
+        """
+        return self._globaux(
+            [segment.intersection(termes, champ) for segment in self.segments]
+        )
+
+    def phrase(self, termes: List[str], champ: str, ecart: int = 0) -> np.ndarray:
+        """
+        Renvoie les documents dans lesquels des termes apparaissent dans l'ordre,
+        dans un même champ (voir IndexBinaire.phrase).
+        :param termes: Les termes de l'expression, dans l'ordre.
+        :param champ: Le champ.
+        :param ecart: Le nombre maximal de mots intercalés.
+        :return: Les identifiants globaux des documents.
+        """
+        return self._globaux(
+            [segment.phrase(termes, champ, ecart) for segment in self.segments]
+        )
+
+    def longueur_moyenne(self, champ: str) -> float:
+        """
+        Renvoie la longueur moyenne (en termes) d'un champ sur toute la collection.
+        :param champ: Le champ.
+        :return: La longueur moyenne.
+        """
+        code = self.base.codes[champ]
+        total = sum(int(segment.longueurs[:, code].sum()) for segment in self.segments)
+        return total / max(self.nb_documents, 1)
+
+    def frequences_postings(
+        self, terme: str, champ: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Renvoie les postings d'un terme dans un champ avec leurs fréquences.
+        :param terme: Le terme recherché.
+        :param champ: Le champ.
+        :return: Un tuple (identifiants globaux des documents, fréquences du terme,
+        longueurs du champ dans ces documents).
+        """
+        code = self.base.codes[champ]
+        docs, frequences, longueurs = [], [], []
+        for segment in self.segments:
+            docs_segment, frequences_segment = segment.frequences_postings(terme, champ)
+            docs.append(docs_segment)
+            frequences.append(frequences_segment)
+            longueurs.append(segment.longueurs[docs_segment, code])
+        return (
+            self._globaux(docs),
+            np.concatenate(frequences),
+            np.concatenate(longueurs),
+        )
+
+    def bm25(
+        self,
+        termes: List[str],
+        poids_champs: dict[str, float],
+        k1: float = K1,
+        b: float = B,
+    ) -> np.ndarray:
+        """
+        Calcule le score BM25 de tous les documents pour une liste de termes.
+        Le score d'un document est la somme, sur les champs, des scores BM25
+        du champ pondérés par poids_champs.
+
+        :param termes: Les termes de la requête.
+        :param poids_champs: Les champs pris en compte et leur poids.
+        :param k1: Le paramètre de saturation de la fréquence des termes.
+        :param b: Le paramètre de normalisation par la longueur du champ.
+        :return: Le tableau des scores, indexé par identifiant global de document.
+        """
+        scores = np.zeros(self.nb_documents, dtype=np.float64)
+        for champ, poids in poids_champs.items():
+            longueur_moyenne = self.longueur_moyenne(champ) or 1.0
+            for terme in termes:
+                docs, frequences, longueurs = self.frequences_postings(terme, champ)
+                if len(docs) == 0:
+                    continue
+                idf = np.log(
+                    1 + (self.nb_documents - len(docs) + 0.5) / (len(docs) + 0.5)
+                )
+                # Un document apparaît une seule fois dans les postings d'un champ
+                scores[docs] += (
+                    poids
+                    * idf
+                    * composante_bm25(frequences, longueurs, longueur_moyenne, k1, b)
+                )
+        return scores
+
+    def borne_bm25(self, terme: str, champ: str, k1: float = K1, b: float = B) -> float:
+        """
+        Renvoie un majorant du facteur BM25 d'un terme dans un champ, pour
+        tous les documents, à partir des bornes enregistrées dans chaque segment.
+        Une borne est calculée avec la longueur moyenne de son segment : si celle de
+        la collection est r fois plus grande, le facteur est au plus r fois plus grand.
+
+        :param terme: Le terme.
+        :param champ: Le champ.
+        :param k1: Le paramètre de saturation de la fréquence des termes.
+        :param b: Le paramètre de normalisation par la longueur du champ.
+        :return: Le majorant, 0 si le terme n'a pas de postings dans le champ.
+        """
+        longueur_moyenne = self.longueur_moyenne(champ) or 1.0
+        borne = 0.0
+        for segment in self.segments:
+            borne_segment = segment.borne_bm25(terme, champ)
+            if borne_segment == 0.0:
+                continue
+            if (k1, b) != (K1, B):
+                # Bornes calculées avec d'autres paramètres : borne absolue du facteur
+                return k1 + 1
+            rapport = longueur_moyenne / segment.longueur_moyenne(champ)
+            borne = max(borne, borne_segment * max(1.0, rapport))
+        return borne
+
+    def _listes_bm25(
+        self, termes: List[str], poids_champs: dict[str, float], k1: float, b: float
+    ) -> list[tuple]:
+        """
+        Renvoie les listes de postings (terme, champ) d'une requête, pour meilleurs_bm25.
+        :param termes: Les termes de la requête.
+        :param poids_champs: Les champs pris en compte et leur poids.
+        :param k1: Le paramètre de saturation de la fréquence des termes.
+        :param b: Le paramètre de normalisation par la longueur du champ.
+        :return: Les tuples (majorant de la contribution au score, poids du champ
+        multiplié par l'idf, longueur moyenne du champ, documents, fréquences, longueurs)
+        des listes non vides.
+        """
+        listes = []
+        for champ, poids in poids_champs.items():
+            longueur_moyenne = self.longueur_moyenne(champ) or 1.0
+            for terme in termes:
+                docs, frequences, longueurs = self.frequences_postings(terme, champ)
+                if len(docs) == 0:
+                    continue
+                facteur = poids * np.log(
+                    1 + (self.nb_documents - len(docs) + 0.5) / (len(docs) + 0.5)
+                )
+                listes.append(
+                    (
+                        facteur * self.borne_bm25(terme, champ, k1, b),
+                        facteur,
+                        longueur_moyenne,
+                        docs,
+                        frequences,
+                        longueurs,
+                    )
+                )
+        return listes
+
+    def meilleurs_bm25(
+        self,
+        termes: List[str],
+        poids_champs: dict[str, float],
+        k: int,
+        masque: Optional[np.ndarray] = None,
+        k1: float = K1,
+        b: float = B,
+    ) -> Tuple[np.ndarray, np.ndarray, dict[str, int]]:
+        """
+        Calcule les scores BM25 (voir bm25) des documents qui peuvent faire partie
+        des k meilleurs, en ignorant les postings qui ne peuvent pas y mener (MaxScore).
+
+        Les listes (terme, champ) sont parcourues par majorant décroissant. Le seuil
+        est le k-ième meilleur score partiel, qui minore le k-ième meilleur score.
+        Quand la somme des majorants des listes restantes est sous le seuil, un
+        document absent des listes déjà parcourues ne peut plus entrer dans les k
+        meilleurs : seuls les candidats déjà trouvés sont cherchés dans les listes
+        restantes, et un candidat est abandonné dès que son score partiel plus
+        les majorants restants est sous le seuil.
+
+        :param termes: Les termes de la requête.
+        :param poids_champs: Les champs pris en compte et leur poids.
+        :param k: Le nombre de documents recherchés.
+        :param masque: Les documents autorisés (masque booléen indexé par identifiant
+        global), tous si None.
+        :param k1: Le paramètre de saturation de la fréquence des termes.
+        :param b: Le paramètre de normalisation par la longueur du champ.
+        :return: Un tuple (identifiants globaux des candidats restants, triés ; leur score
+        BM25 ; compteurs des postings "evalues" et "ignores"). Les k meilleurs documents
+        de score non nul sont parmi les candidats, avec leur score exact.
+        """
+        listes = self._listes_bm25(termes, poids_champs, k1, b)
+        listes.sort(key=lambda liste: liste[0], reverse=True)
+        # restes[i] : score maximal d'un document dans les listes i et suivantes
+        restes = np.cumsum([liste[0] for liste in listes][::-1])[::-1].tolist() + [0.0]
+
+        candidats = np.zeros(0, dtype=np.int64)
+        scores = np.zeros(0, dtype=np.float64)
+        seuil = 0.0
+        evalues = 0
+        for i, (_, facteur, longueur_moyenne, docs, frequences, longueurs) in enumerate(
+            listes
+        ):
+            if restes[i] >= seuil:
+                # Liste essentielle : tous ses postings (autorisés) sont évalués
+                if masque is not None:
+                    autorises = masque[docs]
+                    docs = docs[autorises]
+                    frequences, longueurs = frequences[autorises], longueurs[autorises]
+                candidats, inverse = np.unique(
+                    np.concatenate([candidats, docs]), return_inverse=True
+                )
+                scores = np.bincount(
+                    inverse,
+                    weights=np.concatenate(
+                        [
+                            scores,
+                            facteur
+                            * composante_bm25(
+                                frequences, longueurs, longueur_moyenne, k1, b
+                            ),
+                        ]
+                    ),
+                    minlength=len(candidats),
+                )
+                evalues += len(docs)
+            else:
+                # Liste non essentielle : seuls les candidats qui peuvent encore
+                # entrer dans les k meilleurs y sont cherchés
+                vivants = scores + restes[i] >= seuil
+                candidats, scores = candidats[vivants], scores[vivants]
+                positions = np.minimum(np.searchsorted(docs, candidats), len(docs) - 1)
+                trouves = docs[positions] == candidats
+                positions = positions[trouves]
+                scores[trouves] += facteur * composante_bm25(
+                    frequences[positions],
+                    longueurs[positions],
+                    longueur_moyenne,
+                    k1,
+                    b,
+                )
+                evalues += len(positions)
+            if len(scores) >= k > 0:
+                seuil = float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+        gardes = scores >= seuil
+        nb_postings = sum(len(liste[3]) for liste in listes)
+        return (
+            candidats[gardes],
+            scores[gardes],
+            {"evalues": evalues, "ignores": nb_postings - evalues},
+        )
+
+    def termes_champ(self, champ: str) -> List[str]:
+        """
+        Renvoie les termes ayant au moins un posting dans un champ.
+        :param champ: Le champ.
+        :return: La liste des termes (sans doublons).
+        """
+        if len(self.segments) == 1:
+            return self.base.termes_champ(champ)
+        return sorted(
+            {
+                terme
+                for segment in self.segments
+                for terme in segment.termes_champ(champ)
+            }
+        )
+
+    def vocabulaire(self) -> List[str]:
+        """
+        Renvoie les termes de l'index (base et segments), tous champs confondus.
+        :return: La liste des termes (sans doublons).
+        """
+        if len(self.segments) == 1:
+            return self.base.termes
+        return sorted({terme for segment in self.segments for terme in segment.termes})
+
+    def docs_champ(self, champ: str) -> np.ndarray:
+        """
+        Renvoie les documents ayant au moins un posting dans un champ.
+        :param champ: Le champ.
+        :return: Les identifiants globaux des documents.
+        """
+        return self._globaux([segment.docs_champ(champ) for segment in self.segments])
+
+    def dates_entre(
+        self, date_min: Optional[date] = None, date_max: Optional[date] = None
+    ) -> np.ndarray:
+        """
+        Renvoie les documents publiés entre deux dates (bornes incluses).
+        :param date_min: La date minimale (aucune borne si None).
+        :param date_max: La date maximale (aucune borne si None).
+        :return: Les identifiants globaux des documents.
+        """
+        return self._globaux(
+            [segment.dates.entre(date_min, date_max) for segment in self.segments]
+        )
+
+    def dates_du_mois(self, mois: int) -> np.ndarray:
+        """
+        Renvoie les documents publiés un mois donné, quelle que soit l'année.
+        :param mois: Le mois (1 à 12).
+        :return: Les identifiants globaux des documents.
+        """
+        return self._globaux([segment.dates.du_mois(mois) for segment in self.segments])
+
+    def termes_documents(self, docs: np.ndarray, champ: str) -> List[str]:
+        """
+        Renvoie les termes distincts d'un champ ("numero" ou "rubrique")
+        pour un ensemble de documents.
+        :param docs: Les identifiants globaux des documents, triés.
+        :param champ: Le champ.
+        :return: La liste des termes.
+        """
+        bornes = np.searchsorted(docs, self.decalages).tolist()
+        termes = set()
+        for i, segment in enumerate(self.segments):
+            locaux = docs[bornes[i] : bornes[i + 1]] - self.decalages[i]
+            termes.update(segment.termes_documents(locaux, champ))
+        return sorted(termes)
+
+    def article(self, fichier: str) -> Optional[dict[str, str]]:
+        """
+        Renvoie les informations affichées d'un article.
+        :param fichier: Le numéro de fichier de l'article.
+        :return: Un dictionnaire (id, titre, date, numero, rubrique, extrait),
+        ou None si l'article n'est pas indexé.
+        """
+        for direct in self.directs:
+            fiche = direct.article(fichier)
+            if fiche is not None:
+                return fiche
+        return None
+
+
+def fusion_segments(
+    index: str = "data/index_inverse.bin",
+    documents: str = "data/index_direct.bin",
+    dossier_segments: str = "data/segments",
+) -> int:
+    """
+    Fusionne les segments dans l'index de base, puis les supprime.
+
+    :param index: Le chemin de l'index inversé de base.
+    :param documents: Le chemin de l'index direct de base.
+    :param dossier_segments: Le dossier des segments.
+    :return: Le nombre de segments fusionnés.
+    """
+    with _VERROU_FUSION:
+        index_segmente = IndexSegmente(index, documents, dossier_segments)
+        noms = index_segmente.etat[2]
+        if not noms:
+            return 0
+
+        postings_par_terme = defaultdict(list)
+        for segment in index_segmente.segments:
+            for terme, postings in segment.lignes():
+                postings_par_terme[terme].extend(postings)
+        fiches = [
+            direct.article(str(fichier))
+            for direct in index_segmente.directs
+            for fichier in direct.documents.tolist()
+        ]
+
+        # Les nouveaux fichiers remplacent les anciens d'un coup : un moteur ouvert
+        # garde sa projection de l'ancien index jusqu'à son rechargement
+        ecriture_index_direct(fiches, documents + ".tmp")
+        ecriture_sections(
+            index + ".tmp",
+            construction_sections(list(postings_par_terme.items())),
+            {"champs": CHAMPS_INDEXES},
+        )
+        with _VERROU_REMPLACEMENT:
+            os.replace(documents + ".tmp", documents)
+            os.replace(index + ".tmp", index)
+            for nom in noms:
+                chemin = os.path.join(dossier_segments, nom)
+                os.remove(chemin + ".bin")
+                os.remove(chemin + SUFFIXE_DIRECT)
+        return len(noms)
+
+
+def fusion_en_arriere_plan(
+    index: str = "data/index_inverse.bin",
+    documents: str = "data/index_direct.bin",
+    dossier_segments: str = "data/segments",
+) -> threading.Thread:
+    """
+    Lance la fusion des segments dans un thread.
+
+    :param index: Le chemin de l'index inversé de base.
+    :param documents: Le chemin de l'index direct de base.
+    :param dossier_segments: Le dossier des segments.
+    :return: Le thread de fusion (déjà démarré).
+    """
+    thread = threading.Thread(
+        target=fusion_segments,
+        args=(index, documents, dossier_segments),
+        name="fusion-segments",
+    )
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    print("Fusion des segments dans l'index de base...")
+    print(f"{fusion_segments()} segment(s) fusionné(s)")
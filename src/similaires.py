@@ -0,0 +1,304 @@
+"""
+Articles similaires (« plus comme celui-ci ») par MinHash et LSH.
+
+Chaque article du corpus nettoyé est représenté par l'ensemble de ses shingles
+(suites de TAILLE_SHINGLES mots de son titre et de son texte) : deux articles sont
+d'autant plus proches que l'indice de Jaccard de leurs ensembles est grand.
+
+La signature MinHash d'un article garde, pour chacune des NB_PERMUTATIONS fonctions
+de hachage, la plus petite valeur prise sur ses shingles : la proportion de valeurs
+communes à deux signatures estime leur indice de Jaccard. Les signatures sont
+découpées en NB_BANDES bandes, et les articles dont une bande est identique tombent
+dans le même seau (LSH) : les articles similaires à un article sont cherchés parmi
+ceux qui partagent un de ses seaux, sans le comparer à tout le corpus.
+"""
+
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
+from index_binaire import FichierSections, ecriture_sections
+from utils import parse_xml
+
+# Version du format de l'index des articles similaires
+VERSION_SIMILARITE = 1
+
+# Nombre de mots d'un shingle (1 : les articles sont comparés par leur vocabulaire)
+TAILLE_SHINGLES = 1
+
+# Nombre de fonctions de hachage, et nombre de bandes de la signature
+# (64 bandes de 2 lignes : seuil de similarité du LSH vers (1 / 64) ** (1 / 2) = 0.125)
+NB_PERMUTATIONS = 128
+NB_BANDES = 64
+
+# Les fonctions de hachage sont x → (a * x + b) mod PREMIER : avec a, b, x < 2^31,
+# le calcul tient dans des entiers 64 bits
+PREMIER = (1 << 31) - 1
+
+# Nombre d'articles par bloc de calcul des signatures
+TAILLE_BLOC = 64
+
+# Nombre d'articles similaires renvoyés par défaut
+NB_SIMILAIRES = 10
+
+
+def shingles_article(mots: List[str], taille: int = TAILLE_SHINGLES) -> np.ndarray:
+    """
+    Renvoie les hachages des shingles d'un texte.
+    :param mots: Les mots du texte.
+    :param taille: Le nombre de mots d'un shingle.
+    :return: Les hachages distincts (inférieurs à PREMIER), triés.
+    """
+    hachages = np.fromiter(
+        (
+            zlib.crc32(" ".join(mots[i : i + taille]).encode("utf-8"))
+            for i in range(len(mots) - taille + 1)
+        ),
+        dtype=np.uint64,
+    )
+    return np.unique(hachages % PREMIER)
+
+
+def shingles_corpus(
+    fichier_corpus: str, taille: int = TAILLE_SHINGLES
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcule les shingles des articles d'un corpus.
+    :param fichier_corpus: Le corpus XML (nettoyé).
+    :param taille: Le nombre de mots d'un shingle.
+    :return: Un tuple (numéros de fichier triés, offsets, hachages) : les hachages
+    de l'article i sont hachages[offsets[i]:offsets[i + 1]].
+    """
+    articles = sorted(
+        parse_xml(fichier_corpus).findall(".//article"),
+        key=lambda article: int(article.findtext("fichier")),
+    )
+    shingles = [
+        shingles_article(
+            f"{article.findtext('titre') or ''} {article.findtext('texte') or ''}".split(),
+            taille,
+        )
+        for article in articles
+    ]
+    offsets = np.zeros(len(shingles) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(hachages) for hachages in shingles])
+    return (
+        np.array([int(article.findtext("fichier")) for article in articles], np.int32),
+        offsets,
+        np.concatenate(shingles) if shingles else np.zeros(0, dtype=np.uint64),
+    )
+
+
+def coefficients_minhash(
+    nb_permutations: int = NB_PERMUTATIONS, graine: int = 0
+) -> np.ndarray:
+    """
+    Tire les coefficients des fonctions de hachage de MinHash.
+    :param nb_permutations: Le nombre de fonctions.
+    :param graine: La graine du générateur aléatoire.
+    :return: Un tableau (2, nb_permutations) : les a (non nuls) puis les b.
+    """
+    generateur = np.random.default_rng(graine)
+    return np.stack(
+        [
+            generateur.integers(1, PREMIER, nb_permutations, dtype=np.uint64),
+            generateur.integers(0, PREMIER, nb_permutations, dtype=np.uint64),
+        ]
+    )
+
+
+def signatures_minhash(
+    offsets: np.ndarray,
+    hachages: np.ndarray,
+    coefficients: np.ndarray,
+    nb_threads: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Calcule les signatures MinHash des articles. Les articles sont traités par blocs,
+    chaque bloc en quelques opérations numpy (qui libèrent le GIL) : les blocs sont
+    répartis entre plusieurs threads.
+
+    :param offsets: Les offsets des shingles de chaque article (voir shingles_corpus).
+    :param hachages: Les hachages des shingles.
+    :param coefficients: Les coefficients des fonctions de hachage (voir coefficients_minhash).
+    :param nb_threads: Le nombre de threads (celui de ThreadPoolExecutor par défaut).
+    :return: Les signatures, un tableau (nombre d'articles, nombre de fonctions).
+    Un article sans shingle a la signature PREMIER partout.
+    """
+    nb_documents = len(offsets) - 1
+    a, b = coefficients[0][:, None], coefficients[1][:, None]
+    signatures = np.full((nb_documents, coefficients.shape[1]), PREMIER, np.uint32)
+
+    def signatures_bloc(debut: int) -> None:
+        fin = min(debut + TAILLE_BLOC, nb_documents)
+        debuts = offsets[debut:fin] - offsets[debut]
+        non_vides = np.flatnonzero(np.diff(offsets[debut : fin + 1]) > 0)
+        if len(non_vides) == 0:
+            return
+        # Valeurs de toutes les fonctions sur tous les shingles du bloc, puis minimum
+        # par article (les articles vides, de longueur nulle, sont sautés)
+        valeurs = (a * hachages[offsets[debut] : offsets[fin]] + b) % PREMIER
+        signatures[debut + non_vides] = np.minimum.reduceat(
+            valeurs, debuts[non_vides], axis=1
+        ).T
+
+    with ThreadPoolExecutor(max_workers=nb_threads) as executeur:
+        list(executeur.map(signatures_bloc, range(0, nb_documents, TAILLE_BLOC)))
+    return signatures
+
+
+def cles_lsh(signatures: np.ndarray, nb_bandes: int = NB_BANDES) -> np.ndarray:
+    """
+    Calcule les clés des seaux LSH : une clé par bande de chaque signature.
+    :param signatures: Les signatures, un tableau (nombre d'articles, nombre de fonctions).
+    :param nb_bandes: Le nombre de bandes.
+    :return: Les clés, un tableau (nombre de bandes, nombre d'articles).
+    """
+    nb_lignes = signatures.shape[1] // nb_bandes
+    bandes = (
+        signatures[:, : nb_bandes * nb_lignes]
+        .reshape(len(signatures), nb_bandes, nb_lignes)
+        .astype(np.uint64)
+    )
+    # Hachage polynomial des lignes d'une bande (modulo 2^64)
+    cles = np.zeros((len(signatures), nb_bandes), dtype=np.uint64)
+    for ligne in range(nb_lignes):
+        cles = cles * np.uint64(PREMIER) + bandes[:, :, ligne]
+    return cles.T
+
+
+def construction_sections_similarite(
+    fichier_corpus: str,
+    taille: int = TAILLE_SHINGLES,
+    nb_permutations: int = NB_PERMUTATIONS,
+    nb_bandes: int = NB_BANDES,
+    nb_threads: Optional[int] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Construit les sections de l'index des articles similaires : les signatures et,
+    pour chaque bande, les clés triées avec les articles correspondants.
+
+    :param fichier_corpus: Le corpus XML (nettoyé).
+    :param taille: Le nombre de mots d'un shingle.
+    :param nb_permutations: Le nombre de fonctions de hachage.
+    :param nb_bandes: Le nombre de bandes.
+    :param nb_threads: Le nombre de threads du calcul des signatures.
+    :return: Les sections de l'index.
+    """
+    documents, offsets, hachages = shingles_corpus(fichier_corpus, taille)
+    coefficients = coefficients_minhash(nb_permutations)
+    signatures = signatures_minhash(offsets, hachages, coefficients, nb_threads)
+    cles = cles_lsh(signatures, nb_bandes)
+    ordre = np.argsort(cles, axis=1, kind="stable")
+    return {
+        "documents": documents,
+        "coefficients": coefficients,
+        "signatures": signatures,
+        "cles": np.take_along_axis(cles, ordre, axis=1),
+        "ordre": ordre.astype(np.int32),
+    }
+
+
+def sauvegarde_index_similarite(
+    fichier_corpus: str,
+    fichier_sortie: str,
+    taille: int = TAILLE_SHINGLES,
+    nb_bandes: int = NB_BANDES,
+) -> None:
+    """
+    Construit l'index des articles similaires d'un corpus et l'écrit au format binaire.
+
+    :param fichier_corpus: Le corpus XML (nettoyé).
+    :param fichier_sortie: Le chemin du fichier binaire à écrire.
+    :param taille: Le nombre de mots d'un shingle.
+    :param nb_bandes: Le nombre de bandes.
+    :return: None
+    """
+    ecriture_sections(
+        fichier_sortie,
+        construction_sections_similarite(fichier_corpus, taille, nb_bandes=nb_bandes),
+        {"taille_shingles": taille, "nb_bandes": nb_bandes},
+        VERSION_SIMILARITE,
+    )
+
+
+class IndexSimilarite(FichierSections):
+    """
+    Index des articles similaires (signatures MinHash et seaux LSH), projeté en mémoire.
+    """
+
+    def __init__(self, chemin: str = "data/similarite.bin"):
+        """
+        Ouvre un index des articles similaires.
+        :param chemin: Le chemin de l'index.
+        """
+        super().__init__(chemin, VERSION_SIMILARITE)
+        self.nb_bandes = self.meta["nb_bandes"]
+        self.documents = self.section("documents")
+        self.signatures = self.section("signatures")
+        self.cles = self.section("cles")
+        self.ordre = self.section("ordre")
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def candidats(self, identifiant: int) -> np.ndarray:
+        """
+        Renvoie les articles qui partagent au moins un seau avec un article.
+        :param identifiant: L'identifiant dense de l'article.
+        :return: Les identifiants des candidats (dont l'article lui-même), triés.
+        """
+        cles = cles_lsh(self.signatures[identifiant : identifiant + 1], self.nb_bandes)
+        seaux = []
+        for bande, cle in enumerate(cles[:, 0]):
+            # Les clés de chaque bande sont triées : un seau est un intervalle
+            debut = np.searchsorted(self.cles[bande], cle, side="left")
+            fin = np.searchsorted(self.cles[bande], cle, side="right")
+            seaux.append(self.ordre[bande, debut:fin])
+        return np.unique(np.concatenate(seaux))
+
+    def similaires(
+        self, fichier: str, k: int = NB_SIMILAIRES, seuil: float = 0.0
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Renvoie les articles les plus similaires à un article, parmi ceux qui
+        partagent un de ses seaux.
+        :param fichier: Le numéro de fichier de l'article.
+        :param k: Le nombre maximal d'articles renvoyés.
+        :param seuil: La similarité estimée minimale des articles renvoyés.
+        :return: Les couples (numéro de fichier, indice de Jaccard estimé), du plus
+        similaire au moins similaire (à similarité égale, du plus récent au plus
+        ancien), ou None si l'article n'est pas dans l'index.
+        """
+        numero = int(fichier)
+        identifiant = int(np.searchsorted(self.documents, numero))
+        if identifiant == len(self.documents) or self.documents[identifiant] != numero:
+            return None
+
+        candidats = self.candidats(identifiant)
+        candidats = candidats[candidats != identifiant]
+        estimations = np.mean(
+            self.signatures[candidats] == self.signatures[identifiant], axis=1
+        )
+        gardes = estimations >= seuil
+        candidats, estimations = candidats[gardes], estimations[gardes]
+        fichiers = self.documents[candidats]
+        ordre = np.lexsort((-fichiers.astype(np.int64), -estimations))[:k]
+        return [
+            (str(fichier_similaire), float(estimation))
+            for fichier_similaire, estimation in zip(
+                fichiers[ordre].tolist(), estimations[ordre].tolist()
+            )
+        ]
+
+
+if __name__ == "__main__":
+    print("Création de l'index des articles similaires...")
+    sauvegarde_index_similarite("data/corpus_clean.xml", "data/similarite.bin")
+    index_similarite = IndexSimilarite("data/similarite.bin")
+    print(
+        f"{len(index_similarite)} articles, "
+        f"{os.path.getsize('data/similarite.bin') // 1024} Ko"
+    )
+    print(f"Articles similaires à 74752 : {index_similarite.similaires('74752')}")
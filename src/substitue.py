@@ -7,12 +7,35 @@ import pandas as pd
 import numpy as np
 
 
-def substitue_texte(input_texte: str | List[str], fichier_subs: str) -> str:
+def charger_substitutions(fichier_subs: str) -> dict[str, str]:
+    """
+    Charge un fichier de substitution sous forme de dictionnaire (mot → substitut).
+    Si un mot apparaît plusieurs fois, c'est sa première substitution qui est retenue.
+
+    :param fichier_subs: Le chemin du fichier qui contient les mots à remplacer et leurs substituts.
+    :return: Le dictionnaire des substitutions (un substitut vide élimine le mot).
+    """
+    # Lecture du fichier de substitution en format pandas (deux colonnes : token, substitute)
+    subs_df = pd.read_csv(
+        fichier_subs, sep="\t", header=None, names=["token", "substitute"]
+    )
+    # Remplacement des valeurs Nan par une chaine vide
+    subs_df = subs_df.replace(np.nan, "", regex=True)
+    substitutions = {}
+    for token, substitut in zip(subs_df["token"], subs_df["substitute"]):
+        substitutions.setdefault(token, substitut)
+    return substitutions
+
+
+def substitue_texte(
+    input_texte: str | List[str], fichier_subs: str | dict[str, str]
+) -> str:
     """
     Remplace ou élimine des mots dans un texte en fonction d'un fichier de substitution.
 
     :param input_texte: Le texte (chaîne de caractères) ou liste de tokens à traiter.
-    :param fichier_subs: Le chemin du fichier qui contient les mots à remplacer et leurs substituts.
+    :param fichier_subs: Le chemin du fichier qui contient les mots à remplacer et leurs substituts,
+    ou les substitutions déjà chargées (voir charger_substitutions).
     :return: Une chaîne de caractères où les mots ont été remplacés ou éliminés.
     """
     if isinstance(input_texte, str):
@@ -20,6 +43,10 @@ def substitue_texte(input_texte: str | List[str], fichier_subs: str) -> str:
             input_texte.split()
         )  # Découpe le texte en tokens (si c'est une str)
 
+    if isinstance(fichier_subs, dict):
+        # Substitutions déjà chargées : une recherche dans le dictionnaire par mot
+        return " ".join(fichier_subs.get(mot, mot) for mot in input_texte)
+
     # Lecture du fichier de substitution en format pandas (deux colonnes : token, substitute)
     subs_df = pd.read_csv(
         fichier_subs, sep="\t", header=None, names=["token", "substitute"]
@@ -0,0 +1,312 @@
+"""
+Index des trigrammes (suites de trois caractères) des termes de l'index inversé,
+pour retrouver rapidement les termes proches d'un mot mal orthographié, et les
+termes qui correspondent à un motif avec jokers ("nano*", "*techno*").
+
+Les termes sont encadrés par des caractères de bord (deux au début, un à la fin) :
+les trigrammes du début et de la fin d'un terme sont distincts de ceux du milieu.
+Chaque trigramme est codé par un entier (les trois points de code sur 21 bits).
+Les sections sont :
+- "termes" : les termes, encodés en utf-8 et séparés par des retours à la ligne ;
+- "trigrammes" : les codes des trigrammes, triés ;
+- "trigrammes_offsets" : les termes du trigramme i sont entre trigrammes_offsets[i]
+  et trigrammes_offsets[i + 1] dans "trigrammes_termes" ;
+- "trigrammes_termes" : les numéros des termes de chaque trigramme ;
+- "nb_trigrammes" : le nombre de trigrammes distincts de chaque terme.
+L'index est construit avec l'index inversé, sur les mêmes termes : un terme trouvé
+a toujours des postings.
+"""
+
+import hashlib
+import re
+import time
+from functools import reduce
+from typing import List, Tuple
+import numpy as np
+from index_binaire import FichierSections, IndexBinaire, ecriture_sections
+
+# Caractères ajoutés avant et après un terme (absents des textes)
+DEBUT = "\x02"
+FIN = "\x03"
+
+# Nombre de termes proches renvoyés, et coefficient de Dice minimal
+NB_CANDIDATS_TRIGRAMMES = 20
+SEUIL_DICE = 0.4
+
+VERSION_TRIGRAMMES = 1
+
+
+def codes_trigrammes(texte: str) -> np.ndarray:
+    """
+    Renvoie les codes des trigrammes distincts d'un texte (sans ajout de bords).
+
+    :param texte: Le texte.
+    :return: Les codes (int64), triés.
+    """
+    points = np.frombuffer(texte.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    if len(points) < 3:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique((points[:-2] << 42) | (points[1:-1] << 21) | points[2:])
+
+
+def trigrammes_terme(terme: str) -> np.ndarray:
+    """
+    Renvoie les codes des trigrammes distincts d'un terme encadré de ses bords.
+
+    :param terme: Le terme.
+    :return: Les codes, triés.
+    """
+    return codes_trigrammes(DEBUT + DEBUT + terme + FIN)
+
+
+def empreinte_termes(termes: List[str]) -> str:
+    """
+    Calcule l'empreinte d'une liste de termes, qui identifie les termes d'un index
+    des trigrammes.
+
+    :param termes: Les termes.
+    :return: L'empreinte (hexadécimale).
+    """
+    return hashlib.blake2b("\n".join(termes).encode("utf-8")).hexdigest()
+
+
+def construction_sections_trigrammes(termes: List[str]) -> dict[str, np.ndarray]:
+    """
+    Construit l'index des trigrammes d'une liste de termes.
+
+    :param termes: Les termes (triés).
+    :return: Les sections de l'index (voir l'en-tête du module).
+    """
+    trigrammes = [trigrammes_terme(terme) for terme in termes]
+    nb_trigrammes = np.array([len(codes) for codes in trigrammes], dtype=np.int32)
+    codes = np.concatenate(trigrammes) if trigrammes else np.zeros(0, dtype=np.int64)
+    numeros = np.repeat(np.arange(len(termes), dtype=np.int32), nb_trigrammes)
+    ordre = np.lexsort((numeros, codes))
+    cles, debuts = np.unique(codes[ordre], return_index=True)
+    offsets = np.append(debuts, len(codes)).astype(np.int64)
+    return {
+        "termes": np.frombuffer("\n".join(termes).encode("utf-8"), dtype=np.uint8),
+        "trigrammes": cles,
+        "trigrammes_offsets": offsets,
+        "trigrammes_termes": numeros[ordre],
+        "nb_trigrammes": nb_trigrammes,
+    }
+
+
+def sauvegarde_index_trigrammes(
+    termes: List[str], chemin: str = "data/trigrammes.bin"
+) -> None:
+    """
+    Construit l'index des trigrammes d'une liste de termes et l'enregistre.
+
+    :param termes: Les termes (par exemple ceux de l'index inversé ; les doublons
+    sont ignorés).
+    :param chemin: Le fichier de sortie.
+    :return: None
+    """
+    termes = sorted(set(termes))
+    ecriture_sections(
+        chemin,
+        construction_sections_trigrammes(termes),
+        {"empreinte": empreinte_termes(termes)},
+        VERSION_TRIGRAMMES,
+    )
+
+
+class IndexTrigrammes(FichierSections):
+    """
+    Index des trigrammes des termes (voir construction_sections_trigrammes),
+    projeté en mémoire.
+    """
+
+    def __init__(self, chemin: str = "data/trigrammes.bin"):
+        """
+        Ouvre un index des trigrammes.
+        :param chemin: Le chemin de l'index.
+        """
+        super().__init__(chemin, VERSION_TRIGRAMMES)
+        termes = self.section("termes").tobytes().decode("utf-8")
+        self.termes = termes.split("\n") if termes else []
+        self.trigrammes = self.section("trigrammes")
+        self.offsets = self.section("trigrammes_offsets")
+        self.trigrammes_termes = self.section("trigrammes_termes")
+        self.nb_trigrammes = self.section("nb_trigrammes")
+
+    def __len__(self) -> int:
+        return len(self.termes)
+
+    def termes_trigrammes(self, codes: np.ndarray) -> List[np.ndarray]:
+        """
+        Renvoie les numéros des termes qui contiennent chacun des trigrammes donnés.
+
+        :param codes: Les codes des trigrammes.
+        :return: Pour chaque trigramme, les numéros des termes (triés ; vide si le
+        trigramme n'est pas dans l'index).
+        """
+        rangs = np.searchsorted(self.trigrammes, codes)
+        presents = rangs < len(self.trigrammes)
+        presents[presents] = self.trigrammes[rangs[presents]] == codes[presents]
+        return [
+            (
+                self.trigrammes_termes[self.offsets[rang] : self.offsets[rang + 1]]
+                if present
+                else np.zeros(0, dtype=np.int32)
+            )
+            for rang, present in zip(rangs.tolist(), presents.tolist())
+        ]
+
+    def candidats(
+        self,
+        mot: str,
+        nb: int = NB_CANDIDATS_TRIGRAMMES,
+        seuil: float = SEUIL_DICE,
+    ) -> List[Tuple[str, float]]:
+        """
+        Renvoie les termes qui partagent le plus de trigrammes avec un mot, classés
+        par coefficient de Dice (2 × trigrammes communs / somme des nombres de
+        trigrammes des deux).
+
+        :param mot: Le mot.
+        :param nb: Le nombre maximal de termes renvoyés.
+        :param seuil: Le coefficient de Dice minimal.
+        :return: Les termes et leur coefficient, du plus proche au moins proche
+        (dans l'ordre des termes en cas d'égalité).
+        """
+        codes = trigrammes_terme(mot)
+        listes = self.termes_trigrammes(codes)
+        numeros = np.concatenate(listes) if listes else np.zeros(0, dtype=np.int32)
+        if len(numeros) == 0:
+            return []
+        communs = np.bincount(numeros, minlength=len(self.termes))
+        dice = 2 * communs / (len(codes) + self.nb_trigrammes)
+        gardes = np.flatnonzero((communs > 0) & (dice >= seuil))
+        meilleurs = gardes[np.argsort(-dice[gardes], kind="stable")[:nb]]
+        return [(self.termes[i], float(dice[i])) for i in meilleurs.tolist()]
+
+    def motif(self, expression: str) -> List[str]:
+        """
+        Renvoie les termes qui correspondent à un motif avec jokers ("*" : une suite
+        de caractères quelconque, "?" : un caractère). Seuls les termes qui ont tous
+        les trigrammes des parties fixes du motif sont comparés au motif.
+
+        :param expression: Le motif (par exemple "nano*", "*techno*" ou "r?seau").
+        :return: Les termes, triés.
+        """
+        parties = re.split(r"[*?]", expression)
+        # Les bords d'un terme ne sont connus que si le motif n'y a pas de joker
+        parties[0] = DEBUT + DEBUT + parties[0]
+        parties[-1] = parties[-1] + FIN
+        listes = [
+            termes
+            for partie in parties
+            for termes in self.termes_trigrammes(codes_trigrammes(partie))
+        ]
+        numeros = (
+            reduce(np.intersect1d, listes) if listes else np.arange(len(self.termes))
+        )
+        correspondance = re.compile(
+            "".join(
+                (
+                    ".*"
+                    if caractere == "*"
+                    else "." if caractere == "?" else re.escape(caractere)
+                )
+                for caractere in expression
+            )
+            + r"\Z",
+            re.DOTALL,
+        )
+        return [
+            self.termes[i]
+            for i in numeros.tolist()
+            if correspondance.match(self.termes[i])
+        ]
+
+
+def charger_index_trigrammes(
+    termes: List[str], chemin: str = "data/trigrammes.bin"
+) -> IndexTrigrammes:
+    """
+    Ouvre l'index des trigrammes d'une liste de termes, en le (re)construisant s'il
+    n'existe pas ou s'il a été construit pour d'autres termes (par exemple avant
+    l'ajout d'un segment).
+
+    :param termes: Les termes.
+    :param chemin: Le chemin de l'index.
+    :return: L'index des trigrammes.
+    """
+    try:
+        index = IndexTrigrammes(chemin)
+        if index.meta["empreinte"] == empreinte_termes(sorted(set(termes))):
+            return index
+    except (OSError, ValueError):
+        pass
+    sauvegarde_index_trigrammes(termes, chemin)
+    return IndexTrigrammes(chemin)
+
+
+def benchmark_trigrammes(
+    index: IndexTrigrammes, mots: List[str], motifs: List[str]
+) -> dict[str, float]:
+    """
+    Mesure la recherche des termes proches de mots et des termes qui correspondent
+    à des motifs, comparée au parcours de tous les termes.
+
+    :param index: L'index des trigrammes.
+    :param mots: Les mots (mal orthographiés) dont les termes proches sont cherchés.
+    :param motifs: Les motifs avec jokers.
+    :return: Un dictionnaire (nombre de termes, taille de l'index en octets, temps
+    moyen par mot, temps moyen par motif avec l'index et en parcourant les termes).
+    """
+    resultats = {
+        "nb_termes": len(index),
+        "taille_index": sum(
+            index.section(nom).nbytes
+            for nom in ("trigrammes", "trigrammes_offsets", "trigrammes_termes")
+        ),
+    }
+    debut_mesure = time.perf_counter()
+    for mot in mots:
+        index.candidats(mot)
+    resultats["temps_candidats"] = (time.perf_counter() - debut_mesure) / max(
+        1, len(mots)
+    )
+
+    debut_mesure = time.perf_counter()
+    trouves = [index.motif(motif) for motif in motifs]
+    resultats["temps_motif"] = (time.perf_counter() - debut_mesure) / max(
+        1, len(motifs)
+    )
+    debut_mesure = time.perf_counter()
+    parcourus = [
+        [
+            terme
+            for terme in index.termes
+            if re.fullmatch(
+                re.escape(motif).replace(r"\*", ".*").replace(r"\?", "."), terme
+            )
+        ]
+        for motif in motifs
+    ]
+    resultats["temps_motif_parcours"] = (time.perf_counter() - debut_mesure) / max(
+        1, len(motifs)
+    )
+    if trouves != parcourus:
+        raise ValueError("L'index des trigrammes et le parcours des termes diffèrent")
+    return resultats
+
+
+if __name__ == "__main__":
+    print("Construction de l'index des trigrammes...")
+    sauvegarde_index_trigrammes(IndexBinaire("data/index_inverse.bin").termes)
+    index_trigrammes = IndexTrigrammes()
+    for mot_fautif in ("systmes", "reseaux", "nanotechnolojies", "tudiant"):
+        print(mot_fautif, index_trigrammes.candidats(mot_fautif, 5))
+    for motif_exemple in ("nano*", "*techno*", "r?seau*"):
+        print(motif_exemple, index_trigrammes.motif(motif_exemple)[:10])
+    for cle, valeur in benchmark_trigrammes(
+        index_trigrammes,
+        ["systmes", "reseaux", "nanotechnolojies", "tudiant", "qechnologie"],
+        ["nano*", "*techno*", "r?seau*", "*ique", "a*"],
+    ).items():
+        print(f"{cle} : {valeur:.4g}")
@@ -0,0 +1,274 @@
+"""
+Modèle vectoriel : la matrice documents × termes des poids tf-idf calculés par
+anti_dictionnaire.calcul_tf_idf, au format CSR, sauvegardée en fichiers .npy.
+
+Pour le document (ligne) i, les identifiants des termes (colonnes) de poids non nul
+sont indices[indptr[i]:indptr[i + 1]], et leurs poids valeurs[indptr[i]:indptr[i + 1]].
+La norme L2 de chaque ligne est précalculée : la similarité cosinus d'une requête
+avec tous les documents se calcule en un seul produit matrice-vecteur creux.
+
+L'espace latent (analyse sémantique latente) est la SVD tronquée de cette matrice :
+des articles qui emploient des synonymes y sont proches même sans mot commun.
+
+Les termes sont les tokens du corpus brut (voir segmente.py), sans lemmatisation.
+Les bulletins ajoutés par ingestion.py n'y figurent qu'après une reconstruction
+complète (anti_dictionnaire.py).
+"""
+
+import os
+from collections import Counter
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+
+# Tableaux de la matrice, un fichier .npy chacun
+TABLEAUX_MATRICE = (
+    "indptr",
+    "indices",
+    "valeurs",
+    "normes",
+    "documents",
+    "idf",
+    "termes",
+)
+
+# Dimension de l'espace latent (SVD tronquée de la matrice)
+RANG_LATENT = 100
+
+
+def construction_matrice_tfidf(
+    fichier_tfidf: str, fichier_idf: str
+) -> dict[str, np.ndarray]:
+    """
+    Construit la matrice CSR des poids tf-idf.
+
+    :param fichier_tfidf: Le fichier des valeurs tf-idf (numéro de fichier, mot, tf-idf).
+    :param fichier_idf: Le fichier des valeurs idf (mot, idf).
+    :return: Les tableaux de la matrice (voir TABLEAUX_MATRICE) : "documents" donne
+    le numéro de fichier de chaque ligne, "idf" l'idf de chaque terme et "termes"
+    les termes (triés, encodés en utf-8 et séparés par des retours à la ligne).
+    """
+    # keep_default_na=False : des mots comme "null" ou "nan" restent des mots
+    tfidf_dataframe = pd.read_csv(
+        fichier_tfidf,
+        sep="\t",
+        header=None,
+        names=["file_number", "word", "tfidf"],
+        keep_default_na=False,
+    )
+    idf_dataframe = pd.read_csv(
+        fichier_idf, sep="\t", header=None, names=["word", "idf"], keep_default_na=False
+    ).sort_values(by="word")
+
+    documents = np.unique(tfidf_dataframe["file_number"].to_numpy()).astype(np.int32)
+    termes = idf_dataframe["word"].to_numpy(dtype=str)
+
+    # Les poids nuls (mots présents dans tous les documents) ne sont pas stockés
+    tfidf_dataframe = tfidf_dataframe[tfidf_dataframe["tfidf"] > 0]
+    lignes = np.searchsorted(documents, tfidf_dataframe["file_number"].to_numpy())
+    colonnes = np.searchsorted(termes, tfidf_dataframe["word"].to_numpy(dtype=str))
+    ordre = np.lexsort((colonnes, lignes))
+    lignes = lignes[ordre]
+    valeurs = tfidf_dataframe["tfidf"].to_numpy(dtype=np.float32)[ordre]
+
+    indptr = np.zeros(len(documents) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(lignes, minlength=len(documents)))
+    return {
+        "indptr": indptr,
+        "indices": colonnes[ordre].astype(np.int32),
+        "valeurs": valeurs,
+        "normes": np.sqrt(
+            np.bincount(
+                lignes,
+                weights=valeurs.astype(np.float64) ** 2,
+                minlength=len(documents),
+            )
+        ),
+        "documents": documents,
+        "idf": idf_dataframe["idf"].to_numpy(dtype=np.float32),
+        "termes": np.frombuffer("\n".join(termes).encode("utf-8"), dtype=np.uint8),
+    }
+
+
+def sauvegarde_matrice_tfidf(
+    fichier_tfidf: str, fichier_idf: str, dossier_sortie: str
+) -> None:
+    """
+    Construit la matrice des poids tf-idf et l'enregistre en fichiers .npy.
+
+    :param fichier_tfidf: Le fichier des valeurs tf-idf.
+    :param fichier_idf: Le fichier des valeurs idf.
+    :param dossier_sortie: Le dossier où écrire un fichier .npy par tableau.
+    :return: None
+    """
+    os.makedirs(dossier_sortie, exist_ok=True)
+    for nom, tableau in construction_matrice_tfidf(fichier_tfidf, fichier_idf).items():
+        np.save(os.path.join(dossier_sortie, f"{nom}.npy"), tableau)
+
+
+class MatriceTfIdf:
+    """
+    Matrice des poids tf-idf, chargée depuis ses fichiers .npy (projetés en mémoire).
+    """
+
+    def __init__(self, dossier: str = "data/tfidf"):
+        """
+        Charge la matrice.
+        :param dossier: Le dossier des fichiers .npy (voir sauvegarde_matrice_tfidf).
+        """
+        tableaux = {
+            nom: np.load(os.path.join(dossier, f"{nom}.npy"), mmap_mode="r")
+            for nom in TABLEAUX_MATRICE
+        }
+        self.indices = tableaux["indices"]
+        self.valeurs = tableaux["valeurs"]
+        self.normes = tableaux["normes"]
+        self.documents = tableaux["documents"]
+        self.idf = tableaux["idf"]
+
+        # Ligne de chaque poids non nul, pour le produit matrice-vecteur par bincount
+        indptr = tableaux["indptr"]
+        self.lignes = np.repeat(np.arange(len(self.documents)), np.diff(indptr))
+
+        termes = tableaux["termes"].tobytes().decode("utf-8")
+        self.identifiants = {
+            terme: i for i, terme in enumerate(termes.split("\n") if termes else [])
+        }
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def vecteur_requete(self, termes: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Renvoie le vecteur tf-idf (creux) d'une requête. Le poids d'un terme de la
+        requête est son nombre d'occurrences multiplié par son idf ; les termes
+        inconnus sont ignorés.
+
+        :param termes: Les termes (tokens) de la requête.
+        :return: Un tuple (identifiants des termes, poids).
+        """
+        comptes = Counter(terme for terme in termes if terme in self.identifiants)
+        colonnes = np.array([self.identifiants[terme] for terme in comptes], np.int64)
+        poids = np.array(list(comptes.values())) * self.idf[colonnes].astype(np.float64)
+        return colonnes, poids
+
+    def similarites(self, termes: List[str]) -> np.ndarray:
+        """
+        Calcule la similarité cosinus entre une requête et tous les documents.
+
+        :param termes: Les termes (tokens) de la requête.
+        :return: Les similarités, indexées comme self.documents (nulles si la requête
+        n'a aucun terme connu).
+        """
+        colonnes, poids = self.vecteur_requete(termes)
+        norme_requete = np.linalg.norm(poids)
+        if norme_requete == 0:
+            return np.zeros(len(self.documents))
+
+        requete = np.zeros(len(self.idf))
+        requete[colonnes] = poids
+        produits = np.bincount(
+            self.lignes,
+            weights=self.valeurs * requete[self.indices],
+            minlength=len(self.documents),
+        )
+        return produits / (
+            np.maximum(self.normes, np.finfo(np.float64).tiny) * norme_requete
+        )
+
+    def dense(self) -> np.ndarray:
+        """
+        Renvoie la matrice sous forme dense.
+        :return: Un tableau (nombre de documents, nombre de termes).
+        """
+        matrice = np.zeros((len(self.documents), len(self.idf)))
+        matrice[self.lignes, self.indices] = self.valeurs
+        return matrice
+
+
+def construction_espace_latent(
+    matrice: MatriceTfIdf, rang: int = RANG_LATENT
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Factorise la matrice tf-idf par SVD tronquée (analyse sémantique latente).
+
+    :param matrice: La matrice tf-idf.
+    :param rang: La dimension de l'espace latent (au plus le nombre de documents).
+    :return: Un tuple (vecteurs des documents dans l'espace latent, c'est-à-dire les
+    lignes de U·S normalisées ; projection V d'un vecteur tf-idf dans cet espace),
+    en float32.
+    """
+    # Les documents sont peu nombreux : la SVD de la matrice dense est exacte et rapide
+    u, valeurs_singulieres, vt = np.linalg.svd(matrice.dense(), full_matrices=False)
+    rang = min(rang, len(valeurs_singulieres))
+    latents = u[:, :rang] * valeurs_singulieres[:rang]
+    latents /= np.maximum(
+        np.linalg.norm(latents, axis=1, keepdims=True), np.finfo(np.float64).tiny
+    )
+    return latents.astype(np.float32), vt[:rang].T.astype(np.float32)
+
+
+def sauvegarde_espace_latent(
+    dossier: str = "data/tfidf", rang: int = RANG_LATENT
+) -> None:
+    """
+    Construit l'espace latent de la matrice tf-idf et l'enregistre dans le dossier
+    de la matrice ("latents.npy" et "projection.npy").
+
+    :param dossier: Le dossier de la matrice tf-idf (voir sauvegarde_matrice_tfidf).
+    :param rang: La dimension de l'espace latent.
+    :return: None
+    """
+    latents, projection = construction_espace_latent(MatriceTfIdf(dossier), rang)
+    np.save(os.path.join(dossier, "latents.npy"), latents)
+    np.save(os.path.join(dossier, "projection.npy"), projection)
+
+
+class EspaceLatent(MatriceTfIdf):
+    """
+    Matrice tf-idf et son espace latent (voir sauvegarde_espace_latent),
+    projetés en mémoire.
+    """
+
+    def __init__(self, dossier: str = "data/tfidf"):
+        """
+        Charge la matrice et son espace latent.
+        :param dossier: Le dossier des fichiers .npy.
+        """
+        super().__init__(dossier)
+        self.latents = np.load(os.path.join(dossier, "latents.npy"), mmap_mode="r")
+        self.projection = np.load(
+            os.path.join(dossier, "projection.npy"), mmap_mode="r"
+        )
+
+    def similarites_latentes(self, termes: List[str]) -> np.ndarray:
+        """
+        Calcule la similarité cosinus entre une requête et tous les documents dans
+        l'espace latent : la requête y est projetée, puis comparée aux documents
+        par un seul produit matrice-vecteur.
+
+        :param termes: Les termes (tokens) de la requête.
+        :return: Les similarités, indexées comme self.documents (nulles si la requête
+        n'a aucun terme connu).
+        """
+        colonnes, poids = self.vecteur_requete(termes)
+        requete = poids.astype(np.float32) @ self.projection[colonnes]
+        norme_requete = np.linalg.norm(requete)
+        if norme_requete == 0:
+            return np.zeros(len(self.documents), dtype=np.float32)
+        return self.latents @ (requete / norme_requete)
+
+
+if __name__ == "__main__":
+    print("Construction de la matrice tf-idf...")
+    sauvegarde_matrice_tfidf(
+        "data/tfidf_output.txt", "data/idf_output.txt", "data/tfidf"
+    )
+    print("Factorisation de la matrice tf-idf...")
+    sauvegarde_espace_latent("data/tfidf")
+    matrice = EspaceLatent("data/tfidf")
+    print(
+        f"{len(matrice)} documents, {len(matrice.identifiants)} termes, "
+        f"{len(matrice.valeurs)} poids non nuls, "
+        f"espace latent de dimension {matrice.latents.shape[1]}"
+    )
@@ -0,0 +1,22 @@
+"""
+Configuration des tests : les modules sont dans src/ et lisent leurs données
+par des chemins relatifs à ce dossier.
+"""
+
+import os
+import sys
+import pytest
+
+DOSSIER_SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+sys.path.insert(0, os.path.abspath(DOSSIER_SRC))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dossier_src():
+    """
+    Exécute les tests depuis src/, comme les modules.
+    """
+    dossier = os.getcwd()
+    os.chdir(DOSSIER_SRC)
+    yield
+    os.chdir(dossier)
@@ -0,0 +1,42 @@
+"""
+Tests du format binaire de l'index inversé.
+"""
+
+from collections import defaultdict
+from index_binaire import (
+    IndexBinaire,
+    conversion_index_texte,
+    lecture_index_texte,
+    verification_aller_retour,
+)
+
+INDEX_TEXTE = "data/index_inverse.txt"
+
+
+def test_aller_retour(tmp_path):
+    """
+    L'index texte converti puis rouvert a les mêmes postings, relus en bloc
+    (IndexBinaire.lignes) et terme par terme dans chaque champ.
+    """
+    chemin = str(tmp_path / "index_inverse.bin")
+    conversion_index_texte(INDEX_TEXTE, chemin)
+    assert verification_aller_retour(INDEX_TEXTE, chemin)
+
+    index = IndexBinaire(chemin)
+    lignes = lecture_index_texte(INDEX_TEXTE)
+    assert sorted(terme for terme, _ in lignes) == index.termes
+    assert int(index.offsets[-1]) == sum(len(postings) for _, postings in lignes)
+    for terme, postings in lignes:
+        par_champ = defaultdict(list)
+        for fichier, champ, positions in postings:
+            par_champ[champ].append((fichier, len(positions)))
+        for champ, attendus in par_champ.items():
+            attendus.sort()
+            docs, frequences = index.frequences_postings(terme, champ)
+            assert index.documents[index.postings(terme, [champ])].tolist() == [
+                fichier for fichier, _ in attendus
+            ]
+            assert (
+                list(zip(index.documents[docs].tolist(), frequences.tolist()))
+                == attendus
+            )
@@ -0,0 +1,132 @@
+"""
+Tests de l'analyse des requêtes.
+"""
+
+import contextlib
+import io
+import pytest
+from moteur import REQUETES_EXEMPLES, MoteurRecherche
+from requetes import (
+    AnalyseurRequetes,
+    nettoyage_requete,
+    replace_soit,
+    traitement_requete,
+)
+
+# Requêtes avec des expressions ou des rubriques entre guillemets
+REQUETES_GUILLEMETS = [
+    "Je veux les articles de la rubrique « Focus »",
+    'Je veux les articles de la rubrique "Focus"',
+    "Je voudrais les articles qui parlent de « réalité virtuelle »",
+    'Je voudrais les articles qui parlent de "réalité virtuelle" mais pas de jeux',
+    "Articles parlant de « recherche innovation »~2 et de la rubrique « Focus »",
+    "Articles dont le titre « Tara Oceans Polar Circle »",
+    'Articles dont le contenu parle de "énergie" ou de « vins »',
+    'Articles parlant de « » et de ""',
+]
+
+
+@pytest.fixture(scope="module")
+def moteur():
+    """
+    Le moteur de recherche sur l'index du corpus.
+    """
+    return MoteurRecherche()
+
+
+def recherche(moteur_adit: MoteurRecherche, requete: str) -> set:
+    """
+    Renvoie les résultats d'une requête, sans les affichages du moteur.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return moteur_adit.rechercher(requete)[0]
+
+
+@pytest.mark.parametrize(
+    "requete",
+    [
+        "Je veux les articles de la rubrique « Focus »",
+        'Je veux les articles de la rubrique "Focus"',
+    ],
+)
+def test_rubrique_entre_guillemets(moteur, requete):
+    """
+    Les guillemets vides laissés par une rubrique extraite ne sont pas une expression.
+    """
+    composants = AnalyseurRequetes().structure(requete)
+    assert composants["rubriques"] == ["focus"]
+    assert composants["keywords"] == []
+    assert recherche(moteur, requete) == recherche(
+        moteur, "Je veux les articles de la rubrique Focus"
+    )
+
+
+def analyse_pas_a_pas(requete: str, correction) -> dict:
+    """
+    Analyse une requête fonction par fonction, comme le moteur avant
+    AnalyseurRequetes.
+    """
+    composants = traitement_requete(nettoyage_requete(replace_soit(requete)))
+    if composants["titre"] is not None:
+        composants["titre"] = correction(composants["titre"])
+    if composants["contenu"] is not None:
+        composants["contenu"] = correction(composants["contenu"])
+    for mot in composants["keywords"]:
+        if mot == "ou":
+            continue
+        if not mot.startswith("pas "):
+            composants["keywords"][composants["keywords"].index(mot)] = correction(mot)
+        else:
+            composants["keywords"][composants["keywords"].index(mot)] = (
+                "pas " + correction(mot[4:])
+            )
+    return composants
+
+
+def test_analyseur_identique_pas_a_pas(moteur):
+    """
+    L'analyseur (ressources chargées une fois, résultats en cache) donne les mêmes
+    requêtes structurées que l'enchaînement des fonctions, deux fois de suite.
+    """
+    analyseur = AnalyseurRequetes(moteur.corriger_texte)
+    requetes = REQUETES_EXEMPLES + REQUETES_GUILLEMETS
+    with contextlib.redirect_stdout(io.StringIO()):
+        attendues = [
+            analyse_pas_a_pas(requete, moteur.corriger_texte) for requete in requetes
+        ]
+        for _ in range(2):
+            assert analyseur.analyse_plusieurs(requetes) == attendues
+
+
+def test_mots_cles_avec_jokers(moteur):
+    """
+    Un mot-clé avec jokers réunit les documents des termes qui y correspondent ;
+    un point d'interrogation final reste une ponctuation.
+    """
+    analyseur = AnalyseurRequetes()
+    assert analyseur.structure("articles parlant de nano* et de r?seau")[
+        "keywords"
+    ] == ["nano*", "r?seau"]
+    assert analyseur.structure("Quels sont les articles sur la réalité virtuelle?")[
+        "keywords"
+    ] == ["réalité", "virtuelle"]
+
+    termes = moteur.termes_motif("nano*")
+    assert termes and all(terme.startswith("nano") for terme in termes)
+    attendus = 0
+    for terme in termes:
+        attendus |= moteur.postings(terme)
+    assert moteur.postings("nano*") == attendus
+    assert recherche(moteur, "articles parlant de nano*") == moteur.fichiers(attendus)
+
+
+@pytest.mark.parametrize("mot", ["chimie", "nanotechnologie"])
+def test_mot_entier_avec_joker(moteur, mot):
+    """
+    Un mot entier suivi de "*" est cherché parmi les mots du lexique : il trouve
+    au moins les documents du mot lui-même (dont le terme indexé est le lemme).
+    """
+    assert moteur.lexique.lemme(mot) in moteur.termes_motif(f"{mot}*")
+    sans_joker = recherche(moteur, f"articles qui parlent de {mot}")
+    assert sans_joker
+    assert sans_joker <= recherche(moteur, f"articles qui parlent de {mot}*")
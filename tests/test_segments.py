@@ -0,0 +1,97 @@
+"""
+Tests de l'index segmenté : ajout d'un segment puis fusion dans l'index de base.
+"""
+
+import contextlib
+import io
+from index_binaire import CHAMPS_INDEXES, lignes_index, sauvegarde_index_binaire
+from index_direct import ecriture_index_direct, fiche_article
+from index_inverse import creation_index_inverse
+from moteur import REQUETES_EXEMPLES, MoteurRecherche
+from segments import (
+    IndexSegmente,
+    ecriture_segment,
+    fusion_en_arriere_plan,
+    liste_segments,
+)
+from utils import parse_xml
+
+# Articles retirés de l'index de base, puis ajoutés comme un segment
+ARTICLES_SEGMENT = {"67068", "72933", "74752"}
+
+
+def corpus_partiel(fichier: str, dans_segment: bool):
+    """
+    Lit un corpus en ne gardant que les articles du segment, ou que les autres.
+    """
+    corpus = parse_xml(fichier)
+    for parent in corpus.iter():
+        for article in parent.findall("article"):
+            if (article.findtext("fichier") in ARTICLES_SEGMENT) != dans_segment:
+                parent.remove(article)
+    return corpus
+
+
+def resultats(moteur_adit: MoteurRecherche) -> dict:
+    """
+    Renvoie les résultats des requêtes d'exemple.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            requete: moteur_adit.rechercher(requete) for requete in REQUETES_EXEMPLES
+        }
+
+
+def test_ajout_puis_fusion(tmp_path):
+    """
+    Un segment ajouté, puis fusionné dans la base, donne les résultats de l'index
+    complet ; pendant la fusion, l'index segmenté s'ouvre toujours en entier.
+    """
+    index, documents = str(tmp_path / "index.bin"), str(tmp_path / "direct.bin")
+    dossier_segments = str(tmp_path / "segments")
+    sauvegarde_index_binaire(
+        creation_index_inverse(
+            corpus_partiel("data/corpus_clean.xml", False), list(CHAMPS_INDEXES)
+        ),
+        index,
+    )
+    ecriture_index_direct(
+        [
+            fiche_article(article)
+            for article in corpus_partiel("data/corpus.xml", False).iter("article")
+        ],
+        documents,
+    )
+    moteur_adit = MoteurRecherche(index, documents, segments=dossier_segments)
+    attendus = resultats(MoteurRecherche())
+    assert resultats(moteur_adit) != attendus
+
+    # Le segment est construit comme par ingestion.ingestion_bulletins, sur les
+    # articles déjà nettoyés du corpus
+    ecriture_segment(
+        lignes_index(
+            creation_index_inverse(
+                corpus_partiel("data/corpus_clean.xml", True), list(CHAMPS_INDEXES)
+            )
+        ),
+        [
+            fiche_article(article)
+            for article in corpus_partiel("data/corpus.xml", True).iter("article")
+        ],
+        dossier_segments,
+    )
+    assert resultats(moteur_adit) == attendus
+    nb_documents = moteur_adit.index.nb_documents
+
+    ouvertures = []
+    fusion = fusion_en_arriere_plan(index, documents, dossier_segments)
+    while fusion.is_alive() or not ouvertures:
+        ouvertures.append(
+            IndexSegmente(index, documents, dossier_segments).nb_documents
+        )
+    fusion.join()
+    assert set(ouvertures) == {nb_documents}
+    assert liste_segments(dossier_segments) == []
+    assert not moteur_adit.index.est_a_jour()
+    assert resultats(moteur_adit) == attendus
+    assert len(moteur_adit.index.segments) == 1